@@ -3,25 +3,37 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from dotenv import load_dotenv
 import os
+from app.db_routing import RoutingSession
 
 # Load environment variables from .env file
 load_dotenv()
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object("app.config.Config")
+    from app.logging_config import configure_logging
+    configure_logging(app)
+    from app.metrics import register_metrics
+    register_metrics(app)
+    from app.json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
+    from app.db_pool import engine_options, pool_metrics
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
     db.init_app(app)
+    with app.app_context():
+        pool_metrics.init_app(app, db.engine)
+    from app.db_routing import replica_router
+    replica_router.init_app(app)
     jwt.init_app(app)
-    
-    @app.route("/health")
-    def health_check():
-        from app.db_utils import get_health_status
-        return get_health_status()
-    
-    from app.routes import users_bp, books_bp, tags_bp, comments_bp, ratings_bp, reviews_bp, plugins_bp, protected_bp
+
+    from app.routes import (
+        users_bp, books_bp, tags_bp, comments_bp, ratings_bp, reviews_bp, plugins_bp, protected_bp, export_bp,
+        admin_bp, health_bp
+    )
+    app.register_blueprint(health_bp)
     app.register_blueprint(users_bp)
     app.register_blueprint(books_bp) 
     app.register_blueprint(tags_bp)
@@ -30,7 +42,27 @@ def create_app():
     app.register_blueprint(reviews_bp)
     app.register_blueprint(plugins_bp)
     app.register_blueprint(protected_bp)
+    app.register_blueprint(export_bp)
+    app.register_blueprint(admin_bp)
+    from app.compression import compressor
+    compressor.init_app(app)
     from app.swagger import swaggerui_blueprint, docs
     app.register_blueprint(swaggerui_blueprint, url_prefix="/docs")
     app.register_blueprint(docs)
+    from app.http_client import http_client
+    http_client.init_app(app)
+    from app.enrichment_cache import enrichment_cache
+    enrichment_cache.init_app(app)
+    from app.user_cache import user_cache
+    user_cache.init_app(app)
+    from app.passwords import passwords
+    passwords.init_app(app)
+    from app.response_cache import response_cache
+    response_cache.init_app(app)
+    from app.plugin_loader import registry
+    registry.init_app(app)
+    from app.health import health_prober
+    health_prober.init_app(app)
+    from app.cli import register_commands
+    register_commands(app)
     return app
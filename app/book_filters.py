@@ -0,0 +1,98 @@
+"""
+Query-string filters and facet counts for book listings
+"""
+from sqlalchemy import String, cast, func, literal, select, union_all
+from app import db
+from app.models import Author, Book, BookTag, Tag
+from app.models.book import book_authors
+
+
+class BookFilterError(ValueError):
+    """Raised for malformed filter parameters"""
+
+
+def _int_arg(args, name):
+    value = args.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise BookFilterError(f'{name} must be an integer')
+
+
+def book_filter_clauses(args):
+    """
+    Translate request args into WHERE clauses on books.
+
+    tag (repeatable) with tag_mode=and|or, author_id, year_from, year_to,
+    language and series. Tag and author filters become semi-joins through
+    the indexed association tables.
+    """
+    clauses = []
+    tags = [t for t in args.getlist('tag') if t.strip()]
+    if tags:
+        tag_mode = args.get('tag_mode', 'and').lower()
+        if tag_mode not in ('and', 'or'):
+            raise BookFilterError("tag_mode must be 'and' or 'or'")
+        tagged = (
+            select(BookTag.book_id)
+            .join(Tag, Tag.id == BookTag.tag_id)
+            .where(Tag.name.in_(tags))
+        )
+        if tag_mode == 'and':
+            tagged = tagged.group_by(BookTag.book_id).having(func.count(BookTag.tag_id) == len(set(tags)))
+        clauses.append(Book.id.in_(tagged))
+    author_id = _int_arg(args, 'author_id')
+    if author_id is not None:
+        clauses.append(Book.id.in_(select(book_authors.c.book_id).where(book_authors.c.author_id == author_id)))
+    year_from = _int_arg(args, 'year_from')
+    if year_from is not None:
+        clauses.append(Book.publish_year >= year_from)
+    year_to = _int_arg(args, 'year_to')
+    if year_to is not None:
+        clauses.append(Book.publish_year <= year_to)
+    if args.get('language'):
+        clauses.append(Book.language == args['language'])
+    if args.get('series'):
+        clauses.append(Book.series == args['series'])
+    return clauses
+
+
+def facet_counts(clauses, limit):
+    """
+    Count tags, authors, languages, series and years over the filtered books
+    in one UNION ALL query, keeping the top `limit` values per facet.
+    Returns: {facet: [{'value', 'label', 'count'}, ...]}
+    """
+    books = select(Book.id).where(*clauses).scalar_subquery()
+    parts = [
+        select(literal('tags').label('facet'), Tag.name.label('value'), Tag.name.label('label'),
+               func.count().label('count'))
+        .select_from(BookTag).join(Tag, Tag.id == BookTag.tag_id)
+        .where(BookTag.book_id.in_(books)).group_by(Tag.name),
+        select(literal('authors'), cast(Author.id, String), Author.name, func.count())
+        .select_from(book_authors).join(Author, Author.id == book_authors.c.author_id)
+        .where(book_authors.c.book_id.in_(books)).group_by(Author.id, Author.name),
+    ]
+    for facet, column in (('languages', Book.language), ('series', Book.series), ('years', Book.publish_year)):
+        parts.append(
+            select(literal(facet), cast(column, String), cast(column, String), func.count())
+            .where(Book.id.in_(books), column.isnot(None)).group_by(column)
+        )
+    counts = union_all(*parts).subquery()
+    ranked = select(
+        counts,
+        func.row_number().over(
+            partition_by=counts.c.facet, order_by=(counts.c.count.desc(), counts.c.value)
+        ).label('position')
+    ).subquery()
+    rows = db.session.execute(
+        select(ranked.c.facet, ranked.c.value, ranked.c.label, ranked.c.count)
+        .where(ranked.c.position <= limit)
+        .order_by(ranked.c.facet, ranked.c.position)
+    )
+    facets = {'tags': [], 'authors': [], 'languages': [], 'series': [], 'years': []}
+    for row in rows:
+        facets[row.facet].append({'value': row.value, 'label': row.label, 'count': row.count})
+    return facets
@@ -0,0 +1,264 @@
+"""
+Bulk book import: parsing, concurrent plugin enrichment and chunked inserts
+"""
+import csv
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import selectinload
+from app import db
+from app.models import Author, Book, Tag
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_AUTHOR = 'No Author'
+TAG_NAME_MAX = Tag.__table__.c.name.type.length
+
+UPSERT_DIALECTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+# Plugin aliases accepted by the API for backwards compatibility
+PLUGIN_ALIASES = {'GoodreadsPlugin': 'OpenLibraryPlugin'}
+
+
+class ImportFormatError(ValueError):
+    """Raised when a bulk payload cannot be parsed"""
+
+
+def parse_publish_year(raw):
+    """Extract a year from an int or a date string like "2016-10-18"."""
+    if not raw:
+        return None
+    if isinstance(raw, str):
+        try:
+            return int(raw.split('-')[0])
+        except (ValueError, IndexError):
+            return None
+    return raw
+
+
+def merge_enrichment(data, enriched):
+    """Overlay successful plugin output onto a request record (in place)."""
+    if not enriched or 'error' in enriched:
+        return data
+    data['title'] = enriched.get('title') or data.get('title', '')
+    data['description'] = enriched.get('description', data.get('description', ''))
+    data['series'] = enriched.get('series', data.get('series', ''))
+    data['publish_year'] = enriched.get('publish_year', data.get('publish_year'))
+    data['tags'] = list(data.get('tags') or []) + list(enriched.get('genres') or [])
+    if enriched.get('authors'):
+        data['authors'] = enriched['authors']
+    if enriched.get('cover_url'):
+        data['cover_url'] = enriched['cover_url']
+    return data
+
+
+def clean_names(names):
+    """Strip, drop empties and de-duplicate while keeping order."""
+    if isinstance(names, str):
+        names = [names]
+    cleaned = (n.strip() if isinstance(n, str) else str(n) for n in names or [])
+    return list(dict.fromkeys(n for n in cleaned if n))
+
+
+def _upsert_by_name(model, names):
+    """
+    Return {name: row} for every name, creating missing rows.
+    One IN lookup; when something is missing, one multi-row
+    INSERT ... ON CONFLICT (name) DO NOTHING (Postgres/SQLite) and a second
+    lookup for just those names. Concurrent writers inserting the same name
+    therefore never fail. Other dialects fall back to a plain bulk insert.
+    """
+    names = clean_names(names)
+    if not names:
+        return {}
+    found = {row.name: row for row in model.query.filter(model.name.in_(names))}
+    missing = [name for name in names if name not in found]
+    if not missing:
+        return found
+    dialect = db.session.get_bind().dialect.name
+    if dialect in UPSERT_DIALECTS:
+        statement = UPSERT_DIALECTS[dialect](model).values([{'name': name} for name in missing])
+        db.session.execute(statement.on_conflict_do_nothing(index_elements=['name']))
+        found.update((row.name, row) for row in model.query.filter(model.name.in_(missing)))
+    else:
+        rows = [model(name=name) for name in missing]
+        db.session.add_all(rows)
+        db.session.flush()
+        found.update((row.name, row) for row in rows)
+    return found
+
+
+def resolve_authors(names):
+    """Map author names to Author rows, inserting missing ones. Returns: {name: Author}"""
+    return _upsert_by_name(Author, names)
+
+
+def resolve_tags(names):
+    """
+    Map tag names to Tag rows, inserting missing ones. Names longer than the
+    column allows are ignored. Returns: {name: Tag}
+    """
+    return _upsert_by_name(Tag, [n for n in clean_names(names) if len(n) <= TAG_NAME_MAX])
+
+
+def parse_records(payload, fmt):
+    """
+    Parse a bulk payload into a list of record dicts.
+    fmt is one of 'json', 'ndjson' or 'csv'. Bare ISBN strings are accepted
+    anywhere a record is expected.
+    """
+    if isinstance(payload, bytes):
+        payload = payload.decode('utf-8')
+    try:
+        if fmt == 'json':
+            items = json.loads(payload)
+            if isinstance(items, dict):
+                items = items.get('items', [])
+        elif fmt == 'ndjson':
+            items = [json.loads(line) for line in payload.splitlines() if line.strip()]
+        elif fmt == 'csv':
+            items = list(csv.DictReader(io.StringIO(payload)))
+        else:
+            raise ImportFormatError(f'Unsupported format: {fmt}')
+    except (ValueError, csv.Error) as e:
+        raise ImportFormatError(str(e))
+    if not isinstance(items, list):
+        raise ImportFormatError('Expected a list of records')
+    return [normalize_record(item) for item in items]
+
+
+def normalize_record(item):
+    if isinstance(item, (str, int)):
+        return {'isbn': str(item).strip()}
+    if not isinstance(item, dict):
+        return {}
+    record = {k: v for k, v in item.items() if v not in (None, '')}
+    # CSV columns carry lists as ';'-separated strings
+    for key in ('authors', 'tags'):
+        if isinstance(record.get(key), str):
+            record[key] = [part for part in record[key].split(';')]
+    if 'isbn' in record:
+        record['isbn'] = str(record['isbn']).strip()
+    return record
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class BookImporter:
+    """
+    Enrich records concurrently through a plugin, then insert them in
+    chunked transactions with set-based author/tag resolution.
+    """
+    def __init__(self, plugin=None, workers=8, chunk_size=500):
+        self.plugin = plugin
+        self.workers = max(1, workers)
+        self.chunk_size = max(1, chunk_size)
+
+    def run(self, records):
+        """Returns: list of per-record result dicts, in input order."""
+        report = []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='book-import') as pool:
+            for offset, chunk in enumerate(_chunks(records, self.chunk_size)):
+                enriched = list(pool.map(self._enrich, chunk))
+                report.extend(self._insert_chunk(offset * self.chunk_size, enriched))
+        return report
+
+    def _enrich(self, record):
+        record = dict(record)
+        if self.plugin and record.get('isbn'):
+            try:
+                result = self.plugin.run({'isbn': record['isbn']})
+            except Exception as e:
+                logger.warning(f"Enrichment failed for ISBN {record['isbn']}: {e}")
+                result = {'error': str(e)}
+            merge_enrichment(record, result)
+        return record
+
+    def _insert_chunk(self, offset, records):
+        results = [{'index': offset + i, 'isbn': r.get('isbn')} for i, r in enumerate(records)]
+        pending = []
+        for result, record in zip(results, records):
+            if not isinstance(record.get('title'), str) or not record['title'].strip():
+                result.update(status='failed', msg='Missing title')
+            else:
+                pending.append((result, record))
+
+        try:
+            created = self._create_books(pending)
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.warning(f'Bulk chunk at {offset} failed ({e}); retrying row by row')
+            created = []
+            for item in pending:
+                try:
+                    created.extend(self._create_books([item]))
+                    db.session.commit()
+                except SQLAlchemyError as row_error:
+                    db.session.rollback()
+                    item[0].update(status='failed', msg=str(row_error.orig if hasattr(row_error, 'orig') else row_error))
+        for result, book in created:
+            result.update(status='created', id=book.id)
+        return results
+
+    def _create_books(self, pending):
+        isbns = [r.get('isbn') for _, r in pending if r.get('isbn')]
+        taken_isbns = set()
+        if isbns:
+            taken_isbns = {isbn for (isbn,) in db.session.query(Book.isbn).filter(Book.isbn.in_(isbns))}
+
+        author_lists = [clean_names(r.get('authors')) or [DEFAULT_AUTHOR] for _, r in pending]
+        authors = resolve_authors([name for names in author_lists for name in names])
+        tags = resolve_tags([name for _, r in pending for name in clean_names(r.get('tags'))])
+
+        titles = {r['title'] for _, r in pending}
+        taken_titles = {
+            (book.title, frozenset(a.name for a in book.authors))
+            for book in Book.query.options(selectinload(Book.authors)).filter(Book.title.in_(titles))
+        }
+
+        created = []
+        for (result, record), author_names in zip(pending, author_lists):
+            isbn = record.get('isbn')
+            title_key = (record['title'], frozenset(author_names))
+            if isbn and isbn in taken_isbns:
+                result.update(status='skipped', msg='ISBN already exists')
+                continue
+            if title_key in taken_titles:
+                result.update(status='skipped', msg='Author and book already exist')
+                continue
+            if isbn:
+                taken_isbns.add(isbn)
+            taken_titles.add(title_key)
+            book = Book(
+                title=record['title'],
+                isbn=isbn,
+                description=record.get('description', ''),
+                publish_year=parse_publish_year(record.get('publish_year')),
+                series=record.get('series'),
+                cover_url=record.get('cover_url')
+            )
+            book.authors = [authors[name] for name in author_names]
+            book.tags = [tags[name] for name in clean_names(record.get('tags')) if name in tags]
+            db.session.add(book)
+            created.append((result, book))
+        db.session.flush()
+        return created
+
+
+def summarize(report):
+    counts = {'created': 0, 'skipped': 0, 'failed': 0}
+    for result in report:
+        counts[result['status']] += 1
+    return dict(counts, results=report)
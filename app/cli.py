@@ -0,0 +1,56 @@
+"""
+Flask CLI commands for maintenance tasks
+"""
+import json
+import click
+
+
+def register_commands(app):
+    @app.cli.command('rebuild-rating-summaries')
+    def rebuild_rating_summaries():
+        """Rebuild the rating_summaries table from the ratings table."""
+        from app.models import RatingSummary
+        written = RatingSummary.backfill()
+        click.echo(f'Rebuilt rating summaries for {written} books')
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index():
+        """Rebuild the full-text book search index."""
+        from app import db
+        from app.search import reindex_books
+        reindex_books(db.session.connection())
+        db.session.commit()
+        click.echo('Rebuilt book search index')
+
+    @app.cli.command('import-books')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'fmt', type=click.Choice(['json', 'ndjson', 'csv']),
+                  help='Input format; guessed from the file extension by default.')
+    @click.option('--plugin', default='GoogleBooksPlugin', show_default=True,
+                  help="Enrichment plugin, or 'none' to skip enrichment.")
+    @click.option('--workers', type=int, help='Concurrent enrichment lookups.')
+    @click.option('--chunk-size', type=int, help='Books inserted per transaction.')
+    @click.option('--report', type=click.Path(dir_okay=False), help='Write per-item results as NDJSON.')
+    def import_books(path, fmt, plugin, workers, chunk_size, report):
+        """Bulk import books from a JSON, NDJSON or CSV file."""
+        from app.book_import import BookImporter, ImportFormatError, PLUGIN_ALIASES, parse_records, summarize
+        from app.plugin_loader import registry
+        if not fmt:
+            extension = path.rsplit('.', 1)[-1].lower()
+            fmt = {'jsonl': 'ndjson', 'ndjson': 'ndjson', 'csv': 'csv'}.get(extension, 'json')
+        with open(path, 'rb') as f:
+            try:
+                records = parse_records(f.read(), fmt)
+            except ImportFormatError as e:
+                raise click.ClickException(f'Invalid input: {e}')
+        importer = BookImporter(
+            plugin=registry.get(PLUGIN_ALIASES.get(plugin, plugin)),
+            workers=workers or app.config['BULK_IMPORT_WORKERS'],
+            chunk_size=chunk_size or app.config['BULK_IMPORT_CHUNK_SIZE']
+        )
+        summary = summarize(importer.run(records))
+        if report:
+            with open(report, 'w') as out:
+                for result in summary['results']:
+                    out.write(json.dumps(result) + '\n')
+        click.echo(f"Created {summary['created']}, skipped {summary['skipped']}, failed {summary['failed']}")
@@ -0,0 +1,135 @@
+"""
+gzip/brotli response compression negotiated from Accept-Encoding.
+
+Buffered responses are compressed when at least COMPRESS_MIN_SIZE bytes;
+streamed responses (the exports) go through an incremental compressor that
+flushes after every chunk so clients still receive data as it is produced.
+A compressed representation gets its own strong ETag: the identity ETag
+with an '-<encoding>' suffix (see app.conditional.etag_matches).
+"""
+import gzip
+import zlib
+from flask import current_app, request
+from app.conditional import etag_matches
+
+try:
+    import brotli
+except ImportError:  # optional dependency; gzip only
+    brotli = None
+
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+DEFAULT_MIMETYPES = (
+    'application/json', 'application/x-ndjson', 'text/csv', 'text/html', 'text/plain',
+    'text/css', 'application/javascript',
+)
+
+
+def negotiate_encoding(accept_encodings=None):
+    """Best encoding the client accepts, preferring brotli. Returns: 'br', 'gzip' or None"""
+    accept = request.accept_encodings if accept_encodings is None else accept_encodings
+    best, best_quality = None, 0
+    for encoding in ENCODINGS:
+        quality = accept[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data, encoding, level=6):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def compress_stream(chunks, encoding, level=6):
+    """Compress an iterable of str/bytes chunks, flushing after each one."""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=level)
+        for chunk in chunks:
+            data = compressor.process(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+            data += compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+        data += compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def encoded_etag(etag, encoding):
+    return f'{etag}-{encoding}'
+
+
+class Compressor:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+        self.gzip_level = app.config.get('COMPRESS_GZIP_LEVEL', 6)
+        self.brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', 4)
+        self.mimetypes = set(app.config.get('COMPRESS_MIMETYPES') or DEFAULT_MIMETYPES)
+        app.after_request(self.after_request)
+
+    def level(self, encoding):
+        return self.brotli_quality if encoding == 'br' else self.gzip_level
+
+    def after_request(self, response):
+        if response.mimetype not in self.mimetypes or 'Content-Encoding' in response.headers:
+            return response
+        response.vary.add('Accept-Encoding')
+        if response.status_code < 200 or response.status_code in (204, 206, 304) or response.direct_passthrough:
+            return response
+        encoding = negotiate_encoding()
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_stream(response.response, encoding, self.level(encoding))
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            response.set_data(compress(data, encoding, self.level(encoding)))
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(encoded_etag(etag, encoding))
+        return response
+
+
+class PrecompressedAsset:
+    """A static file read and compressed once, served from memory with its ETag."""
+    def __init__(self, path, mimetype):
+        with open(path, 'rb') as f:
+            self.data = f.read()
+        self.mimetype = mimetype
+        self.etag = zlib.crc32(self.data).to_bytes(4, 'big').hex() + f'-{len(self.data):x}'
+        self.variants = {encoding: compress(self.data, encoding, 9 if encoding == 'gzip' else 11)
+                         for encoding in ENCODINGS}
+
+    def response(self):
+        encoding = negotiate_encoding()
+        etag = encoded_etag(self.etag, encoding) if encoding else self.etag
+        if etag_matches(self.etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = current_app.response_class(self.variants[encoding] if encoding else self.data,
+                                                   mimetype=self.mimetype)
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.no_cache = True
+        return response
+
+
+compressor = Compressor()
@@ -0,0 +1,56 @@
+"""
+Conditional GET support: strong ETags, Last-Modified and 304 responses
+"""
+import hashlib
+from datetime import timezone
+from flask import make_response, request
+
+
+def make_etag(*version):
+    """Strong ETag for the current URL (path and query string) at the given version."""
+    key = repr((request.full_path,) + version).encode('utf-8')
+    return hashlib.blake2b(key, digest_size=16).hexdigest()
+
+
+def etag_matches(etag):
+    """
+    True when If-None-Match lists etag or one of its compressed variants
+    ('<etag>-gzip', '<etag>-br'; see app.compression).
+    """
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return False
+    return any(if_none_match.contains(etag + suffix) for suffix in ('', '-gzip', '-br'))
+
+
+def _http_date(value):
+    """Stored timestamps are naive UTC; HTTP dates have second precision."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.replace(microsecond=0)
+
+
+def add_validators(response, etag, last_modified=None):
+    """Attach ETag/Last-Modified and ask caches to revalidate before reuse."""
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = _http_date(last_modified)
+    response.cache_control.no_cache = True
+    return response
+
+
+def not_modified(etag, last_modified=None):
+    """
+    Return a 304 response when the request's validators still match, else None.
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2).
+    """
+    if request.if_none_match:
+        if not etag_matches(etag):
+            return None
+    elif last_modified is None or request.if_modified_since is None:
+        return None
+    elif _http_date(last_modified) > request.if_modified_since:
+        return None
+    return add_validators(make_response('', 304), etag, last_modified)
@@ -4,3 +4,92 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///booklib.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-key')
+    # Logging: level (DEBUG in development, INFO otherwise), 'json' or 'text' lines, and a file
+    # ('' for stderr only, the default unless developing outside tests)
+    LOG_LEVEL = os.environ.get('LOG_LEVEL') or ('DEBUG' if os.environ.get('FLASK_ENV') == 'development' else 'INFO')
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')
+    LOG_FILE = os.environ.get('LOG_FILE', os.path.join(os.path.dirname(__file__), 'logs', 'app.log')
+                              if os.environ.get('FLASK_ENV') == 'development' and not os.environ.get('TESTING') else '')
+    # Records buffered for the writer thread (more are dropped), and the fraction of DEBUG records kept
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', 10000))
+    LOG_DEBUG_SAMPLE_RATE = float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', 1.0))
+    # Connection pool per worker process: 'queue' (DB_POOL_SIZE + DB_MAX_OVERFLOW) or 'pgbouncer' (no app-side pool)
+    DB_POOL_MODE = os.environ.get('DB_POOL_MODE', 'queue')
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+    # Postgres statement_timeout in milliseconds; 0 disables
+    DB_STATEMENT_TIMEOUT = int(os.environ.get('DB_STATEMENT_TIMEOUT', 0))
+    # Password hashing: argon2id, bcrypt or pbkdf2; hashes with another scheme or cost are upgraded at login
+    PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'argon2id')
+    PASSWORD_ARGON2_TIME_COST = int(os.environ.get('PASSWORD_ARGON2_TIME_COST', 2))
+    PASSWORD_ARGON2_MEMORY_COST = int(os.environ.get('PASSWORD_ARGON2_MEMORY_COST', 19456))  # KiB
+    PASSWORD_ARGON2_PARALLELISM = int(os.environ.get('PASSWORD_ARGON2_PARALLELISM', 1))
+    PASSWORD_BCRYPT_ROUNDS = int(os.environ.get('PASSWORD_BCRYPT_ROUNDS', 12))
+    PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get('PASSWORD_PBKDF2_ITERATIONS', 600000))
+    # Concurrent hashes per worker process and extra requests allowed to wait; more get a 503 at once.
+    # Keep the sum below gunicorn's --threads (4 in the Dockerfile) so other requests always get a thread
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 1))
+    # Per-process cache of the JWT user (id, username, active flag); commits evict changed users
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 1024))
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 30))
+    # Read replicas for GET requests (comma-separated URLs); empty sends everything to the primary
+    SQLALCHEMY_REPLICA_URIS = [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    REPLICA_MAX_LAG = float(os.environ.get('REPLICA_MAX_LAG', 5))
+    REPLICA_LAG_CHECK_INTERVAL = float(os.environ.get('REPLICA_LAG_CHECK_INTERVAL', 5))
+    REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+    # Prometheus metrics on /metrics; set PROMETHEUS_MULTIPROC_DIR to aggregate gunicorn workers
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    # Readiness prober (/health, /health/ready): seconds between checks, pool stats, plugin host reachability
+    HEALTH_CHECK_INTERVAL = float(os.environ.get('HEALTH_CHECK_INTERVAL', 10))
+    HEALTH_INCLUDE_POOL = os.environ.get('HEALTH_INCLUDE_POOL', 'true').lower() in ('1', 'true', 'yes')
+    HEALTH_CHECK_PLUGINS = os.environ.get('HEALTH_CHECK_PLUGINS', 'false').lower() in ('1', 'true', 'yes')
+    HEALTH_PLUGIN_TIMEOUT = float(os.environ.get('HEALTH_PLUGIN_TIMEOUT', 2))
+    # Keyset pagination for list endpoints
+    PAGE_SIZE = int(os.environ.get('PAGE_SIZE', 50))
+    MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 200))
+    # Max ratings/comments/reviews embedded per section in /books/<id>/full
+    FULL_SECTION_LIMIT = int(os.environ.get('FULL_SECTION_LIMIT', 20))
+    # Max values returned per facet by /books/facets
+    FACET_LIMIT = int(os.environ.get('FACET_LIMIT', 20))
+    # Seconds between plugin folder mtime checks; 0 disables (reload via POST /plugins/reload)
+    PLUGIN_RELOAD_INTERVAL = int(os.environ.get('PLUGIN_RELOAD_INTERVAL', 0))
+    # Plugin enrichment cache; set ENRICHMENT_CACHE_PATH to a file to share/persist entries
+    ENRICHMENT_CACHE_SIZE = int(os.environ.get('ENRICHMENT_CACHE_SIZE', 2048))
+    ENRICHMENT_CACHE_TTL = int(os.environ.get('ENRICHMENT_CACHE_TTL', 86400))
+    ENRICHMENT_CACHE_NEGATIVE_TTL = int(os.environ.get('ENRICHMENT_CACHE_NEGATIVE_TTL', 3600))
+    ENRICHMENT_CACHE_PATH = os.environ.get('ENRICHMENT_CACHE_PATH', '')
+    # Seconds one plugin lookup may take in total (Open Library: ISBN record plus authors), and author fetch threads
+    ENRICHMENT_DEADLINE = float(os.environ.get('ENRICHMENT_DEADLINE', 10))
+    OPENLIBRARY_AUTHOR_WORKERS = int(os.environ.get('OPENLIBRARY_AUTHOR_WORKERS', 8))
+    # Response cache for hot reads: 'sqlite' (workers of one host, RESPONSE_CACHE_PATH, default instance/response_cache.db),
+    # 'redis' (all hosts, RESPONSE_CACHE_URL), 'memory' (single process only) or 'none'
+    RESPONSE_CACHE_TYPE = os.environ.get('RESPONSE_CACHE_TYPE', 'sqlite')
+    RESPONSE_CACHE_PATH = os.environ.get('RESPONSE_CACHE_PATH', '')
+    RESPONSE_CACHE_URL = os.environ.get('RESPONSE_CACHE_URL', '')
+    RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 1024))
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 60))
+    RESPONSE_CACHE_LOCK_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_LOCK_TIMEOUT', 5))
+    # Outbound HTTP (plugins): per-host pool size, retries with backoff, timeouts in seconds
+    HTTP_POOL_CONNECTIONS = int(os.environ.get('HTTP_POOL_CONNECTIONS', 10))
+    HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', 10))
+    HTTP_RETRIES = int(os.environ.get('HTTP_RETRIES', 2))
+    HTTP_BACKOFF_FACTOR = float(os.environ.get('HTTP_BACKOFF_FACTOR', 0.3))
+    HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', 3.05))
+    HTTP_READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', 10))
+    # Bulk import (POST /books/bulk, flask import-books). The per-request cap keeps enrichment (one plugin call
+    # per record, BULK_IMPORT_WORKERS at a time) well inside gunicorn's 120s timeout; the CLI has no cap
+    BULK_IMPORT_MAX_ITEMS = int(os.environ.get('BULK_IMPORT_MAX_ITEMS', 500))
+    BULK_IMPORT_WORKERS = int(os.environ.get('BULK_IMPORT_WORKERS', 8))
+    BULK_IMPORT_CHUNK_SIZE = int(os.environ.get('BULK_IMPORT_CHUNK_SIZE', 500))
+    # Response compression (gzip, or brotli when the package is installed) for bodies of at least COMPRESS_MIN_SIZE bytes
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 4))
+    # Rows fetched per server-side cursor batch by the /export streams
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+    # Postgres text search configuration used for the book search index
+    SEARCH_TEXT_CONFIG = os.environ.get('SEARCH_TEXT_CONFIG', 'english')
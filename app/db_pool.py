@@ -0,0 +1,158 @@
+"""
+SQLAlchemy engine options from DB_POOL_* settings, and connection pool metrics.
+
+DB_POOL_MODE=queue (default) keeps up to DB_POOL_SIZE idle connections per
+worker process and opens at most DB_MAX_OVERFLOW extra ones under load.
+DB_POOL_MODE=pgbouncer is for a local transaction-pooling PgBouncer: the
+app keeps no idle connections (NullPool) and the pooler owns the server
+connection budget. See README_DEPLOYMENT.md for sizing.
+"""
+import logging
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import NullPool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+POOL_MODES = ('queue', 'pgbouncer')
+
+
+class _TimedPool:
+    """Pool mixin recording how long each checkout waited for a connection."""
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeout:
+            pool_metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+
+class TimedQueuePool(_TimedPool, QueuePool):
+    pass
+
+
+class TimedNullPool(_TimedPool, NullPool):
+    pass
+
+
+def engine_options(config):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for config's database URL and DB_POOL_* settings.
+    SQLite keeps the pool SQLAlchemy picks for it (one connection for :memory:).
+    """
+    backend = make_url(config['SQLALCHEMY_DATABASE_URI']).get_backend_name()
+    if backend == 'sqlite':
+        return {}
+    mode = config['DB_POOL_MODE']
+    if mode not in POOL_MODES:
+        raise ValueError(f"DB_POOL_MODE must be one of {', '.join(POOL_MODES)}, not {mode!r}")
+    if mode == 'pgbouncer':
+        if config['DB_STATEMENT_TIMEOUT']:
+            # Startup options do not pass through PgBouncer; set it on the role instead
+            logger.warning("DB_STATEMENT_TIMEOUT is ignored with DB_POOL_MODE=pgbouncer")
+        return {'poolclass': TimedNullPool}
+    options = {
+        'poolclass': TimedQueuePool,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+    if config['DB_STATEMENT_TIMEOUT'] and backend == 'postgresql':
+        options['connect_args'] = {'options': f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT']}"}
+    return options
+
+
+class PoolMetrics:
+    """
+    Per-process pool counters fed by pool events and the timed pool classes.
+    Each gunicorn worker has its own pool, so these describe one worker.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.mode = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connects = 0
+            self.invalidations = 0
+            self.checkouts = 0
+            self.checked_out = 0
+            self.timeouts = 0
+            self.waits = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def init_app(self, app, engine):
+        self.mode = app.config['DB_POOL_MODE']
+        self.max_overflow = app.config['DB_MAX_OVERFLOW']
+        if not event.contains(engine, 'connect', self._on_connect):
+            event.listen(engine, 'connect', self._on_connect)
+            event.listen(engine, 'checkout', self._on_checkout)
+            event.listen(engine, 'checkin', self._on_checkin)
+            event.listen(engine, 'invalidate', self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checked_out = max(self.checked_out - 1, 0)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        # Stale connections found by pre-ping or failing mid-query (e.g. after a failover)
+        with self._lock:
+            self.invalidations += 1
+
+    def record_wait(self, seconds, timed_out=False):
+        with self._lock:
+            self.waits += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def stats(self, engine):
+        pool = engine.pool
+        with self._lock:
+            stats = {
+                'mode': self.mode,
+                'pool': type(pool).__name__,
+                'checked_out': self.checked_out,
+                'checkouts': self.checkouts,
+                'connects': self.connects,
+                'invalidations': self.invalidations,
+                'timeouts': self.timeouts,
+                'wait_ms': {
+                    'count': self.waits,
+                    'avg': round(self.wait_total * 1000 / self.waits, 3) if self.waits else 0.0,
+                    'max': round(self.wait_max * 1000, 3),
+                    'total': round(self.wait_total * 1000, 3),
+                },
+            }
+        if isinstance(pool, QueuePool):
+            stats.update({
+                'size': pool.size(),
+                'checked_in': pool.checkedin(),
+                # QueuePool counts overflow from -size; only connections beyond size are overflow
+                'overflow': max(pool.overflow(), 0),
+                'max_overflow': self.max_overflow,
+            })
+        return stats
+
+
+pool_metrics = PoolMetrics()
@@ -0,0 +1,234 @@
+"""
+Read-replica routing for the Flask-SQLAlchemy session.
+
+Statements issued while handling a GET/HEAD request go to a replica from
+SQLALCHEMY_REPLICA_URIS, picked round-robin once per request so a request
+sees one consistent snapshot. Everything else uses the primary: other
+methods, flushes and DML, reads after the request has written, CLI and
+background work, and use_primary() blocks.
+
+Read-your-writes across requests: a successful write request sets a short
+lived cookie that keeps the client's reads on the primary for
+REPLICA_STICKY_SECONDS. Authenticated writes also pin the JWT identity for
+the same time, so API clients that drop cookies still read their writes; the
+pin lives in the shared response cache backend when there is one, and in the
+worker otherwise. Replicas lagging more than REPLICA_MAX_LAG seconds,
+or failing the lag check, are skipped until the next check; with none left,
+reads fall back to the primary. Views behind the response cache are always
+computed on the primary, so a lagging replica never ends up in a cached entry.
+"""
+import itertools
+import math
+import threading
+import logging
+import time
+from contextlib import contextmanager
+from flask import g, has_request_context, request
+from flask_jwt_extended import decode_token
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+READ_METHODS = ('GET', 'HEAD')
+STICKY_COOKIE = 'db_primary_until'
+PIN_PREFIX = 'db_primary_until:'
+PINNED_ENVIRON_KEY = 'booklib.db_pinned'
+
+logger = logging.getLogger(__name__)
+
+# Seconds the replica is behind; 0 when it has replayed everything it received
+POSTGRES_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class Replica:
+    def __init__(self, engine):
+        self.engine = engine
+        self.name = make_url(engine.url).render_as_string(hide_password=True)
+        self.lag = 0.0
+        self.checked_at = None
+        self.error = None
+        self.reads = 0
+
+    def check_lag(self):
+        """Measure replication lag; unreachable replicas count as infinitely behind."""
+        try:
+            with self.engine.connect() as connection:
+                if self.engine.dialect.name == 'postgresql':
+                    self.lag = float(connection.execute(POSTGRES_LAG_QUERY).scalar() or 0)
+                else:
+                    # No replication to measure (e.g. a SQLite file standing in for a replica)
+                    connection.execute(text('SELECT 1'))
+                    self.lag = 0.0
+            self.error = None
+        except Exception as e:
+            self.lag, self.error = math.inf, str(e)
+        self.checked_at = time.monotonic()
+
+
+class ReplicaRouter:
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._check_lock = threading.Lock()
+        self._pins = {}
+        self.replicas = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        from app.db_pool import engine_options
+        self.max_lag = app.config.get('REPLICA_MAX_LAG', 5)
+        self.check_interval = app.config.get('REPLICA_LAG_CHECK_INTERVAL', 5)
+        self.sticky_seconds = app.config.get('REPLICA_STICKY_SECONDS', 5)
+        self.replicas = [
+            Replica(create_engine(uri, **engine_options(dict(app.config, SQLALCHEMY_DATABASE_URI=uri))))
+            for uri in app.config.get('SQLALCHEMY_REPLICA_URIS') or ()
+        ]
+        self._cycle = itertools.cycle(self.replicas)
+        self._pins = {}
+        self.fallbacks = 0
+        app.after_request(self.after_request)
+
+    def after_request(self, response):
+        """Pin the client, and the user it is authenticated as, to the primary for a while after it wrote something."""
+        if self.replicas and request.method not in READ_METHODS + ('OPTIONS',) and response.status_code < 400:
+            until = time.time() + self.sticky_seconds
+            response.set_cookie(STICKY_COOKIE, str(until),
+                                max_age=self.sticky_seconds, httponly=True, samesite='Lax')
+            identity = self._identity()
+            if identity is not None:
+                self._pin(identity, until)
+        return response
+
+    def _identity(self):
+        """JWT identity of the current request, or None; no user lookup, so it is safe inside get_bind."""
+        header = request.headers.get('Authorization', '')
+        if not header.startswith('Bearer '):
+            return None
+        try:
+            return str(decode_token(header[7:])['sub'])
+        except Exception:
+            return None
+
+    def _pin(self, identity, until):
+        with self._lock:
+            now = time.time()
+            for key in [key for key, expires in self._pins.items() if expires < now]:
+                del self._pins[key]
+            self._pins[identity] = until
+        from app.response_cache import response_cache
+        if response_cache.enabled:
+            try:
+                response_cache.backend.set(PIN_PREFIX + identity, until, self.sticky_seconds)
+            except Exception as e:
+                logger.warning(f'Could not share primary pin for user {identity}: {e}')
+
+    def _identity_pinned(self, identity):
+        if self._pins.get(identity, 0) >= time.time():
+            return True
+        from app.response_cache import response_cache
+        if not response_cache.enabled:
+            return False
+        try:
+            return (response_cache.backend.get(PIN_PREFIX + identity) or 0) >= time.time()
+        except Exception as e:
+            logger.warning(f'Could not read primary pin for user {identity}: {e}')
+            return False
+
+    def pinned(self):
+        """True when the current request comes from a client or user that wrote within REPLICA_STICKY_SECONDS."""
+        if not self.replicas:
+            return False
+        # Cached on the request: routing asks for every statement
+        if PINNED_ENVIRON_KEY not in request.environ:
+            try:
+                pinned = float(request.cookies.get(STICKY_COOKIE, 0)) >= time.time()
+            except ValueError:
+                pinned = False
+            if not pinned:
+                identity = self._identity()
+                pinned = identity is not None and self._identity_pinned(identity)
+            request.environ[PINNED_ENVIRON_KEY] = pinned
+        return request.environ[PINNED_ENVIRON_KEY]
+
+    def wants_replica(self):
+        if not self.replicas or not has_request_context() or request.method not in READ_METHODS:
+            return False
+        return not g.get('db_use_primary') and not self.pinned()
+
+    def _refresh(self, replica):
+        if replica.checked_at is not None and time.monotonic() - replica.checked_at < self.check_interval:
+            return
+        # One thread checks at a time; the others keep routing on the last result
+        if not self._check_lock.acquire(blocking=replica.checked_at is None):
+            return
+        try:
+            if replica.checked_at is None or time.monotonic() - replica.checked_at >= self.check_interval:
+                replica.check_lag()
+        finally:
+            self._check_lock.release()
+
+    def choose(self):
+        """Next replica within REPLICA_MAX_LAG, or None to use the primary."""
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                replica = next(self._cycle)
+            self._refresh(replica)
+            if replica.lag <= self.max_lag:
+                replica.reads += 1
+                return replica.engine
+        self.fallbacks += 1
+        return None
+
+    def stats(self):
+        return {
+            'replicas': [
+                {'url': r.name, 'lag': None if math.isinf(r.lag) else r.lag, 'error': r.error, 'reads': r.reads}
+                for r in self.replicas
+            ],
+            'max_lag': self.max_lag,
+            'fallbacks': self.fallbacks,
+        } if self.replicas else {'replicas': []}
+
+
+replica_router = ReplicaRouter()
+
+
+@contextmanager
+def use_primary():
+    """Route reads in this block to the primary, e.g. when they must see the latest writes."""
+    previous = g.get('db_use_primary', False)
+    g.db_use_primary = True
+    try:
+        yield
+    finally:
+        g.db_use_primary = previous
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends GET request reads to a replica."""
+    def _request_route(self):
+        """Per-request routing state: the chosen replica, and whether we have written."""
+        current = request._get_current_object()
+        route = getattr(self, '_route', None)
+        if route is None or route['request'] is not current:
+            route = self._route = {'request': current, 'engine': None, 'chosen': False, 'wrote': False}
+        return route
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and replica_router.wants_replica():
+            route = self._request_route()
+            if self._flushing or getattr(clause, 'is_dml', False):
+                route['wrote'] = True
+            elif not route['wrote']:
+                if not route['chosen']:
+                    route['engine'], route['chosen'] = replica_router.choose(), True
+                if route['engine'] is not None:
+                    return route['engine']
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+    def close(self):
+        self._route = None
+        super().close()
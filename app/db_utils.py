@@ -2,11 +2,9 @@
 Database connection utilities with graceful error handling
 """
 import logging
-import socket
 from functools import wraps
 from flask import jsonify
 from sqlalchemy.exc import OperationalError, DatabaseError
-from app import db
 
 logger = logging.getLogger(__name__)
 
@@ -41,41 +39,19 @@ def handle_db_errors(f):
             }), 500
     return decorated_function
 
-def check_db_connection():
-    """
-    Check if database connection is available
-    Returns: (is_connected: bool, error_message: str)
-    """
-    try:
-        # Simple query to test connection
-        db.session.execute(db.text('SELECT 1'))
-        db.session.commit()
-        return True, None
-    except OperationalError as e:
-        logger.warning(f"Database connection check failed: {e}")
-        return False, str(e)
-    except Exception as e:
-        logger.error(f"Unexpected error during database check: {e}")
-        return False, str(e)
-
 def get_health_status():
     """
-    Get comprehensive health status including database connectivity
+    Get comprehensive health status including database connectivity.
+    Reads the readiness prober's last check instead of querying per call.
     """
-    db_connected, db_error = check_db_connection()
-    
-    status = {
-        'status': 'healthy' if db_connected else 'degraded',
-        'server': socket.gethostname(),
+    from app.health import health_prober
+    body, ready = health_prober.readiness()
+    return {
+        'status': 'healthy' if ready else 'degraded',
+        'server': body['server'],
         'database': {
-            'connected': db_connected,
-            'error': db_error if not db_connected else None
+            'connected': body['database']['connected'],
+            'error': body['database']['error']
         },
-        'timestamp': None
+        'timestamp': body['checked_at']
     }
-    
-    # Add timestamp
-    from datetime import datetime, timezone
-    status['timestamp'] = datetime.now(timezone.utc).isoformat()
-    
-    return status
\ No newline at end of file
@@ -0,0 +1,184 @@
+"""
+TTL + LRU cache for plugin enrichment results, keyed by (plugin, ISBN)
+"""
+import copy
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from app.metrics import observe_plugin_call, record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_isbn(isbn):
+    if not isbn:
+        return None
+    return str(isbn).replace('-', '').replace(' ', '').upper() or None
+
+
+class EnrichmentCache:
+    """
+    In-process LRU with per-entry expiry, plus an optional SQLite tier so
+    entries survive worker restarts and are shared between workers.
+    Successful lookups live for `ttl` seconds; results flagged `not_found`
+    by a plugin are cached for `negative_ttl`; other errors are not cached.
+    """
+    def __init__(self, max_size=2048, ttl=86400, negative_ttl=3600, path=None):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._writes = 0
+        self.hits = self.misses = self.negative_hits = self.evictions = 0
+        self.configure(max_size, ttl, negative_ttl, path)
+
+    def init_app(self, app):
+        self.configure(
+            app.config.get('ENRICHMENT_CACHE_SIZE', 2048),
+            app.config.get('ENRICHMENT_CACHE_TTL', 86400),
+            app.config.get('ENRICHMENT_CACHE_NEGATIVE_TTL', 3600),
+            app.config.get('ENRICHMENT_CACHE_PATH') or None,
+        )
+
+    def configure(self, max_size, ttl, negative_ttl, path=None):
+        with self._lock:
+            self.max_size = max_size
+            self.ttl = ttl
+            self.negative_ttl = negative_ttl
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+            if path:
+                self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+                self._db.execute('PRAGMA journal_mode=WAL')
+                self._db.execute(
+                    'CREATE TABLE IF NOT EXISTS enrichment_cache '
+                    '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)'
+                )
+                self._db.execute('DELETE FROM enrichment_cache WHERE expires_at < ?', (time.time(),))
+
+    @staticmethod
+    def _key(plugin, isbn):
+        return f'{plugin}:{isbn}'
+
+    def get(self, plugin, isbn):
+        """
+        Returns: (hit: bool, value) - value is a private copy safe to mutate
+        """
+        key = self._key(plugin, isbn)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] < now:
+                del self._entries[key]
+                entry = None
+            if entry is None and self._db is not None:
+                row = self._db.execute(
+                    'SELECT value, expires_at FROM enrichment_cache WHERE key = ? AND expires_at >= ?',
+                    (key, now)
+                ).fetchone()
+                if row:
+                    entry = (json.loads(row[0]), row[1])
+                    self._store(key, entry)
+            if entry is None:
+                self.misses += 1
+                record_cache_lookup('enrichment', 'miss')
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            record_cache_lookup('enrichment', 'hit')
+            if entry[0].get('not_found'):
+                self.negative_hits += 1
+            return True, copy.deepcopy(entry[0])
+
+    def set(self, plugin, isbn, value):
+        if not isinstance(value, dict):
+            return
+        if 'error' not in value:
+            ttl = self.ttl
+        elif value.get('not_found'):
+            ttl = self.negative_ttl
+        else:
+            return
+        if ttl <= 0:
+            return
+        key = self._key(plugin, isbn)
+        entry = (copy.deepcopy(value), time.time() + ttl)
+        with self._lock:
+            self._store(key, entry)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        'INSERT OR REPLACE INTO enrichment_cache (key, value, expires_at) VALUES (?, ?, ?)',
+                        (key, json.dumps(entry[0]), entry[1])
+                    )
+                    self._writes += 1
+                    if self._writes % 256 == 0:
+                        self._db.execute('DELETE FROM enrichment_cache WHERE expires_at < ?', (time.time(),))
+                except sqlite3.Error as e:
+                    logger.warning(f'Enrichment cache write failed: {e}')
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute('DELETE FROM enrichment_cache')
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'negative_hits': self.negative_hits,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / lookups if lookups else None,
+                'persistent': self._db is not None
+            }
+
+
+class CachedPlugin:
+    """Wraps a plugin instance so ISBN lookups go through the enrichment cache."""
+    def __init__(self, name, plugin, cache):
+        self.name = name
+        self.plugin = plugin
+        self.cache = cache
+
+    def _call(self, data):
+        start = time.perf_counter()
+        outcome = 'error'
+        try:
+            value = self.plugin.run(data)
+            if not (isinstance(value, dict) and 'error' in value):
+                outcome = 'ok'
+            return value
+        finally:
+            observe_plugin_call(self.name, time.perf_counter() - start, outcome)
+
+    def run(self, data):
+        isbn = normalize_isbn((data or {}).get('isbn'))
+        if not isbn:
+            return self._call(data)
+        hit, value = self.cache.get(self.name, isbn)
+        if hit:
+            return value
+        value = self._call(data)
+        self.cache.set(self.name, isbn, value)
+        return value
+
+    def __getattr__(self, attr):
+        return getattr(self.plugin, attr)
+
+
+enrichment_cache = EnrichmentCache()
@@ -0,0 +1,137 @@
+"""
+Readiness prober: a background thread per worker process checks the primary
+database (and, with HEALTH_CHECK_PLUGINS, the plugin hosts) every
+HEALTH_CHECK_INTERVAL seconds. /health and /health/ready return the last
+result, so probes do not touch the database themselves.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from sqlalchemy import text
+from app import db
+from app.db_pool import pool_metrics
+from app.http_client import http_client
+from app.plugin_loader import registry
+
+logger = logging.getLogger(__name__)
+
+
+class HealthProber:
+    def __init__(self, app=None):
+        self.app = None
+        self.interval = 10
+        self._snapshot = None
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.stop()
+        self.app = app
+        self.interval = app.config.get('HEALTH_CHECK_INTERVAL', 10)
+        self.include_pool = app.config.get('HEALTH_INCLUDE_POOL', True)
+        self.check_plugins = app.config.get('HEALTH_CHECK_PLUGINS', False)
+        self.plugin_timeout = app.config.get('HEALTH_PLUGIN_TIMEOUT', 2)
+        self._snapshot = None
+
+    def _check_database(self):
+        start = time.perf_counter()
+        try:
+            with db.engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+        except Exception as e:
+            logger.warning(f"Readiness database check failed: {e}")
+            return {'connected': False, 'error': str(e), 'latency_ms': None}
+        return {'connected': True, 'error': None, 'latency_ms': round((time.perf_counter() - start) * 1000, 2)}
+
+    def _check_plugins(self):
+        """Reachability of each plugin's health_url; plugins without one are skipped."""
+        results = {}
+        for name, plugin in registry.all().items():
+            url = getattr(plugin, 'health_url', None)
+            if not url:
+                continue
+            try:
+                status = http_client.session.head(url, timeout=self.plugin_timeout, allow_redirects=True).status_code
+                results[name] = {'reachable': status < 500, 'status': status}
+            except Exception as e:
+                results[name] = {'reachable': False, 'error': str(e)}
+        return results
+
+    def check(self):
+        """Run every check now. Returns: the readiness snapshot"""
+        snapshot = {
+            'database': self._check_database(),
+            'checked_at': datetime.now(timezone.utc).isoformat(),
+            'checked_monotonic': time.monotonic(),
+        }
+        if self.check_plugins:
+            snapshot['plugins'] = self._check_plugins()
+        self._snapshot = snapshot
+        return snapshot
+
+    def _run(self, app, stop):
+        while not stop.wait(self.interval):
+            try:
+                with app.app_context():
+                    self.check()
+            except Exception as e:
+                logger.error(f"Readiness prober failed: {e}")
+
+    def _ensure_started(self):
+        # One prober per process: threads do not survive gunicorn's fork
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._stop = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(self.app, self._stop),
+                                                name='health-prober', daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def snapshot(self):
+        """Last readiness result; the first call in a process checks synchronously."""
+        self._ensure_started()
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                snapshot = self._snapshot or self.check()
+        return snapshot
+
+    def readiness(self):
+        """Returns: (body, ready) where body is JSON-ready and excludes internal fields"""
+        snapshot = self.snapshot()
+        age = time.monotonic() - snapshot['checked_monotonic']
+        # A prober that stopped refreshing must not keep reporting an old success
+        stale = age > 3 * self.interval
+        ready = snapshot['database']['connected'] and not stale
+        body = {
+            'status': 'ready' if ready else 'not_ready',
+            'server': socket.gethostname(),
+            'database': snapshot['database'],
+            'checked_at': snapshot['checked_at'],
+            'age_seconds': round(age, 3),
+            'stale': stale,
+        }
+        if 'plugins' in snapshot:
+            body['plugins'] = snapshot['plugins']
+        if self.include_pool:
+            body['pool'] = pool_metrics.stats(db.engine)
+        return body, ready
+
+    def stop(self):
+        with self._lock:
+            if self._thread is not None:
+                self._stop.set()
+            self._thread = None
+            self._pid = None
+
+
+health_prober = HealthProber()
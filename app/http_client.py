@@ -0,0 +1,118 @@
+"""
+Shared, pooled HTTP session for outbound calls made by plugins
+"""
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+USER_AGENT = 'BookLibAPI/1.0'
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class HttpClient:
+    """
+    One keep-alive requests.Session per worker process. The session is
+    rebuilt after a fork so gunicorn workers never share sockets.
+    pool_maxsize caps connections per host; pool_block makes callers wait
+    for a free connection instead of opening extra ones.
+    Calls given a deadline use a session without automatic retries and
+    retry themselves only while the deadline leaves room for the backoff.
+    """
+    def __init__(self):
+        self.pool_connections = 10
+        self.pool_maxsize = 10
+        self.retries = 2
+        self.backoff_factor = 0.3
+        self.timeout = (3.05, 10)
+        self._sessions = {}
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.pool_connections = app.config.get('HTTP_POOL_CONNECTIONS', 10)
+        self.pool_maxsize = app.config.get('HTTP_POOL_MAXSIZE', 10)
+        self.retries = app.config.get('HTTP_RETRIES', 2)
+        self.backoff_factor = app.config.get('HTTP_BACKOFF_FACTOR', 0.3)
+        self.timeout = (app.config.get('HTTP_CONNECT_TIMEOUT', 3.05), app.config.get('HTTP_READ_TIMEOUT', 10))
+        self.close()
+
+    def _build_session(self, retries):
+        retry = Retry(
+            total=retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry,
+            pool_block=True,
+        )
+        session = requests.Session()
+        session.headers['User-Agent'] = USER_AGENT
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def _session_for(self, retrying):
+        session = self._sessions.get(retrying) if self._pid == os.getpid() else None
+        if session is None:
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._sessions = {}
+                    self._pid = os.getpid()
+                if retrying not in self._sessions:
+                    self._sessions[retrying] = self._build_session(self.retries if retrying else 0)
+                session = self._sessions[retrying]
+        return session
+
+    @property
+    def session(self):
+        return self._session_for(True)
+
+    def get(self, url, deadline=None, **kwargs):
+        """deadline: time.monotonic() value bounding every attempt, retries and backoff included"""
+        if deadline is None:
+            kwargs.setdefault('timeout', self.timeout)
+            return self.session.get(url, **kwargs)
+        session = self._session_for(False)
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise requests.Timeout(f'Deadline passed before GET {url}')
+            timeout = (min(self.timeout[0], remaining), min(self.timeout[1], remaining))
+            try:
+                resp = session.get(url, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if not self._backoff(attempt, deadline):
+                    raise
+            else:
+                if resp.status_code not in RETRY_STATUSES or not self._backoff(attempt, deadline):
+                    return resp
+                resp.close()
+            attempt += 1
+
+    def _backoff(self, attempt, deadline):
+        """Sleep before retry number attempt + 1; False when retries or the deadline are used up."""
+        delay = self.backoff_factor * (2 ** attempt)
+        if attempt >= self.retries or time.monotonic() + delay >= deadline:
+            return False
+        time.sleep(delay)
+        return True
+
+    def close(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                for session in self._sessions.values():
+                    session.close()
+            self._sessions = {}
+            self._pid = None
+
+
+http_client = HttpClient()
@@ -0,0 +1,49 @@
+"""
+Flask JSON provider backed by orjson when it is installed, stdlib json otherwise
+"""
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Drop-in for Flask's default provider: same key sorting and fallbacks for
+    dates, decimals and dataclasses, but encoding through orjson's C
+    implementation. Responses are built from bytes, skipping a str round trip.
+    """
+    def _orjson_options(self, indent=False):
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._orjson_options()).decode()
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits, which only the stdlib encoder handles
+            return super().dumps(obj)
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        try:
+            body = orjson.dumps(obj, default=self.default, option=self._orjson_options(indent))
+        except orjson.JSONEncodeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
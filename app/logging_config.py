@@ -0,0 +1,129 @@
+"""
+Logging configured by create_app: request threads only put records on a
+bounded in-memory queue; a background QueueListener thread formats them
+(JSON by default) and writes them to stderr and, when set, LOG_FILE.
+
+When the queue is full, records are dropped and logging never blocks a
+request; the next queued record carries the number dropped. DEBUG records are sampled at LOG_DEBUG_SAMPLE_RATE
+before they are queued.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from flask import has_request_context, request
+
+# Attributes every LogRecord has; anything else was passed through extra={...}
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+TEXT_FORMAT = '%(asctime)s %(levelname)s %(name)s %(message)s'
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, request and extra fields."""
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRS)
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DebugSampler(logging.Filter):
+    """Keep a random fraction of DEBUG records; other levels always pass."""
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno > logging.DEBUG or self.rate >= 1 or random.random() < self.rate
+
+
+class AsyncQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueue without blocking and without formatting. The message is resolved
+    here because its args may change after the call returns. Tracebacks are
+    formatted later on the listener thread.
+    """
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        record = logging.makeLogRecord(vars(record))
+        record.msg, record.args = record.getMessage(), None
+        if has_request_context():
+            record.method = request.method
+            record.path = request.path
+            record.remote_addr = request.remote_addr
+        return record
+
+    def enqueue(self, record):
+        dropped = self.dropped
+        if dropped:
+            record.dropped = dropped  # reported on the next record that gets through
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+        else:
+            self.dropped -= dropped
+
+
+_lock = threading.Lock()
+_installed = {}
+
+
+def _stop():
+    listener = _installed.pop('listener', None)
+    handler = _installed.pop('handler', None)
+    if handler is not None:
+        logging.getLogger().removeHandler(handler)
+    if listener is not None:
+        listener.stop()
+        for target in listener.handlers:
+            target.close()
+
+
+def configure_logging(app):
+    """Install the queue handler on the root logger, replacing one from an earlier create_app."""
+    config = app.config
+    formatter = JsonFormatter() if config['LOG_FORMAT'] == 'json' else logging.Formatter(TEXT_FORMAT)
+    targets = [logging.StreamHandler()]
+    if config['LOG_FILE']:
+        os.makedirs(os.path.dirname(os.path.abspath(config['LOG_FILE'])), exist_ok=True)
+        targets.append(logging.FileHandler(config['LOG_FILE']))
+    for target in targets:
+        target.setFormatter(formatter)
+
+    log_queue = queue.Queue(maxsize=config['LOG_QUEUE_SIZE'])
+    handler = AsyncQueueHandler(log_queue)
+    handler.addFilter(DebugSampler(config['LOG_DEBUG_SAMPLE_RATE']))
+    listener = logging.handlers.QueueListener(log_queue, *targets)
+
+    with _lock:
+        _stop()
+        root = logging.getLogger()
+        root.setLevel(config['LOG_LEVEL'].upper())
+        root.addHandler(handler)
+        listener.start()
+        _installed.update(handler=handler, listener=listener)
+    return handler
+
+
+@atexit.register
+def _flush_on_exit():
+    """Write out what is still queued when the process exits."""
+    with _lock:
+        _stop()
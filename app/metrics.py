@@ -0,0 +1,116 @@
+"""
+Prometheus metrics: per-endpoint request latency, response size, SQL query
+count and SQL time, plugin call latency and cache lookups, served on /metrics.
+
+With PROMETHEUS_MULTIPROC_DIR set (see the Dockerfile and gunicorn.conf.py),
+every gunicorn worker writes its samples there and /metrics aggregates all
+workers; without it, /metrics reports the serving process only.
+
+Endpoints are labelled by Flask endpoint name (e.g. 'books.get_books').
+Latency is measured until the response is returned, so for streamed
+responses (the /export routes) it covers time to first byte only.
+"""
+import os
+import time
+from flask import Response, g, has_request_context, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+REQUEST_LATENCY = Histogram(
+    'booklib_http_request_duration_seconds', 'Request latency', ['endpoint', 'method'],
+    buckets=(.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10),
+)
+REQUESTS = Counter('booklib_http_requests_total', 'Requests by status', ['endpoint', 'method', 'status'])
+RESPONSE_SIZE = Histogram(
+    'booklib_http_response_size_bytes', 'Response body size as sent (after compression)', ['endpoint'],
+    buckets=(100, 1000, 10000, 100000, 1000000, 10000000),
+)
+REQUEST_QUERIES = Histogram(
+    'booklib_http_request_db_queries', 'SQL statements executed per request', ['endpoint'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+REQUEST_DB_TIME = Histogram(
+    'booklib_http_request_db_seconds', 'Time spent in SQL statements per request', ['endpoint'],
+    buckets=(.001, .005, .01, .025, .05, .1, .25, .5, 1, 5),
+)
+PLUGIN_LATENCY = Histogram(
+    'booklib_plugin_call_duration_seconds', 'Plugin calls that missed the enrichment cache', ['plugin', 'outcome'],
+    buckets=(.05, .1, .25, .5, 1, 2.5, 5, 10, 30),
+)
+CACHE_LOOKUPS = Counter('booklib_cache_lookups_total', 'Cache lookups by result', ['cache', 'result'])
+
+
+def record_cache_lookup(cache, result):
+    """result: 'hit', 'stale_hit' or 'miss'"""
+    CACHE_LOOKUPS.labels(cache=cache, result=result).inc()
+
+
+def observe_plugin_call(plugin, seconds, outcome):
+    PLUGIN_LATENCY.labels(plugin=plugin, outcome=outcome).observe(seconds)
+
+
+def _endpoint():
+    return request.endpoint or 'unmatched'
+
+
+def _before_request():
+    g.request_metrics = {'start': time.perf_counter(), 'queries': 0, 'db_time': 0.0}
+
+
+def _after_request(response):
+    stats = g.pop('request_metrics', None)
+    if stats is None:
+        return response
+    endpoint, method = _endpoint(), request.method
+    REQUEST_LATENCY.labels(endpoint=endpoint, method=method).observe(time.perf_counter() - stats['start'])
+    REQUESTS.labels(endpoint=endpoint, method=method, status=response.status_code).inc()
+    REQUEST_QUERIES.labels(endpoint=endpoint).observe(stats['queries'])
+    REQUEST_DB_TIME.labels(endpoint=endpoint).observe(stats['db_time'])
+    if not response.is_streamed:
+        RESPONSE_SIZE.labels(endpoint=endpoint).observe(response.calculate_content_length() or 0)
+    return response
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('metrics_query_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    stats = g.get('request_metrics') if has_request_context() else None
+    if stats is not None:
+        stats['queries'] += 1
+        stats['db_time'] += elapsed
+
+
+@event.listens_for(Engine, 'handle_error')
+def _query_failed(context):
+    starts = context.connection.info.get('metrics_query_start') if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def metrics_view():
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+def register_metrics(app):
+    """Instrument every request and add GET /metrics. Register before other after_request hooks."""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view, methods=['GET'])
@@ -4,6 +4,8 @@ from .tag import Tag
 from .booktag import BookTag
 from .comment import Comment
 from .rating import Rating
+from .rating_summary import RatingSummary
 from .review import Review
 from .plugin import Plugin
 from .author import Author
+from .resource_version import ResourceVersion
@@ -1,4 +1,5 @@
 from datetime import datetime, timezone
+from sqlalchemy import func
 from app import db
 
 class Author(db.Model):
@@ -14,3 +15,8 @@ class Author(db.Model):
     
     # Relationships
     books = db.relationship("Book", secondary="book_authors", back_populates="authors")
+
+    __table_args__ = (
+        db.Index("uq_authors_name", "name", unique=True),
+        db.Index("ix_authors_name_lower", func.lower(name)),
+    )
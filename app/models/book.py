@@ -1,25 +1,27 @@
 from datetime import datetime, timezone
+from sqlalchemy import func
 from app import db
 
 # Association table for many-to-many relationship between books and authors
 book_authors = db.Table('book_authors',
     db.Column('book_id', db.Integer, db.ForeignKey('books.id'), primary_key=True),
-    db.Column('author_id', db.Integer, db.ForeignKey('authors.id'), primary_key=True)
+    db.Column('author_id', db.Integer, db.ForeignKey('authors.id'), primary_key=True),
+    db.Index('ix_book_authors_author_id', 'author_id')
 )
 
 class Book(db.Model):
     __tablename__ = 'books'
     
     id = db.Column(db.Integer, primary_key=True)
-    title = db.Column(db.String(255), nullable=False)
+    title = db.Column(db.String(255), nullable=False, index=True)
     isbn = db.Column(db.String(20), unique=True)
     description = db.Column(db.Text)
     publication_date = db.Column(db.DateTime)
-    publish_year = db.Column(db.Integer)
-    series = db.Column(db.String(255))
+    publish_year = db.Column(db.Integer, index=True)
+    series = db.Column(db.String(255), index=True)
     cover_url = db.Column(db.String(512))
     page_count = db.Column(db.Integer)
-    language = db.Column(db.String(10), default='en')
+    language = db.Column(db.String(10), default='en', index=True)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, onupdate=lambda: datetime.now(timezone.utc))
     
@@ -28,4 +30,10 @@ class Book(db.Model):
     comments = db.relationship("Comment", back_populates="book", lazy=True)
     ratings = db.relationship("Rating", back_populates="book", lazy=True)
     reviews = db.relationship("Review", back_populates="book", lazy=True)
+    rating_summary = db.relationship("RatingSummary", back_populates="book", uselist=False,
+                                     cascade="all, delete-orphan")
     tags = db.relationship("Tag", secondary="book_tags", back_populates="books")
+
+    __table_args__ = (
+        db.Index("ix_books_title_lower", func.lower(title)),
+    )
@@ -5,11 +5,13 @@ class Rating(db.Model):
     __tablename__ = 'ratings'
     
     id = db.Column(db.Integer, primary_key=True)
-    rating = db.Column(db.Integer, nullable=False)
+    # active_history keeps the previous value around for the RatingSummary flush hook
+    rating = db.column_property(db.Column(db.Integer, nullable=False), active_history=True)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, onupdate=lambda: datetime.now(timezone.utc))
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
-    book_id = db.Column(db.Integer, db.ForeignKey("books.id"), nullable=False)
+    book_id = db.column_property(db.Column(db.Integer, db.ForeignKey("books.id"), nullable=False),
+                                 active_history=True)
     
     # Relationships
     user = db.relationship("User", back_populates="ratings")
@@ -0,0 +1,115 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from sqlalchemy import case, event, func, inspect
+from sqlalchemy.orm import Session
+from app import db
+from app.models.rating import Rating
+
+STARS = range(1, 6)
+
+class RatingSummary(db.Model):
+    """Denormalized per-book rating aggregates, kept in step with `ratings`."""
+    __tablename__ = 'rating_summaries'
+
+    book_id = db.Column(db.Integer, db.ForeignKey('books.id'), primary_key=True)
+    rating_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    stars_1 = db.Column(db.Integer, nullable=False, default=0)
+    stars_2 = db.Column(db.Integer, nullable=False, default=0)
+    stars_3 = db.Column(db.Integer, nullable=False, default=0)
+    stars_4 = db.Column(db.Integer, nullable=False, default=0)
+    stars_5 = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc),
+                           onupdate=lambda: datetime.now(timezone.utc))
+
+    # Relationships
+    book = db.relationship("Book", back_populates="rating_summary")
+
+    @property
+    def average(self):
+        return self.rating_sum / self.rating_count if self.rating_count else None
+
+    @property
+    def histogram(self):
+        return {str(n): getattr(self, f'stars_{n}') for n in STARS}
+
+    @classmethod
+    def backfill(cls):
+        """Rebuild every summary with one INSERT ... SELECT. Returns rows written."""
+        db.session.query(cls).delete(synchronize_session=False)
+        result = db.session.execute(cls.__table__.insert().from_select(_COLUMNS, _aggregate()))
+        db.session.commit()
+        return result.rowcount
+
+
+_COLUMNS = ['book_id', 'rating_count', 'rating_sum'] + [f'stars_{n}' for n in STARS]
+
+
+def _aggregate():
+    return db.select(
+        Rating.book_id,
+        func.count(Rating.id),
+        func.coalesce(func.sum(Rating.rating), 0),
+        *[func.coalesce(func.sum(case((Rating.rating == n, 1), else_=0)), 0) for n in STARS]
+    ).group_by(Rating.book_id)
+
+
+def _rating_changes(session):
+    """Yield (book_id, added_value, removed_value) for every Rating in this flush."""
+    for obj in session.new:
+        if isinstance(obj, Rating):
+            yield obj.book_id, obj.rating, None
+    for obj in session.deleted:
+        if isinstance(obj, Rating):
+            yield obj.book_id, None, obj.rating
+    for obj in session.dirty:
+        if not isinstance(obj, Rating):
+            continue
+        state = inspect(obj)
+        rating, book = state.attrs.rating.history, state.attrs.book_id.history
+        if not rating.has_changes() and not book.has_changes():
+            continue
+        old_rating = rating.deleted[0] if rating.deleted else obj.rating
+        old_book = book.deleted[0] if book.deleted else obj.book_id
+        yield old_book, None, old_rating
+        yield obj.book_id, obj.rating, None
+
+
+@event.listens_for(Session, 'after_flush')
+def update_rating_summaries(session, flush_context):
+    """
+    Apply this flush's rating inserts/updates/deletes to rating_summaries in
+    the same transaction. Each touched book costs one UPDATE; a book without a
+    summary row yet gets it built from the (already flushed) ratings table.
+    That insert is an upsert: when a concurrent transaction created the row
+    first, this flush's delta is added to it instead of failing on book_id.
+    """
+    from app.book_import import UPSERT_DIALECTS
+    deltas = defaultdict(lambda: defaultdict(int))
+    for book_id, added, removed in _rating_changes(session):
+        delta = deltas[book_id]
+        for value, sign in ((added, 1), (removed, -1)):
+            if value is None:
+                continue
+            delta['rating_count'] += sign
+            delta['rating_sum'] += sign * value
+            if value in STARS:
+                delta[f'stars_{value}'] += sign
+    if not deltas:
+        return
+
+    table = RatingSummary.__table__
+    connection = session.connection()
+    for book_id, delta in deltas.items():
+        values = {name: table.c[name] + change for name, change in delta.items()}
+        values['updated_at'] = datetime.now(timezone.utc)
+        result = connection.execute(table.update().where(table.c.book_id == book_id).values(**values))
+        if result.rowcount:
+            continue
+        rebuild = _aggregate().where(Rating.book_id == book_id)
+        dialect = connection.dialect.name
+        if dialect in UPSERT_DIALECTS:
+            statement = UPSERT_DIALECTS[dialect](table).from_select(_COLUMNS, rebuild)
+            connection.execute(statement.on_conflict_do_update(index_elements=['book_id'], set_=values))
+        else:
+            connection.execute(table.insert().from_select(_COLUMNS, rebuild))
@@ -0,0 +1,10 @@
+from datetime import datetime, timezone
+from app import db
+
+class ResourceVersion(db.Model):
+    """Monotonic version per collection (e.g. 'books', 'tags'), bumped after every committed write to it."""
+    __tablename__ = 'resource_versions'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
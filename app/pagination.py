@@ -0,0 +1,107 @@
+"""
+Keyset (cursor) pagination helpers shared by list endpoints
+"""
+import base64
+import json
+from urllib.parse import urlencode
+from flask import current_app, request
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client supplies a cursor we did not issue"""
+
+
+def _encode(payload):
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def _decode(cursor, key):
+    """Integer stored under key, raising InvalidCursor for anything else (including other cursor kinds)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value = json.loads(base64.urlsafe_b64decode(padded.encode()))[key]
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor(cursor)
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise InvalidCursor(cursor)
+    return value
+
+
+def encode_cursor(last_id):
+    """
+    Encode the last seen primary key as an opaque, URL-safe cursor
+    """
+    return _encode({'id': last_id})
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor
+    Returns: last seen id (int) or None when no cursor was given
+    """
+    if not cursor:
+        return None
+    return _decode(cursor, 'id')
+
+
+def encode_offset_cursor(offset):
+    """
+    Encode a result offset for endpoints ordered by rank rather than id (search)
+    """
+    return _encode({'offset': offset})
+
+
+def decode_offset_cursor(cursor):
+    """
+    Decode a cursor produced by encode_offset_cursor
+    Returns: offset (int >= 0), 0 when no cursor was given
+    """
+    if not cursor:
+        return 0
+    offset = _decode(cursor, 'offset')
+    if offset < 0:
+        raise InvalidCursor(cursor)
+    return offset
+
+
+def get_page_size():
+    """
+    Read ?limit= from the request, clamped to the configured bounds
+    """
+    default = current_app.config['PAGE_SIZE']
+    maximum = current_app.config['MAX_PAGE_SIZE']
+    try:
+        limit = int(request.args.get('limit', default))
+    except (TypeError, ValueError):
+        limit = default
+    return max(1, min(limit, maximum))
+
+
+def keyset_page(query, id_column, cursor_arg='cursor', limit=None):
+    """
+    Apply cursor + limit to a query ordered by id_column
+    Returns: (rows, next_cursor) where next_cursor is None on the last page
+    """
+    if limit is None:
+        limit = get_page_size()
+    after_id = decode_cursor(request.args.get(cursor_arg))
+    if after_id is not None:
+        query = query.filter(id_column > after_id)
+    rows = query.order_by(id_column).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].id)
+    return rows, None
+
+
+def add_next_link(response, next_cursor):
+    """
+    Expose the next cursor via X-Next-Cursor and an RFC 8288 Link header
+    """
+    if next_cursor:
+        args = request.args.to_dict()
+        args['cursor'] = next_cursor
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = f'<{request.path}?{urlencode(args)}>; rel="next"'
+    return response
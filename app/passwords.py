@@ -0,0 +1,190 @@
+"""
+Password hashing: a configurable hasher (argon2id, bcrypt or pbkdf2) plus
+verify-only support for every scheme the users table may still hold.
+
+Hashing is CPU-bound by design, so it runs on a small per-process executor.
+At most PASSWORD_HASH_WORKERS hashes run at once and PASSWORD_HASH_MAX_PENDING
+more may wait for one. Beyond that, callers get HashingBusy (503) at once, so
+a login burst cannot take every request thread from the rest of the API. That
+only holds while workers + pending stays below the request threads per process
+(gunicorn --threads, 4 in the Dockerfile).
+"""
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+from argon2 import PasswordHasher, Type
+from argon2.exceptions import InvalidHashError, VerificationError
+from werkzeug.security import check_password_hash, generate_password_hash
+
+BCRYPT_MAX_BYTES = 72  # bcrypt ignores (bcrypt>=5: rejects) anything longer
+
+
+class HashingBusy(RuntimeError):
+    """Raised when PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_PENDING callers are already admitted"""
+
+
+class Argon2Hasher:
+    scheme = 'argon2id'
+
+    def __init__(self, time_cost=2, memory_cost=19456, parallelism=1):
+        self._hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost,
+                                      parallelism=parallelism, type=Type.ID)
+
+    def identify(self, stored):
+        return stored.startswith('$argon2')
+
+    def hash(self, password):
+        return self._hasher.hash(password)
+
+    def verify(self, stored, password):
+        try:
+            return self._hasher.verify(stored, password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    def needs_rehash(self, stored):
+        return self._hasher.check_needs_rehash(stored)
+
+
+class BcryptHasher:
+    scheme = 'bcrypt'
+    _rounds = re.compile(r'^\$2[aby]\$(\d\d)\$')
+
+    def __init__(self, rounds=12):
+        self.rounds = rounds
+
+    def identify(self, stored):
+        return self._rounds.match(stored) is not None
+
+    def hash(self, password):
+        return bcrypt.hashpw(password.encode('utf-8')[:BCRYPT_MAX_BYTES], bcrypt.gensalt(self.rounds)).decode('ascii')
+
+    def verify(self, stored, password):
+        try:
+            return bcrypt.checkpw(password.encode('utf-8')[:BCRYPT_MAX_BYTES], stored.encode('ascii'))
+        except ValueError:
+            return False
+
+    def needs_rehash(self, stored):
+        match = self._rounds.match(stored)
+        return match is None or int(match.group(1)) != self.rounds
+
+
+class Pbkdf2Hasher:
+    """PBKDF2-SHA256 in werkzeug's 'pbkdf2:sha256:<iterations>$salt$hash' format"""
+    scheme = 'pbkdf2'
+
+    def __init__(self, iterations=600000):
+        self.method = f'pbkdf2:sha256:{iterations}'
+
+    def identify(self, stored):
+        return stored.startswith('pbkdf2:')
+
+    def hash(self, password):
+        return generate_password_hash(password, method=self.method)
+
+    def verify(self, stored, password):
+        return check_password_hash(stored, password)
+
+    def needs_rehash(self, stored):
+        return stored.split('$', 1)[0] != self.method
+
+
+class WerkzeugHasher:
+    """Verify-only: hashes from werkzeug's generate_password_hash defaults (scrypt)"""
+    scheme = 'werkzeug'
+
+    def identify(self, stored):
+        return '$' in stored
+
+    def verify(self, stored, password):
+        try:
+            return check_password_hash(stored, password)
+        except ValueError:
+            return False
+
+    def needs_rehash(self, stored):
+        return True
+
+
+HASHERS = {'argon2id': Argon2Hasher, 'bcrypt': BcryptHasher, 'pbkdf2': Pbkdf2Hasher}
+
+
+class Passwords:
+    def __init__(self, app=None):
+        self.hasher = Argon2Hasher()
+        self.verifiers = [self.hasher, BcryptHasher(), Pbkdf2Hasher(), WerkzeugHasher()]
+        self.workers = 2
+        self.max_pending = 1
+        self._executor = None
+        self._slots = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        name = config.get('PASSWORD_HASHER', 'argon2id')
+        if name not in HASHERS:
+            raise ValueError(f"PASSWORD_HASHER must be one of {', '.join(HASHERS)}, not {name!r}")
+        configured = {
+            'argon2id': Argon2Hasher(config.get('PASSWORD_ARGON2_TIME_COST', 2),
+                                     config.get('PASSWORD_ARGON2_MEMORY_COST', 19456),
+                                     config.get('PASSWORD_ARGON2_PARALLELISM', 1)),
+            'bcrypt': BcryptHasher(config.get('PASSWORD_BCRYPT_ROUNDS', 12)),
+            'pbkdf2': Pbkdf2Hasher(config.get('PASSWORD_PBKDF2_ITERATIONS', 600000)),
+        }
+        self.hasher = configured[name]
+        self.verifiers = list(configured.values()) + [WerkzeugHasher()]
+        self.workers = config.get('PASSWORD_HASH_WORKERS', 2)
+        self.max_pending = config.get('PASSWORD_HASH_MAX_PENDING', 1)
+        self.close()
+
+    def _pool(self):
+        # Rebuilt after a fork: executor threads do not survive into gunicorn workers
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+                    self._slots = threading.BoundedSemaphore(self.workers + self.max_pending)
+                    self._pid = os.getpid()
+        return self._executor, self._slots
+
+    def _run(self, fn, *args):
+        executor, slots = self._pool()
+        if not slots.acquire(blocking=False):
+            raise HashingBusy('Too many password checks in progress')
+        try:
+            return executor.submit(fn, *args).result()
+        finally:
+            slots.release()
+
+    def hash(self, password):
+        return self._run(self.hasher.hash, password)
+
+    def verify(self, stored, password):
+        """
+        Check password against a stored hash of any supported scheme.
+        Returns: (ok, new_hash) where new_hash is set when ok and the stored hash
+        should be replaced because the scheme or its cost parameters changed
+        """
+        verifier = next((v for v in self.verifiers if v.identify(stored)), None)
+        if verifier is None or not self._run(verifier.verify, stored, password):
+            return False, None
+        if verifier is not self.hasher or self.hasher.needs_rehash(stored):
+            return True, self.hash(password)
+        return True, None
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False)
+            self._executor = None
+            self._slots = None
+            self._pid = None
+
+
+passwords = Passwords()
@@ -1,6 +1,10 @@
 import importlib
 import os
+import sys
+import threading
+import time
 from app import db
+from app.enrichment_cache import CachedPlugin, enrichment_cache
 from app.models import Plugin
 
 PLUGIN_DIR = os.path.join(os.path.dirname(__file__), 'plugins')
@@ -35,15 +39,78 @@ class PluginManager:
         except Exception:
             return False
 
-def load_plugins():
+def _plugin_modules(plugin_folder=PLUGIN_DIR):
+    return sorted(
+        filename[:-3] for filename in os.listdir(plugin_folder)
+        if filename.endswith('.py') and not filename.startswith('__')
+    )
+
+def load_plugins(reload_modules=False):
     plugins = {}
-    plugin_folder = os.path.join(os.path.dirname(__file__), 'plugins')
-    for filename in os.listdir(plugin_folder):
-        if filename.endswith('.py') and not filename.startswith('__'):
-            module_name = f"app.plugins.{filename[:-3]}"
+    for name in _plugin_modules():
+        module_name = f"app.plugins.{name}"
+        if reload_modules and module_name in sys.modules:
+            module = importlib.reload(sys.modules[module_name])
+        else:
             module = importlib.import_module(module_name)
-            for attr in dir(module):
-                obj = getattr(module, attr)
-                if hasattr(obj, 'run') and callable(getattr(obj, 'run')):
-                    plugins[attr] = obj()
+        for attr in dir(module):
+            obj = getattr(module, attr)
+            if hasattr(obj, 'run') and callable(getattr(obj, 'run')):
+                plugins[attr] = obj()
     return plugins
+
+class PluginRegistry:
+    """
+    Process-local plugin instances, built once per worker.
+    Rebuilt only by reload() (the /plugins/reload endpoint) or, when
+    PLUGIN_RELOAD_INTERVAL > 0, by a throttled mtime check of the plugin folder.
+    Instances are wrapped in CachedPlugin so ISBN lookups hit the enrichment cache;
+    plugins with an init_app(app) method get it called with the app they load for.
+    """
+    def __init__(self, plugin_folder=PLUGIN_DIR):
+        self.plugin_folder = plugin_folder
+        self.app = None
+        self.check_interval = 0
+        self._plugins = None
+        self._mtime = None
+        self._next_check = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.check_interval = app.config.get('PLUGIN_RELOAD_INTERVAL', 0)
+        self.reload(reload_modules=False)
+
+    def _folder_mtime(self):
+        paths = [self.plugin_folder] + [
+            os.path.join(self.plugin_folder, f'{name}.py') for name in _plugin_modules(self.plugin_folder)
+        ]
+        return max(os.stat(path).st_mtime for path in paths)
+
+    def reload(self, reload_modules=True):
+        with self._lock:
+            plugins = load_plugins(reload_modules=reload_modules)
+            for plugin in plugins.values():
+                if self.app is not None and callable(getattr(plugin, 'init_app', None)):
+                    plugin.init_app(self.app)
+            self._plugins = {name: CachedPlugin(name, plugin, enrichment_cache) for name, plugin in plugins.items()}
+            self._mtime = self._folder_mtime()
+            self._next_check = time.monotonic() + self.check_interval
+        return self._plugins
+
+    def _maybe_reload(self):
+        if self._plugins is None:
+            return self.reload(reload_modules=False)
+        if self.check_interval and time.monotonic() >= self._next_check:
+            self._next_check = time.monotonic() + self.check_interval
+            if self._folder_mtime() != self._mtime:
+                return self.reload()
+        return self._plugins
+
+    def all(self):
+        return dict(self._maybe_reload())
+
+    def get(self, name):
+        return self._maybe_reload().get(name)
+
+registry = PluginRegistry()
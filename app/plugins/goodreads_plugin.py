@@ -1,10 +1,48 @@
 import os
-import requests
 import json
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from app.http_client import http_client
+from app.enrichment_cache import EnrichmentCache
+
+# Author key -> name, shared across lookups; authors rarely change
+author_cache = EnrichmentCache(max_size=8192, ttl=7 * 86400, negative_ttl=0)
+
+_executor = None
+_executor_key = None
+_executor_lock = threading.Lock()
+
+def _author_executor(max_workers):
+    """Bounded thread pool for author fan-out, recreated after a fork or a size change."""
+    global _executor, _executor_key
+    key = (os.getpid(), max_workers)
+    if _executor is None or _executor_key != key:
+        with _executor_lock:
+            if _executor is None or _executor_key != key:
+                if _executor is not None and _executor_key[0] == os.getpid():
+                    # Lookups already queued still finish; the idle threads exit
+                    _executor.shutdown(wait=False)
+                _executor = ThreadPoolExecutor(
+                    max_workers=max_workers,
+                    thread_name_prefix='openlibrary-authors'
+                )
+                _executor_key = key
+    return _executor
 
 class OpenLibraryPlugin:
+    health_url = 'https://openlibrary.org/'
+    author_workers = 8
+    # Overall budget in seconds for one ISBN lookup including all author requests
+    deadline = 10.0
+
+    def init_app(self, app):
+        self.author_workers = app.config.get('OPENLIBRARY_AUTHOR_WORKERS', 8)
+        self.deadline = app.config.get('ENRICHMENT_DEADLINE', 10.0)
+
     def run(self, data):
+        deadline = time.monotonic() + self.deadline
         isbn = data.get('isbn')
         if not isbn:
             logging.warning('ISBN not provided to plugin')
@@ -12,10 +50,12 @@ class OpenLibraryPlugin:
         url = f'https://openlibrary.org/isbn/{isbn}.json'
         headers = {'User-Agent': 'BookLibAPI/1.0 (contact: your@email.com)'}
         try:
-            resp = requests.get(url, headers=headers, timeout=10)
+            resp = http_client.get(url, deadline=deadline, headers=headers)
             if resp.status_code == 200:
                 record = resp.json()
-                return self._parse_record(record)
+                return self._parse_record(record, deadline)
+            elif resp.status_code == 404:
+                return {'error': 'No book found in Open Library', 'not_found': True}
             else:
                 logging.warning(f'Open Library API returned {resp.status_code} for ISBN {isbn}')
                 return {'error': f'Open Library API returned {resp.status_code}'}
@@ -23,21 +63,12 @@ class OpenLibraryPlugin:
             logging.error(f'Error fetching ISBN {isbn} from Open Library: {e}')
             return {'error': 'Exception during Open Library lookup'}
 
-    def _parse_record(self, record):
+    def _parse_record(self, record, deadline=None):
         title = record.get('title')
-        author_ids = []
-        author_names = []
+        author_keys = []
         if 'authors' in record and isinstance(record['authors'], list):
-            for a in record['authors']:
-                if 'key' in a:
-                    author_url = f'https://openlibrary.org{a["key"]}.json'
-                    try:
-                        resp = requests.get(author_url, headers={'User-Agent': 'BookLibAPI/1.0'}, timeout=5)
-                        if resp.status_code == 200:
-                            author_data = resp.json()
-                            author_names.append(author_data.get('name', ''))
-                    except Exception:
-                        continue
+            author_keys = list(dict.fromkeys(a['key'] for a in record['authors'] if 'key' in a))
+        author_names = self._resolve_authors(author_keys, deadline)
         description = record.get('description')
         if isinstance(description, dict):
             description = description.get('value')
@@ -55,3 +86,46 @@ class OpenLibraryPlugin:
             'publish_year': publish_year,
             'genres': genres
         }
+
+    def _resolve_authors(self, keys, deadline=None):
+        """Resolve author keys to names: cached ones directly, the rest concurrently."""
+        names = {}
+        pending = []
+        for key in keys:
+            hit, value = author_cache.get(self.__class__.__name__, key)
+            if hit:
+                names[key] = value['name']
+            else:
+                pending.append(key)
+        if pending:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                futures = self._submit_authors(pending, deadline)
+            except RuntimeError:
+                # The pool was resized and shut down between lookup and submit
+                futures = self._submit_authors(pending, deadline)
+            done, not_done = wait(futures, timeout=remaining)
+            for future in not_done:
+                future.cancel()
+            if not_done:
+                logging.warning(f'Open Library author lookup deadline hit; skipped {len(not_done)} authors')
+            for future in done:
+                name = future.result()
+                if name is not None:
+                    names[futures[future]] = name
+                    author_cache.set(self.__class__.__name__, futures[future], {'name': name})
+        return [names[key] for key in keys if key in names]
+
+    def _submit_authors(self, keys, deadline):
+        executor = _author_executor(self.author_workers)
+        return {executor.submit(self._fetch_author, key, deadline): key for key in keys}
+
+    def _fetch_author(self, key, deadline=None):
+        author_url = f'https://openlibrary.org{key}.json'
+        try:
+            resp = http_client.get(author_url, deadline=deadline)
+            if resp.status_code == 200:
+                return resp.json().get('name', '')
+        except Exception as e:
+            logging.warning(f'Error fetching author {key} from Open Library: {e}')
+        return None
@@ -1,7 +1,8 @@
-import requests
 import logging
+from app.http_client import http_client
 
 class GoogleBooksPlugin:
+    health_url = 'https://www.googleapis.com/'
     def run(self, data):
         isbn = data.get('isbn')
         if not isbn:
@@ -9,12 +10,12 @@ class GoogleBooksPlugin:
             return {'error': 'ISBN required'}
         url = f'https://www.googleapis.com/books/v1/volumes?q=isbn:{isbn}'
         try:
-            resp = requests.get(url, timeout=10)
+            resp = http_client.get(url)
             if resp.status_code == 200:
                 result = resp.json()
                 items = result.get('items', [])
                 if not items:
-                    return {'error': 'No book found in Google Books'}
+                    return {'error': 'No book found in Google Books', 'not_found': True}
                 volume = items[0]['volumeInfo']
                 title = volume.get('title')
                 authors = volume.get('authors', [])
@@ -0,0 +1,432 @@
+"""
+Response cache for hot read endpoints.
+
+Entries are keyed by endpoint, path and sorted query args, plus the current
+generation of every tag the view depends on (e.g. 'book:5', 'tags'). Commits
+bump the generations of whatever they changed (see app.versions), so stale
+entries are never read again and simply age out. Generations must live where
+every worker sees them, so the backends are: a SQLite file shared by the
+worker processes of one host (the default, RESPONSE_CACHE_PATH), any
+Redis-compatible server shared by all hosts (needs the `redis` package), or
+an in-process LRU that is only exact for a single-process server.
+
+Only one caller recomputes a missing or expired key: it holds a short lock
+while others serve the stale entry, or wait for the fresh one when there is
+no stale entry to serve.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+from flask import Response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.conditional import not_modified
+from app.db_routing import use_primary
+from app.metrics import record_cache_lookup
+from app.versions import take_committed_changes
+
+logger = logging.getLogger(__name__)
+
+LOCK_POLL_INTERVAL = 0.05
+
+
+class MemoryBackend:
+    """Thread-safe LRU with per-entry expiry. Generation counters are kept apart and never evicted."""
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] < now:
+            del self._entries[key]
+            return None
+        return entry
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key, time.time())
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def add(self, key, value, ttl):
+        """Set only if absent. Returns: True when stored"""
+        with self._lock:
+            if self._live(key, time.time()) is not None:
+                return False
+            self._entries[key] = (value, time.time() + ttl)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def counters(self, names, seed):
+        """Current value of each counter, initializing missing ones to `seed`."""
+        with self._lock:
+            return [self._counters.setdefault(name, seed) for name in names]
+
+    def incr(self, names, seed):
+        with self._lock:
+            for name in names:
+                self._counters[name] = self._counters.get(name, seed) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+
+class SQLiteBackend:
+    """Backend in a SQLite file, shared by every worker process that opens the same path."""
+    def __init__(self, path, max_size=1024, busy_timeout=5):
+        self.path = path
+        self.max_size = max_size
+        self.busy_timeout = busy_timeout
+        self._conn = None
+        self._pid = None
+        self._writes = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._lock:
+            self._connection().executescript(
+                'CREATE TABLE IF NOT EXISTS response_cache '
+                '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL);'
+                'CREATE TABLE IF NOT EXISTS response_cache_counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);'
+            )
+            self._connection().execute('DELETE FROM response_cache WHERE expires_at < ?', (time.time(),))
+
+    def _connection(self):
+        # Call with self._lock held; connections do not survive gunicorn's fork
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, timeout=self.busy_timeout,
+                                         check_same_thread=False, isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key):
+        with self._lock:
+            row = self._connection().execute(
+                'SELECT value FROM response_cache WHERE key = ? AND expires_at >= ?', (key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            conn = self._connection()
+            conn.execute('INSERT OR REPLACE INTO response_cache (key, value, expires_at) VALUES (?, ?, ?)',
+                         (key, json.dumps(value), time.time() + ttl))
+            self._writes += 1
+            if self._writes % 256 == 0:
+                self._prune(conn)
+
+    def _prune(self, conn):
+        conn.execute('DELETE FROM response_cache WHERE expires_at < ?', (time.time(),))
+        conn.execute(
+            'DELETE FROM response_cache WHERE key IN (SELECT key FROM response_cache ORDER BY expires_at '
+            'LIMIT max(0, (SELECT count(*) FROM response_cache) - ?))', (self.max_size,)
+        )
+
+    def add(self, key, value, ttl):
+        """Set only if absent. Returns: True when stored"""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute('DELETE FROM response_cache WHERE key = ? AND expires_at < ?', (key, now))
+                stored = conn.execute(
+                    'INSERT OR IGNORE INTO response_cache (key, value, expires_at) VALUES (?, ?, ?)',
+                    (key, json.dumps(value), now + ttl)
+                ).rowcount == 1
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        return stored
+
+    def delete(self, key):
+        with self._lock:
+            self._connection().execute('DELETE FROM response_cache WHERE key = ?', (key,))
+
+    def counters(self, names, seed):
+        if not names:
+            return []
+        query = f'SELECT name, value FROM response_cache_counters WHERE name IN ({",".join("?" * len(names))})'
+        with self._lock:
+            conn = self._connection()
+            values = dict(conn.execute(query, names).fetchall())
+            missing = [name for name in names if name not in values]
+            if missing:
+                # Only a lookup that finds a counter missing writes; another worker may seed it first
+                conn.executemany('INSERT OR IGNORE INTO response_cache_counters (name, value) VALUES (?, ?)',
+                                 [(name, seed) for name in missing])
+                values = dict(conn.execute(query, names).fetchall())
+        return [values[name] for name in names]
+
+    def incr(self, names, seed):
+        with self._lock:
+            self._connection().executemany(
+                'INSERT INTO response_cache_counters (name, value) VALUES (?, ?) '
+                'ON CONFLICT (name) DO UPDATE SET value = value + 1',
+                [(name, seed + 1) for name in names]
+            )
+
+    def clear(self):
+        with self._lock:
+            self._connection().executescript('DELETE FROM response_cache; DELETE FROM response_cache_counters;')
+
+
+class RedisBackend:
+    """Shared backend on a Redis-compatible server; values are stored as JSON."""
+    def __init__(self, url, prefix='booklib:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RESPONSE_CACHE_URL needs the 'redis' package installed")
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self._client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self._client.set(self.prefix + key, json.dumps(value), px=max(1, int(ttl * 1000)))
+
+    def add(self, key, value, ttl):
+        return bool(self._client.set(self.prefix + key, json.dumps(value), px=max(1, int(ttl * 1000)), nx=True))
+
+    def delete(self, key):
+        self._client.delete(self.prefix + key)
+
+    def counters(self, names, seed):
+        keys = [self.prefix + name for name in names]
+        values = self._client.mget(keys)
+        missing = [key for key, value in zip(keys, values) if value is None]
+        if missing:
+            pipe = self._client.pipeline()
+            for key in missing:
+                pipe.set(key, seed, nx=True)
+            pipe.execute()
+            values = self._client.mget(keys)
+        return [int(value) for value in values]
+
+    def incr(self, names, seed):
+        pipe = self._client.pipeline()
+        for name in names:
+            pipe.set(self.prefix + name, seed, nx=True)
+            pipe.incr(self.prefix + name)
+        pipe.execute()
+
+    def clear(self):
+        for key in self._client.scan_iter(self.prefix + '*'):
+            self._client.delete(key)
+
+
+class ResponseCache:
+    def __init__(self):
+        self.backend = None
+        self.ttl = 60
+        self.lock_timeout = 5
+        self.hits = self.misses = self.stale_hits = 0
+
+    def init_app(self, app):
+        self.configure(
+            app.config.get('RESPONSE_CACHE_TYPE', 'sqlite'),
+            app.config.get('RESPONSE_CACHE_URL') or None,
+            app.config.get('RESPONSE_CACHE_SIZE', 1024),
+            app.config.get('RESPONSE_CACHE_TTL', 60),
+            app.config.get('RESPONSE_CACHE_LOCK_TIMEOUT', 5),
+            app.config.get('RESPONSE_CACHE_PATH') or os.path.join(app.instance_path, 'response_cache.db'),
+        )
+
+    def configure(self, cache_type='memory', url=None, max_size=1024, ttl=60, lock_timeout=5, path=None):
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.hits = self.misses = self.stale_hits = 0
+        if cache_type == 'redis':
+            self.backend = RedisBackend(url)
+        elif cache_type == 'sqlite':
+            # Other live workers share the file, so only drop what has expired
+            self.backend = SQLiteBackend(path, max_size)
+        elif cache_type == 'memory':
+            self.backend = MemoryBackend(max_size)
+        else:
+            self.backend = None
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    def _generations(self, tags):
+        # A counter that vanished (eviction, restart of the shared server) is
+        # re-seeded from the clock, so it can never match an older entry's key
+        names = [f'gen:{tag}' for tag in tags]
+        return self.backend.counters(names, time.time_ns())
+
+    def invalidate(self, tags):
+        if self.enabled and tags:
+            self.backend.incr([f'gen:{tag}' for tag in sorted(tags)], time.time_ns())
+
+    def _count(self, result):
+        if result == 'hit':
+            self.hits += 1
+        elif result == 'stale_hit':
+            self.stale_hits += 1
+        else:
+            self.misses += 1
+        record_cache_lookup('response', result)
+
+    def fetch(self, key, tags, compute):
+        """
+        Return a fresh or stale cached entry for key, or compute one.
+        compute() returns (result, entry); entry is None when the result must not be cached.
+        Returns: (entry, None) on a hit, (None, result) when computed here
+        """
+        generations = ':'.join(map(str, self._generations(tags)))
+        full_key = f'resp:{key}:{generations}'
+        cached = self.backend.get(full_key)
+        if cached is not None and cached['expires_at'] > time.time():
+            self._count('hit')
+            return cached, None
+
+        lock_key = f'lock:{full_key}'
+        if not self.backend.add(lock_key, 1, self.lock_timeout):
+            if cached is not None:
+                self._count('stale_hit')
+                return cached, None
+            deadline = time.time() + self.lock_timeout
+            while time.time() < deadline:
+                time.sleep(LOCK_POLL_INTERVAL)
+                cached = self.backend.get(full_key)
+                if cached is not None:
+                    self._count('hit')
+                    return cached, None
+                if self.backend.get(lock_key) is None:
+                    break
+            self._count('miss')
+            return None, compute()[0]
+
+        self._count('miss')
+        try:
+            result, entry = compute()
+            if entry is not None:
+                entry['expires_at'] = time.time() + self.ttl
+                # Keep the entry past its expiry so it can be served while one worker refreshes it
+                self.backend.set(full_key, entry, self.ttl + self.lock_timeout * 2)
+            return None, result
+        finally:
+            self.backend.delete(lock_key)
+
+    def stats(self):
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            'backend': type(self.backend).__name__ if self.backend else None,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'hit_ratio': (self.hits + self.stale_hits) / lookups if lookups else None,
+        }
+
+    def clear(self):
+        if self.enabled:
+            self.backend.clear()
+
+
+response_cache = ResponseCache()
+
+
+def _cache_key():
+    args = urlencode(sorted(request.args.items(multi=True)))
+    return f'{request.endpoint}:{request.path}?{args}'
+
+
+def cached_response(*tags):
+    """
+    Cache a GET view's 200 responses. tags are format strings over the view
+    arguments, e.g. cached_response('book:{id}'). Hits are still answered
+    with 304 when the request's validators match the cached ETag.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not response_cache.enabled or request.method != 'GET':
+                return view(*args, **kwargs)
+
+            view_errors = []
+
+            def compute():
+                try:
+                    # Entries outlive replica lag, so they are only ever filled from the primary
+                    with use_primary():
+                        response = view(*args, **kwargs)
+                except Exception as e:
+                    view_errors.append(e)
+                    raise
+                if isinstance(response, tuple):
+                    body, status = response
+                    response = body
+                    response.status_code = status
+                if response.status_code != 200 or response.is_streamed:
+                    return response, None
+                entry = {
+                    'body': response.get_data(as_text=True),
+                    'mimetype': response.mimetype,
+                    'headers': [[k, v] for k, v in response.headers.items() if k.lower() != 'content-length'],
+                }
+                return response, entry
+
+            try:
+                entry, result = response_cache.fetch(
+                    _cache_key(), [tag.format(**kwargs) for tag in tags], compute
+                )
+            except Exception as e:
+                if view_errors:
+                    raise
+                # A broken shared backend must not take the endpoint down
+                logger.warning(f'Response cache unavailable: {e}')
+                return view(*args, **kwargs)
+            if entry is None:
+                result.headers['X-Cache'] = 'MISS'
+                return result
+            response = Response(entry['body'], mimetype=entry['mimetype'], headers=entry['headers'])
+            etag, _ = response.get_etag()
+            if etag:
+                response = not_modified(etag, response.last_modified) or response
+            response.headers['X-Cache'] = 'HIT'
+            return response
+        return wrapper
+    return decorator
+
+
+@event.listens_for(Session, 'after_commit')
+def invalidate_committed(session):
+    changes = take_committed_changes(session)
+    if not changes:
+        return
+    tags = set(changes['collections']) | {f'book:{book_id}' for book_id in changes['book_ids']}
+    try:
+        response_cache.invalidate(tags)
+    except Exception as e:
+        logger.error(f'Response cache invalidation failed for {sorted(tags)}: {e}')
@@ -10,3 +10,6 @@ from .ratings import ratings_bp
 from .reviews import reviews_bp
 from .plugins import plugins_bp
 from .protected import protected_bp
+from .export import export_bp
+from .admin import admin_bp
+from .health import health_bp
@@ -0,0 +1,29 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required
+from app import db
+from app.db_pool import pool_metrics
+from app.db_routing import replica_router
+
+admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
+
+
+@admin_bp.route('/db/pool', methods=['GET'])
+@jwt_required()
+def get_pool_stats():
+    """Connection pool metrics for the worker serving the request
+    ---
+    tags:
+      - Admin
+    """
+    return jsonify(pool_metrics.stats(db.engine)), 200
+
+
+@admin_bp.route('/db/replicas', methods=['GET'])
+@jwt_required()
+def get_replica_stats():
+    """Read replica lag, errors and routed reads for the worker serving the request
+    ---
+    tags:
+      - Admin
+    """
+    return jsonify(replica_router.stats()), 200
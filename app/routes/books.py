@@ -1,65 +1,200 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, abort
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from app.models import Book, Comment, Rating, Author, Review
+from app.models import Book, Comment, Rating, Review, RatingSummary
 from app.db_utils import handle_db_errors
+from app.pagination import (
+    InvalidCursor, keyset_page, add_next_link, decode_offset_cursor, encode_offset_cursor, get_page_size,
+)
+from app.search import search_book_ids
+from app.conditional import add_validators, make_etag, not_modified
+from app.response_cache import cached_response
+from app.serializers import UnknownField, serializers
+from app.versions import book_last_modified, collection_version
+from app.book_filters import BookFilterError, book_filter_clauses, facet_counts
+from app.book_import import (
+    BookImporter, ImportFormatError, DEFAULT_AUTHOR, PLUGIN_ALIASES, clean_names, merge_enrichment,
+    parse_publish_year, parse_records, resolve_authors, resolve_tags, summarize
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import select, func
+from sqlalchemy.orm import selectinload
 import logging
-import os
 
 books_bp = Blueprint('books', __name__)
 
-LOG_DIR = os.path.join(os.path.dirname(__file__), '..', 'logs')
-LOG_PATH = os.path.join(LOG_DIR, 'app.log')
-if not os.path.exists(LOG_DIR):
-    os.makedirs(LOG_DIR)
+BULK_FORMATS = {
+    'application/json': 'json',
+    'application/x-ndjson': 'ndjson',
+    'application/ndjson': 'ndjson',
+    'text/csv': 'csv',
+}
 
-logging.basicConfig(
-    level=logging.DEBUG,  # Changed to DEBUG
-    format='%(asctime)s %(levelname)s %(name)s %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_PATH),
-        logging.StreamHandler()
-    ]
-)
+logger = logging.getLogger(__name__)
 
 @books_bp.route('/books', methods=['GET'])
 @handle_db_errors
 def get_books():
-    """Get all books
+    """Get books, one keyset page at a time
+    ---
+    tags:
+      - Books
+    parameters:
+      - name: limit
+        in: query
+      - name: cursor
+        in: query
+      - name: tag
+        in: query
+        description: Repeatable; combined according to tag_mode (and|or)
+      - name: author_id
+        in: query
+      - name: year_from
+        in: query
+      - name: year_to
+        in: query
+      - name: language
+        in: query
+      - name: series
+        in: query
+      - name: fields
+        in: query
+        description: Comma-separated subset of id, title, description, publish_year, series, authors
+    """
+    version, last_modified = collection_version('books')
+    etag = make_etag(version)
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
+    try:
+        clauses = book_filter_clauses(request.args)
+        serializer = serializers['book']
+        fields = serializer.parse_fields(request.args.get('fields'))
+        rows, next_cursor = keyset_page(serializer.query(fields).filter(*clauses), Book.id)
+    except (BookFilterError, UnknownField) as e:
+        return jsonify({'msg': str(e)}), 400
+    except InvalidCursor:
+        return jsonify({'msg': 'Invalid cursor'}), 400
+    response = jsonify(serializer.dump_rows(rows, fields))
+    add_validators(response, etag, last_modified)
+    return add_next_link(response, next_cursor), 200
+
+@books_bp.route('/books/facets', methods=['GET'])
+@handle_db_errors
+def get_book_facets():
+    """Facet counts for the books matching the /books filters
     ---
     tags:
       - Books
+    parameters:
+      - name: tag
+        in: query
+      - name: author_id
+        in: query
+      - name: year_from
+        in: query
+      - name: year_to
+        in: query
+      - name: language
+        in: query
+      - name: series
+        in: query
     """
-    books = Book.query.all()
-    return jsonify([
-        {
-            'id': b.id,
-            'title': b.title,
-            'authors': [a.name for a in b.authors],
-            'description': b.description,
-            'publish_year': b.publish_year,
-            'series': b.series
-        } for b in books
-    ]), 200
+    version, last_modified = collection_version('books')
+    etag = make_etag(version)
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
+    try:
+        clauses = book_filter_clauses(request.args)
+    except BookFilterError as e:
+        return jsonify({'msg': str(e)}), 400
+    response = jsonify(facet_counts(clauses, current_app.config['FACET_LIMIT']))
+    return add_validators(response, etag, last_modified), 200
+
+@books_bp.route('/books/search', methods=['GET'])
+@handle_db_errors
+def search_books():
+    """Full-text search over titles, authors, tags and descriptions
+    ---
+    tags:
+      - Books
+    parameters:
+      - name: q
+        in: query
+      - name: limit
+        in: query
+      - name: cursor
+        in: query
+    """
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify({'msg': 'Missing q'}), 400
+    limit = get_page_size()
+    try:
+        offset = decode_offset_cursor(request.args.get('cursor'))
+    except InvalidCursor:
+        return jsonify({'msg': 'Invalid cursor'}), 400
+    ids = search_book_ids(q, limit + 1, offset)
+    next_cursor = encode_offset_cursor(offset + limit) if len(ids) > limit else None
+    ids = ids[:limit]
+    serializer = serializers['book']
+    books = {r['id']: r for r in serializer.dump_rows(serializer.query().filter(Book.id.in_(ids)))}
+    response = jsonify([books[i] for i in ids if i in books])
+    return add_next_link(response, next_cursor), 200
 
 @books_bp.route('/books/<int:id>/full', methods=['GET'])
 @handle_db_errors
+@cached_response('book:{id}')
 def get_book_full(id):
-    """Get book info, ratings, comments, and reviews
+    """Get book info, rating summary and capped pages of ratings, comments and reviews
     ---
     tags:
       - Books
+    parameters:
+      - name: ratings_cursor
+        in: query
+      - name: comments_cursor
+        in: query
+      - name: reviews_cursor
+        in: query
     """
-    book = Book.query.get_or_404(id)
-    ratings = Rating.query.filter_by(book_id=id).all()
-    comments = Comment.query.filter_by(book_id=id).all()
-    reviews = Review.query.filter_by(book_id=id).all()
-    
-    avg_rating = None
-    if ratings:
-        avg_rating = sum(r.rating for r in ratings) / len(ratings)
-    
-    return jsonify({
+    last_modified = book_last_modified(id)
+    if last_modified is None:
+        abort(404)
+    etag = make_etag(last_modified.isoformat())
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
+    book = Book.query.options(selectinload(Book.authors)).get_or_404(id)
+
+    # Counts and the rating sum in a single round trip
+    rating_count, rating_sum, comment_count, review_count = db.session.query(
+        select(RatingSummary.rating_count).where(RatingSummary.book_id == id).scalar_subquery(),
+        select(RatingSummary.rating_sum).where(RatingSummary.book_id == id).scalar_subquery(),
+        select(func.count(Comment.id)).where(Comment.book_id == id).scalar_subquery(),
+        select(func.count(Review.id)).where(Review.book_id == id).scalar_subquery(),
+    ).one()
+    rating_count = rating_count or 0
+
+    limit = current_app.config['FULL_SECTION_LIMIT']
+    try:
+        ratings, next_ratings = keyset_page(
+            serializers['rating'].query().filter(Rating.book_id == id),
+            Rating.id, cursor_arg='ratings_cursor', limit=limit
+        )
+        comments, next_comments = keyset_page(
+            serializers['comment'].query().filter(Comment.book_id == id),
+            Comment.id, cursor_arg='comments_cursor', limit=limit
+        )
+        reviews, next_reviews = keyset_page(
+            serializers['review'].query().filter(Review.book_id == id),
+            Review.id, cursor_arg='reviews_cursor', limit=limit
+        )
+    except InvalidCursor:
+        return jsonify({'msg': 'Invalid cursor'}), 400
+
+    response = jsonify({
         'id': book.id,
         'title': book.title,
         'author': ', '.join([a.name for a in book.authors]),
@@ -67,11 +202,20 @@ def get_book_full(id):
         'publish_year': book.publish_year,
         'series': book.series,
         'cover_url': book.cover_url,
-        'average_rating': avg_rating,
-        'ratings': [{'id': r.id, 'user_id': r.user_id, 'rating': r.rating} for r in ratings],
-        'comments': [{'id': c.id, 'user_id': c.user_id, 'content': c.content} for c in comments],
-        'reviews': [r.to_dict() for r in reviews]
-    }), 200
+        'average_rating': rating_sum / rating_count if rating_count else None,
+        'rating_count': rating_count,
+        'comment_count': comment_count,
+        'review_count': review_count,
+        'ratings': serializers['rating'].dump_rows(ratings),
+        'comments': serializers['comment'].dump_rows(comments),
+        'reviews': serializers['review'].dump_rows(reviews),
+        'next': {
+            'ratings': next_ratings,
+            'comments': next_comments,
+            'reviews': next_reviews
+        }
+    })
+    return add_validators(response, etag, last_modified), 200
 
 
 # Add new book endpoint
@@ -83,150 +227,110 @@ def add_book():
     tags:
       - Books
     """
-    from app.plugin_loader import load_plugins
-    from app.models import Tag, BookTag
+    from app.plugin_loader import registry
     data = request.get_json()
+    if not data:
+        return jsonify({'msg': 'Missing title'}), 400
     isbn = data.get('isbn')
 
-    # Ensure default author exists
-    default_author = Author.query.filter_by(name='No Author').first()
-    if not default_author:
-        default_author = Author(name='No Author')
-        db.session.add(default_author)
-        db.session.commit()
-
-    author_ids = []
-    from app.plugin_loader import load_plugins
-    plugins = load_plugins()
     plugin_name = data.get('plugin', 'GoogleBooksPlugin')
-    if plugin_name == 'GoodreadsPlugin':
-        plugin_name = 'OpenLibraryPlugin'
-    plugin = plugins.get(plugin_name)
-    gr_data = None
+    plugin = registry.get(PLUGIN_ALIASES.get(plugin_name, plugin_name))
     if isbn and plugin:
         gr_data = plugin.run({'isbn': isbn})
-        logging.debug(f'Enriched data from plugin {plugin_name} for ISBN {isbn}: {gr_data}')
-        if 'error' not in gr_data:
-            data['title'] = gr_data.get('title', data.get('title', ''))
-            data['description'] = gr_data.get('description', data.get('description', ''))
-            data['series'] = gr_data.get('series', data.get('series', ''))
-            
-            # Handle publish_year - extract year from date string if needed
-            publish_year_raw = gr_data.get('publish_year', data.get('publish_year'))
-            if publish_year_raw:
-                if isinstance(publish_year_raw, str):
-                    # Extract year from date string like "2016-10-18"
-                    try:
-                        data['publish_year'] = int(publish_year_raw.split('-')[0])
-                    except (ValueError, IndexError):
-                        data['publish_year'] = None
-                else:
-                    data['publish_year'] = publish_year_raw
-            else:
-                data['publish_year'] = None
-                
-            data['tags'] = gr_data.get('genres', data.get('tags', []))
-            # Handle authors
-            author_names = gr_data.get('authors', [])
-            author_ids = []
-            for name in author_names:
-                author = Author.query.filter_by(name=name).first()
-                if not author:
-                    author = Author(name=name)
-                    db.session.add(author)
-                    db.session.commit()
-                author_ids.append(author.id)
-    
-    # Handle authors from request data if no plugin authors found
-    if not author_ids:
-        author_names = data.get('authors', [])
-        for name in author_names:
-            if name and name.strip():
-                author = Author.query.filter_by(name=name.strip()).first()
-                if not author:
-                    author = Author(name=name.strip())
-                    db.session.add(author)
-                    db.session.commit()
-                author_ids.append(author.id)
-    # If no author found, use default
-    if not author_ids:
-        author_ids = [default_author.id]
-    if not data or not data.get('title'):
+        logger.debug('Enriched book from plugin', extra={
+            'plugin': plugin_name, 'isbn': isbn, 'fields': sorted(gr_data), 'error': gr_data.get('error')})
+        merge_enrichment(data, gr_data)
+
+    if not data.get('title'):
         return jsonify({'msg': 'Missing title'}), 400
-    # Check for at least one author
-    if not author_ids:
-        return jsonify({'msg': 'Missing author'}), 400
     if not data['title'].strip():
         return jsonify({'msg': 'Title cannot be empty'}), 400
+    author_names = clean_names(data.get('authors')) or [DEFAULT_AUTHOR]
+
     # Check for duplicate book with same title and authors
-    existing_books = Book.query.filter_by(title=data['title']).all()
+    existing_books = Book.query.options(selectinload(Book.authors)).filter_by(title=data['title'])
     for book in existing_books:
-        book_author_ids = set(a.id for a in book.authors)
-        if set(author_ids) == book_author_ids:
+        if set(author_names) == set(a.name for a in book.authors):
             return jsonify({'msg': 'Author and book already exist'}), 400
     # Check for duplicate ISBN
-    isbn_value = data.get('isbn')
-    if isbn_value:
-        existing_books = Book.query.filter_by(isbn=isbn_value).all()
-        if existing_books:
-            book = existing_books[0]
-            author_names = ', '.join([a.name for a in book.authors])
-            return jsonify({'msg': f'ISBN already exist. It belongs to {author_names}, {book.title}'}), 400
+    if isbn:
+        book = Book.query.options(selectinload(Book.authors)).filter_by(isbn=isbn).first()
+        if book:
+            author_list = ', '.join([a.name for a in book.authors])
+            return jsonify({'msg': f'ISBN already exist. It belongs to {author_list}, {book.title}'}), 400
+
+    # Everything below is one transaction: upsert authors/tags, insert book and links
+    authors = resolve_authors(author_names)
+    tags = resolve_tags(data.get('tags'))
     book = Book(
         title=data['title'],
-        isbn=isbn_value,
+        isbn=isbn,
         description=data.get('description', ''),
-        publish_year=data.get('publish_year'),
+        publish_year=parse_publish_year(data.get('publish_year')),
         series=data.get('series'),
-        cover_url=gr_data.get('cover_url') if gr_data and 'cover_url' in gr_data else data.get('cover_url')
+        cover_url=data.get('cover_url')
     )
+    book.authors = [authors[name] for name in author_names]
+    book.tags = list(tags.values())
     db.session.add(book)
-    db.session.commit()
-    # Link authors to book
-    for author_id in author_ids:
-        author = Author.query.get(author_id)
-        if author and author not in book.authors:
-            book.authors.append(author)
-    db.session.commit()
-    # Add tags (genres) if present
-    tag_names = data.get('tags', [])
-    for tag_name in tag_names:
-        clean_tag = tag_name.strip() if isinstance(tag_name, str) else str(tag_name)
-        if not clean_tag:
-            continue
-        tag = Tag.query.filter_by(name=clean_tag).first()
-        if not tag:
-            tag = Tag(name=clean_tag)
-            db.session.add(tag)
-            db.session.commit()
-        if tag not in book.tags:
-            book.tags.append(tag)
-    # If enriched genres exist, add them as tags
-    if gr_data and 'genres' in gr_data and gr_data['genres']:
-        for genre in gr_data['genres']:
-            clean_genre = genre.strip() if isinstance(genre, str) else str(genre)
-            if not clean_genre:
-                continue
-            tag = Tag.query.filter_by(name=clean_genre).first()
-            if not tag:
-                tag = Tag(name=clean_genre)
-                db.session.add(tag)
-                db.session.commit()
-            if tag not in book.tags:
-                book.tags.append(tag)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'msg': 'ISBN already exist'}), 400
     return jsonify({'id': book.id, 'title': book.title}), 201
 
+# Bulk import endpoint
+@books_bp.route('/books/bulk', methods=['POST'])
+@jwt_required()
+def bulk_import_books():
+    """Import many books from JSON, NDJSON or CSV
+    ---
+    tags:
+      - Books
+    parameters:
+      - name: format
+        in: query
+      - name: plugin
+        in: query
+    """
+    from app.plugin_loader import registry
+    fmt = request.args.get('format') or BULK_FORMATS.get(request.mimetype, 'json')
+    try:
+        records = parse_records(request.get_data(), fmt)
+    except ImportFormatError as e:
+        return jsonify({'msg': f'Invalid bulk payload: {e}'}), 400
+    max_items = current_app.config['BULK_IMPORT_MAX_ITEMS']
+    if len(records) > max_items:
+        return jsonify({'msg': f'Too many items; the limit is {max_items} per request. '
+                               'Split the file or use the import-books CLI command'}), 413
+    plugin_name = request.args.get('plugin', 'GoogleBooksPlugin')
+    plugin = registry.get(PLUGIN_ALIASES.get(plugin_name, plugin_name))
+    importer = BookImporter(
+        plugin=plugin,
+        workers=current_app.config['BULK_IMPORT_WORKERS'],
+        chunk_size=current_app.config['BULK_IMPORT_CHUNK_SIZE']
+    )
+    return jsonify(summarize(importer.run(records))), 200
+
 # Get book by ID endpoint
 @books_bp.route('/books/<int:id>', methods=['GET'])
+@cached_response('book:{id}')
 def get_book(id):
     """Get a book by ID
     ---
     tags:
       - Books
     """
+    last_modified = book_last_modified(id)
+    if last_modified is None:
+        abort(404)
+    etag = make_etag(last_modified.isoformat())
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
     book = Book.query.get_or_404(id)
-    return jsonify({
+    response = jsonify({
         'id': book.id,
         'title': book.title,
         'author': ', '.join([a.name for a in book.authors]),
@@ -234,7 +338,8 @@ def get_book(id):
         'publish_year': book.publish_year,
         'series': book.series,
         'cover_url': book.cover_url
-    }), 200
+    })
+    return add_validators(response, etag, last_modified), 200
 
 # Update book endpoint
 @books_bp.route('/books/<int:id>', methods=['PUT'])
@@ -260,29 +365,12 @@ def update_book(id):
         author_names = [name.strip() for name in author_names if name.strip()]
         if not author_names:
             return jsonify({'msg': 'Author cannot be empty'}), 400
-        book.authors.clear()
-        for name in author_names:
-            author = Author.query.filter_by(name=name).first()
-            if not author:
-                author = Author(name=name)
-                db.session.add(author)
-                db.session.commit()
-            book.authors.append(author)
+        authors = resolve_authors(author_names)
+        book.authors = [authors[name] for name in clean_names(author_names)]
     if 'description' in data:
         book.description = data['description']
     if 'publish_year' in data:
-        # Handle publish_year - extract year from date string if needed
-        publish_year_raw = data['publish_year']
-        if publish_year_raw:
-            if isinstance(publish_year_raw, str):
-                try:
-                    book.publish_year = int(publish_year_raw.split('-')[0])
-                except (ValueError, IndexError):
-                    book.publish_year = None
-            else:
-                book.publish_year = publish_year_raw
-        else:
-            book.publish_year = None
+        book.publish_year = parse_publish_year(data['publish_year'])
     if 'series' in data:
         book.series = data['series']
     if 'cover_url' in data:
@@ -312,22 +400,20 @@ def recheck_book_info(id):
     tags:
       - Books
     """
-    from app.plugin_loader import load_plugins
-    from app.models import Author, Tag
+    from app.plugin_loader import registry
     book = Book.query.get_or_404(id)
     data = request.get_json() or {}
     isbn = book.isbn
     plugin_name = data.get('plugin', 'GoogleBooksPlugin')
-    plugins = load_plugins()
-    if plugin_name == 'GoodreadsPlugin':
-        plugin_name = 'OpenLibraryPlugin'
-    plugin = plugins.get(plugin_name)
+    plugin_name = PLUGIN_ALIASES.get(plugin_name, plugin_name)
+    plugin = registry.get(plugin_name)
     if not plugin:
         return jsonify({'msg': f'Plugin {plugin_name} not found'}), 400
     if not isbn:
         return jsonify({'msg': 'Book does not have an ISBN'}), 400
     gr_data = plugin.run({'isbn': isbn})
-    logging.debug(f'Rechecked data from plugin {plugin_name} for ISBN {isbn}: {gr_data}')
+    logger.debug('Rechecked book with plugin', extra={
+        'plugin': plugin_name, 'isbn': isbn, 'fields': sorted(gr_data), 'error': gr_data.get('error')})
     if 'error' in gr_data:
         return jsonify({'msg': gr_data['error']}), 400
     # Update book fields
@@ -346,27 +432,12 @@ def recheck_book_info(id):
         else:
             book.publish_year = publish_year_raw
     # Update tags from enriched genres
-    if gr_data.get('genres'):
-        for genre in gr_data['genres']:
-            clean_genre = genre.strip() if isinstance(genre, str) else str(genre)
-            if not clean_genre:
-                continue
-            tag = Tag.query.filter_by(name=clean_genre).first()
-            if not tag:
-                tag = Tag(name=clean_genre)
-                db.session.add(tag)
-                db.session.commit()
-            if tag not in book.tags:
-                book.tags.append(tag)
+    for tag in resolve_tags(gr_data.get('genres')).values():
+        if tag not in book.tags:
+            book.tags.append(tag)
     # Update authors
-    author_names = gr_data.get('authors', [])
-    book.authors.clear()
-    for name in author_names:
-        author = Author.query.filter_by(name=name).first()
-        if not author:
-            author = Author(name=name)
-            db.session.add(author)
-            db.session.commit()
-        book.authors.append(author)
+    author_names = clean_names(gr_data.get('authors'))
+    authors = resolve_authors(author_names)
+    book.authors = [authors[name] for name in author_names]
     db.session.commit()
     return jsonify({'msg': 'Book info rechecked and updated', 'id': book.id, 'title': book.title}), 200
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models import Comment
+from app.serializers import serializers
 
 comments_bp = Blueprint('comments', __name__)
 
@@ -13,8 +14,8 @@ def get_comments(id):
     tags:
         - Comments
     """
-    comments = Comment.query.filter_by(book_id=id).all()
-    return jsonify([{'id': c.id, 'content': c.content, 'user_id': c.user_id} for c in comments]), 200
+    serializer = serializers['comment']
+    return jsonify(serializer.dump_rows(serializer.query().filter(Comment.book_id == id))), 200
 
 # Add comment for a book endpoint
 @comments_bp.route('/books/<int:id>/comments', methods=['POST'])
@@ -0,0 +1,122 @@
+import csv
+import io
+import json
+from datetime import datetime
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from sqlalchemy import select
+from app import db
+from app.models import Book, Rating, Review, User
+from app.serializers import book_author_names, book_tag_names
+
+export_bp = Blueprint('export', __name__, url_prefix='/export')
+
+EXPORT_FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+BOOK_FIELDS = ['id', 'title', 'isbn', 'description', 'publish_year', 'series', 'language', 'cover_url',
+               'authors', 'tags']
+REVIEW_FIELDS = ['id', 'book_id', 'user_id', 'username', 'review_text', 'reading_format', 'created_at',
+                 'updated_at']
+RATING_FIELDS = ['id', 'book_id', 'user_id', 'rating', 'created_at', 'updated_at']
+
+
+def _value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _book_batches(batch_size):
+    """Yield lists of book dicts; authors and tags cost one query per batch, not per book."""
+    columns = [getattr(Book, field) for field in BOOK_FIELDS[:-2]]
+    result = db.session.execute(
+        select(*columns).order_by(Book.id).execution_options(yield_per=batch_size)
+    )
+    for rows in result.partitions():
+        ids = [row.id for row in rows]
+        authors = book_author_names(ids)
+        tags = book_tag_names(ids)
+        yield [
+            dict(row._mapping, authors=authors.get(row.id, []), tags=tags.get(row.id, []))
+            for row in rows
+        ]
+
+
+def _row_batches(statement, batch_size):
+    result = db.session.execute(statement.execution_options(yield_per=batch_size))
+    for rows in result.partitions():
+        yield [dict(row._mapping) for row in rows]
+
+
+def _ndjson(batches, fields):
+    for batch in batches:
+        yield ''.join(
+            json.dumps({field: _value(record[field]) for field in fields}) + '\n' for record in batch
+        )
+
+
+def _csv(batches, fields):
+    """CSV in the bulk import layout: list columns are joined with ';'."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    yield buffer.getvalue()
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        for record in batch:
+            writer.writerow([
+                ';'.join(value) if isinstance(value, list) else _value(value)
+                for value in (record[field] for field in fields)
+            ])
+        yield buffer.getvalue()
+
+
+def _export(name, fields, make_batches):
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'msg': f"Unsupported format: {fmt}"}), 400
+    batches = make_batches(current_app.config['EXPORT_BATCH_SIZE'])
+    chunks = _ndjson(batches, fields) if fmt == 'ndjson' else _csv(batches, fields)
+    return Response(stream_with_context(chunks), mimetype=EXPORT_FORMATS[fmt], headers={
+        'Content-Disposition': f'attachment; filename={name}.{fmt}',
+        # Let reverse proxies pass chunks through as they are produced
+        'X-Accel-Buffering': 'no',
+    })
+
+
+@export_bp.route('/books', methods=['GET'])
+def export_books():
+    """Stream every book as NDJSON (default) or CSV
+    ---
+    tags:
+      - Export
+    parameters:
+      - name: format
+        in: query
+        description: ndjson or csv
+    """
+    return _export('books', BOOK_FIELDS, _book_batches)
+
+
+@export_bp.route('/reviews', methods=['GET'])
+def export_reviews():
+    """Stream every review as NDJSON (default) or CSV
+    ---
+    tags:
+      - Export
+    """
+    statement = (
+        select(*[getattr(Review, f) for f in REVIEW_FIELDS if f != 'username'], User.username)
+        .outerjoin(User, User.id == Review.user_id)
+        .order_by(Review.id)
+    )
+    return _export('reviews', REVIEW_FIELDS, lambda size: _row_batches(statement, size))
+
+
+@export_bp.route('/ratings', methods=['GET'])
+def export_ratings():
+    """Stream every rating as NDJSON (default) or CSV
+    ---
+    tags:
+      - Export
+    """
+    statement = select(*[getattr(Rating, f) for f in RATING_FIELDS]).order_by(Rating.id)
+    return _export('ratings', RATING_FIELDS, lambda size: _row_batches(statement, size))
@@ -0,0 +1,31 @@
+from flask import Blueprint, jsonify
+from app.db_utils import get_health_status
+from app.health import health_prober
+
+health_bp = Blueprint('health', __name__)
+
+
+@health_bp.route('/health', methods=['GET'])
+def health_check():
+    return get_health_status()
+
+
+@health_bp.route('/health/live', methods=['GET'])
+def live():
+    """Liveness: the worker answers requests. No database or network I/O
+    ---
+    tags:
+      - Health
+    """
+    return jsonify({'status': 'alive'}), 200
+
+
+@health_bp.route('/health/ready', methods=['GET'])
+def ready():
+    """Readiness from the background prober's last check; 503 when not ready
+    ---
+    tags:
+      - Health
+    """
+    body, is_ready = health_prober.readiness()
+    return jsonify(body), 200 if is_ready else 503
@@ -2,10 +2,10 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from app import db
 from app.models import Plugin
-from app.plugin_loader import load_plugins
+from app.plugin_loader import registry
+from app.enrichment_cache import enrichment_cache
 
 plugins_bp = Blueprint('plugins', __name__)
-plugins = load_plugins()
 
 @plugins_bp.route('/plugins', methods=['GET'])
 def get_plugins():
@@ -36,9 +36,25 @@ def unload_plugin():
     db.session.commit()
     return jsonify({'msg': 'Plugin unloaded'}), 200
 
+@plugins_bp.route('/plugins/reload', methods=['POST'])
+@jwt_required()
+def reload_plugins():
+    plugins = registry.reload()
+    return jsonify({'msg': 'Plugins reloaded', 'plugins': sorted(plugins)}), 200
+
+@plugins_bp.route('/plugins/cache', methods=['GET'])
+def get_plugin_cache_stats():
+    return jsonify(enrichment_cache.stats()), 200
+
+@plugins_bp.route('/plugins/cache', methods=['DELETE'])
+@jwt_required()
+def clear_plugin_cache():
+    enrichment_cache.clear()
+    return jsonify({'msg': 'Enrichment cache cleared'}), 200
+
 @plugins_bp.route('/plugins/<plugin_name>/run', methods=['POST'])
 def run_plugin(plugin_name):
-    plugin = plugins.get(plugin_name)
+    plugin = registry.get(plugin_name)
     if not plugin:
         return jsonify({'error': 'Plugin not found'}), 404
     data = request.get_json() or {}
@@ -1,23 +1,29 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from app.models import Rating
+from app.models import Rating, RatingSummary
+from app.response_cache import cached_response
 
 ratings_bp = Blueprint('ratings', __name__)
 
 # Get ratings for a book endpoint
 @ratings_bp.route('/books/<int:id>/ratings', methods=['GET'])
+@cached_response('book:{id}')
 def get_ratings(id):
     """Get average rating for a book
     ---
     tags:
         - Ratings
     """
-    ratings = Rating.query.filter_by(book_id=id).all()
-    if not ratings:
+    summary = db.session.get(RatingSummary, id)
+    if not summary or not summary.rating_count:
         return jsonify({'average': None}), 200
-    avg = sum(r.rating for r in ratings) / len(ratings)
-    return jsonify({'id': id, 'average': avg}), 200
+    return jsonify({
+        'id': id,
+        'average': summary.average,
+        'count': summary.rating_count,
+        'histogram': summary.histogram
+    }), 200
 
 # Add rating for a book endpoint
 @ratings_bp.route('/books/<int:id>/ratings', methods=['POST'])
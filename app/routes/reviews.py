@@ -3,15 +3,29 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models import Review, Book, User
 from app.db_utils import handle_db_errors
+from app.response_cache import cached_response
+from app.serializers import UnknownField, serializers
 
 reviews_bp = Blueprint('reviews', __name__, url_prefix='/reviews')
 
+def _review_list(query_filter=None):
+    """Reviews as a JSON list, honouring ?fields= with a column projection."""
+    serializer = serializers['review']
+    try:
+        fields = serializer.parse_fields(request.args.get('fields'))
+    except UnknownField as e:
+        return jsonify({'error': str(e)}), 400
+    query = serializer.query(fields)
+    if query_filter is not None:
+        query = query.filter(query_filter)
+    return jsonify(serializer.dump_rows(query.order_by(Review.id), fields)), 200
+
 @reviews_bp.route('', methods=['GET'])
 @handle_db_errors
+@cached_response('reviews')
 def get_all_reviews():
     """Get all reviews"""
-    reviews = Review.query.all()
-    return jsonify([review.to_dict() for review in reviews]), 200
+    return _review_list()
 
 @reviews_bp.route('/<int:review_id>', methods=['GET'])
 @handle_db_errors
@@ -25,16 +39,14 @@ def get_review(review_id):
 def get_book_reviews(book_id):
     """Get all reviews for a specific book"""
     book = Book.query.get_or_404(book_id)
-    reviews = Review.query.filter_by(book_id=book_id).all()
-    return jsonify([review.to_dict() for review in reviews]), 200
+    return _review_list(Review.book_id == book_id)
 
 @reviews_bp.route('/user/<int:user_id>', methods=['GET'])
 @handle_db_errors
 def get_user_reviews(user_id):
     """Get all reviews by a specific user"""
     user = User.query.get_or_404(user_id)
-    reviews = Review.query.filter_by(user_id=user_id).all()
-    return jsonify([review.to_dict() for review in reviews]), 200
+    return _review_list(Review.user_id == user_id)
 
 @reviews_bp.route('', methods=['POST'])
 @jwt_required()
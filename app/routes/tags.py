@@ -2,6 +2,10 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from app import db
 from app.models import Tag
+from app.conditional import add_validators, make_etag, not_modified
+from app.versions import collection_version
+from app.response_cache import cached_response
+from app.serializers import UnknownField, serializers
 
 import json
 import os
@@ -20,14 +24,25 @@ tags_bp = Blueprint('tags', __name__)
 
 # Get all tags endpoint
 @tags_bp.route('/tags', methods=['GET'])
+@cached_response('tags')
 def get_tags():
     """Get all tags
     ---
     tags:
         - Tags
     """
-    tags = Tag.query.all()
-    return jsonify([{'id': t.id, 'name': t.name} for t in tags]), 200
+    version, last_modified = collection_version('tags')
+    etag = make_etag(version)
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
+    serializer = serializers['tag']
+    try:
+        fields = serializer.parse_fields(request.args.get('fields'))
+    except UnknownField as e:
+        return jsonify({'msg': str(e)}), 400
+    response = jsonify(serializer.dump_rows(serializer.query(fields).order_by(Tag.id), fields))
+    return add_validators(response, etag, last_modified), 200
 
 # Add new tag endpoint
 @tags_bp.route('/tags', methods=['POST'])
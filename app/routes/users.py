@@ -2,10 +2,14 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, create_access_token, get_jwt_identity
 from app import db
 from app.models import User
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.passwords import HashingBusy, passwords
 
 users_bp = Blueprint('users', __name__)
 
+@users_bp.errorhandler(HashingBusy)
+def hashing_busy(e):
+    return jsonify({'msg': 'Too many login attempts in progress, please retry'}), 503, {'Retry-After': '1'}
+
 @users_bp.route('/users/register', methods=['POST'])
 def register():
     """User registration
@@ -21,7 +25,7 @@ def register():
     user = User(
         username=data['username'],
         email=data['email'],
-        password_hash=generate_password_hash(data['password'])
+        password_hash=passwords.hash(data['password'])
     )
     db.session.add(user)
     db.session.commit()
@@ -36,7 +40,14 @@ def login():
     """
     data = request.get_json()
     user = User.query.filter_by(username=data.get('username')).first()
-    if user and check_password_hash(user.password_hash, data.get('password')):
+    if not user or not data.get('password'):
+        return jsonify({'msg': 'Invalid credentials'}), 401
+    ok, new_hash = passwords.verify(user.password_hash, data['password'])
+    if ok:
+        if new_hash:
+            # Hasher or cost settings changed since this hash was stored
+            user.password_hash = new_hash
+            db.session.commit()
         access_token = create_access_token(identity=str(user.id))
         return jsonify({'access_token': access_token}), 200
     return jsonify({'msg': 'Invalid credentials'}), 401
@@ -0,0 +1,177 @@
+"""
+Full-text book search over titles, authors, tags and descriptions.
+
+The index lives in a `book_search` table: an FTS5 virtual table on SQLite,
+a weighted tsvector with a GIN index on Postgres. It is kept in sync with
+Book, Author and Tag writes by the session hooks at the bottom of this module.
+"""
+import re
+from flask import current_app
+from sqlalchemy import DDL, bindparam, event, inspect, text
+from sqlalchemy.orm import Session
+from app import db
+from app.models import Author, Book, Tag
+
+MAX_TERMS = 10
+INDEXED_BOOK_ATTRS = ('title', 'description', 'authors', 'tags')
+
+SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS book_search USING fts5("
+    "title, authors, tags, description, "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+POSTGRES_DDL = (
+    "CREATE TABLE IF NOT EXISTS book_search ("
+    "book_id INTEGER PRIMARY KEY REFERENCES books(id) ON DELETE CASCADE, "
+    "document tsvector NOT NULL); "
+    "CREATE INDEX IF NOT EXISTS ix_book_search_document ON book_search USING GIN (document)"
+)
+
+SQLITE_INDEX = """
+    INSERT INTO book_search (rowid, title, authors, tags, description)
+    SELECT b.id, b.title,
+        coalesce((SELECT group_concat(a.name, ' ') FROM book_authors ba
+                  JOIN authors a ON a.id = ba.author_id WHERE ba.book_id = b.id), ''),
+        coalesce((SELECT group_concat(t.name, ' ') FROM book_tags bt
+                  JOIN tags t ON t.id = bt.tag_id WHERE bt.book_id = b.id), ''),
+        coalesce(b.description, '')
+    FROM books b
+"""
+POSTGRES_INDEX = """
+    INSERT INTO book_search (book_id, document)
+    SELECT b.id,
+        setweight(to_tsvector(CAST(:config AS regconfig), coalesce(b.title, '')), 'A') ||
+        setweight(to_tsvector(CAST(:config AS regconfig), coalesce(
+            (SELECT string_agg(a.name, ' ') FROM book_authors ba
+             JOIN authors a ON a.id = ba.author_id WHERE ba.book_id = b.id), '')), 'B') ||
+        setweight(to_tsvector(CAST(:config AS regconfig), coalesce(
+            (SELECT string_agg(t.name, ' ') FROM book_tags bt
+             JOIN tags t ON t.id = bt.tag_id WHERE bt.book_id = b.id), '')), 'C') ||
+        setweight(to_tsvector(CAST(:config AS regconfig), coalesce(b.description, '')), 'D')
+    FROM books b
+"""
+
+# bm25 column weights: title, authors, tags, description (lower score = better)
+SQLITE_SEARCH = """
+    SELECT rowid AS id FROM book_search WHERE book_search MATCH :query
+    ORDER BY bm25(book_search, 10.0, 5.0, 3.0, 1.0), rowid LIMIT :limit OFFSET :offset
+"""
+POSTGRES_SEARCH = """
+    SELECT book_id AS id FROM book_search, to_tsquery(CAST(:config AS regconfig), :query) query
+    WHERE document @@ query
+    ORDER BY ts_rank_cd(document, query) DESC, book_id LIMIT :limit OFFSET :offset
+"""
+
+event.listen(db.metadata, 'after_create', DDL(SQLITE_DDL).execute_if(dialect='sqlite'))
+event.listen(db.metadata, 'after_create', DDL(POSTGRES_DDL).execute_if(dialect='postgresql'))
+event.listen(db.metadata, 'before_drop', DDL('DROP TABLE IF EXISTS book_search'))
+
+
+def _text_config():
+    try:
+        return current_app.config.get('SEARCH_TEXT_CONFIG', 'english')
+    except RuntimeError:
+        return 'english'
+
+
+def search_terms(q):
+    return re.findall(r'\w+', (q or '').lower())[:MAX_TERMS]
+
+
+def search_book_ids(q, limit, offset=0):
+    """
+    Ranked book ids matching every term of q; each term also matches as a prefix.
+    Returns: list of ids, best match first
+    """
+    terms = search_terms(q)
+    if not terms:
+        return []
+    dialect = db.session.get_bind().dialect.name
+    params = {'limit': limit, 'offset': offset}
+    if dialect == 'sqlite':
+        sql = SQLITE_SEARCH
+        params['query'] = ' '.join(f'"{term}"*' for term in terms)
+    elif dialect == 'postgresql':
+        sql = POSTGRES_SEARCH
+        params['query'] = ' & '.join(f'{term}:*' for term in terms)
+        params['config'] = _text_config()
+    else:
+        # No inverted index on other backends; fall back to a title match
+        query = Book.query.with_entities(Book.id)
+        for term in terms:
+            query = query.filter(Book.title.ilike(f'%{term}%'))
+        return [row.id for row in query.order_by(Book.id).limit(limit).offset(offset)]
+    return [row.id for row in db.session.execute(text(sql), params)]
+
+
+def reindex_books(connection, book_ids=None):
+    """
+    Rebuild search documents for book_ids (all books when None).
+    One DELETE and one INSERT ... SELECT regardless of how many ids.
+    """
+    dialect = connection.dialect.name
+    if dialect not in ('sqlite', 'postgresql'):
+        return
+    key = 'rowid' if dialect == 'sqlite' else 'book_id'
+    insert = SQLITE_INDEX if dialect == 'sqlite' else POSTGRES_INDEX
+    params = {'config': _text_config()} if dialect == 'postgresql' else {}
+    if book_ids is None:
+        connection.execute(text('DELETE FROM book_search'))
+        connection.execute(text(insert), params)
+        return
+    book_ids = sorted(book_ids)
+    if not book_ids:
+        return
+    ids = bindparam('ids', expanding=True)
+    connection.execute(text(f'DELETE FROM book_search WHERE {key} IN :ids').bindparams(ids), {'ids': book_ids})
+    connection.execute(text(insert + ' WHERE b.id IN :ids').bindparams(ids), dict(params, ids=book_ids))
+
+
+def linked_book_ids(session, table, column, value):
+    result = session.execute(text(f'SELECT book_id FROM {table} WHERE {column} = :value'), {'value': value})
+    return {row.book_id for row in result}
+
+
+def _renamed(obj):
+    return inspect(obj).attrs.name.history.has_changes()
+
+
+@event.listens_for(Session, 'before_flush')
+def collect_search_changes(session, flush_context, instances):
+    """
+    Record which books need their search document rebuilt. Runs before the
+    flush so links of authors/tags being renamed or deleted can still be read.
+    """
+    pending = session.info.setdefault('search_pending', {'books': set(), 'ids': set()})
+    for obj in session.new:
+        if isinstance(obj, Book):
+            pending['books'].add(obj)
+    for obj in session.dirty:
+        if isinstance(obj, Book) and any(
+            inspect(obj).attrs[attr].history.has_changes() for attr in INDEXED_BOOK_ATTRS
+        ):
+            pending['books'].add(obj)
+    for obj in session.deleted:
+        if isinstance(obj, Book) and obj.id is not None:
+            pending['ids'].add(obj.id)
+    for obj in list(session.dirty) + list(session.deleted):
+        if obj.__class__ not in (Author, Tag) or obj.id is None:
+            continue
+        if obj in session.deleted or _renamed(obj):
+            table, column = ('book_authors', 'author_id') if isinstance(obj, Author) else ('book_tags', 'tag_id')
+            pending['ids'].update(linked_book_ids(session, table, column, obj.id))
+
+
+@event.listens_for(Session, 'after_flush')
+def update_search_index(session, flush_context):
+    pending = session.info.pop('search_pending', None)
+    if not pending:
+        return
+    book_ids = pending['ids'] | {book.id for book in pending['books'] if book.id is not None}
+    if book_ids:
+        reindex_books(session.connection(), book_ids)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def discard_search_changes(session, previous_transaction):
+    session.info.pop('search_pending', None)
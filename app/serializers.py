@@ -0,0 +1,147 @@
+"""
+Serializer registry: per-model column projections and row-to-dict dumping.
+
+List endpoints select only the columns a serializer needs (no ORM entities
+are hydrated), then dump the resulting rows. To-many fields such as a book's
+author names are filled by one batched query per page.
+"""
+from datetime import datetime
+from app import db
+from app.models import Author, Book, Comment, Rating, Review, Tag, User
+from app.models.book import book_authors
+from app.models.booktag import BookTag
+from app.user_cache import user_cache
+
+serializers = {}
+
+
+class UnknownField(ValueError):
+    """Raised when ?fields= names a field the serializer does not offer"""
+
+
+def names_by_book(model, link_table, link_column, book_ids):
+    """{book_id: [names]} for a batch of books in a single query."""
+    names = {}
+    if not book_ids:
+        return names
+    rows = db.session.execute(
+        db.select(link_table.c.book_id, model.name)
+        .join(model, link_column == model.id)
+        .where(link_table.c.book_id.in_(book_ids))
+        .order_by(link_table.c.book_id, model.id)
+    )
+    for book_id, name in rows:
+        names.setdefault(book_id, []).append(name)
+    return names
+
+
+def book_author_names(book_ids):
+    return names_by_book(Author, book_authors, book_authors.c.author_id, book_ids)
+
+
+def book_tag_names(book_ids):
+    return names_by_book(Tag, BookTag.__table__, BookTag.__table__.c.tag_id, book_ids)
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class Serializer:
+    """
+    columns: {field: column expression}; must include 'id'
+    joins: (model, onclause) pairs, outer-joined only when one of their columns is selected
+    relations: {field: loader(ids) -> {id: value}} for to-many fields
+    getters: {field: callable(obj)} overriding getattr when dumping an instance
+    """
+    def __init__(self, model, columns, joins=(), relations=None, getters=None):
+        self.model = model
+        self.columns = dict(columns)
+        self.joins = joins
+        self.relations = relations or {}
+        self.getters = getters or {}
+        self.fields = list(self.columns) + list(self.relations)
+
+    def parse_fields(self, raw):
+        """
+        Parse a comma-separated ?fields= value. 'id' is always included.
+        Returns: list of field names, or None (all fields) when raw is empty
+        """
+        if not raw:
+            return None
+        fields = [f.strip() for f in raw.split(',') if f.strip()]
+        unknown = [f for f in fields if f not in self.fields]
+        if unknown:
+            raise UnknownField(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(self.fields)}")
+        return list(dict.fromkeys(['id'] + fields))
+
+    def query(self, fields=None):
+        """Column-only query for fields (all by default); 'id' is always selected."""
+        fields = self.fields if fields is None else fields
+        names = ['id'] + [f for f in fields if f in self.columns and f != 'id']
+        columns = [self.columns[name] for name in names]
+        query = db.session.query(*[column.label(name) for name, column in zip(names, columns)])
+        query = query.select_from(self.model)
+        tables = {column.table for column in columns}
+        for target, onclause in self.joins:
+            if target.__table__ in tables:
+                query = query.outerjoin(target, onclause)
+        return query
+
+    def dump_rows(self, rows, fields=None):
+        """Dicts for rows returned by query(fields); batched loads for relation fields."""
+        fields = self.fields if fields is None else fields
+        records = [{key: _plain(value) for key, value in row._asdict().items()} for row in rows]
+        ids = [record['id'] for record in records]
+        for name in fields:
+            if name in self.relations:
+                values = self.relations[name](ids)
+                for record in records:
+                    record[name] = values.get(record['id'], [])
+        return records
+
+    def dump(self, obj, fields=None):
+        """Dict for one already loaded instance."""
+        fields = self.fields if fields is None else fields
+        record = {}
+        for name in fields:
+            if name in self.getters:
+                record[name] = _plain(self.getters[name](obj))
+            elif name in self.relations:
+                record[name] = self.relations[name]([obj.id]).get(obj.id, [])
+            else:
+                record[name] = _plain(getattr(obj, name))
+        return record
+
+
+def _review_username(review):
+    # Usually the requesting user, already resolved by app.user_cache; no lazy load
+    user = user_cache.get(review.user_id) if review.user_id is not None else None
+    return user.username if user else None
+
+
+def register(name, serializer):
+    serializers[name] = serializer
+    return serializer
+
+
+def _columns(model, *names):
+    return {name: getattr(model, name) for name in names}
+
+
+register('book', Serializer(
+    Book,
+    _columns(Book, 'id', 'title', 'description', 'publish_year', 'series'),
+    relations={'authors': book_author_names},
+    getters={'authors': lambda book: [a.name for a in book.authors]},
+))
+register('review', Serializer(
+    Review,
+    dict(_columns(Review, 'id', 'book_id', 'user_id'), username=User.username,
+         **_columns(Review, 'review_text', 'reading_format', 'created_at', 'updated_at')),
+    joins=[(User, User.id == Review.user_id)],
+    getters={'username': _review_username},
+))
+register('tag', Serializer(Tag, _columns(Tag, 'id', 'name')))
+register('comment', Serializer(Comment, _columns(Comment, 'id', 'user_id', 'content')))
+register('rating', Serializer(Rating, _columns(Rating, 'id', 'user_id', 'rating')))
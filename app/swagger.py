@@ -1,5 +1,6 @@
-from flask import Blueprint, send_from_directory
+from flask import Blueprint
 from flask_swagger_ui import get_swaggerui_blueprint
+from app.compression import PrecompressedAsset
 import os
 
 SWAGGER_URL = '/docs'
@@ -12,8 +13,13 @@ swaggerui_blueprint = get_swaggerui_blueprint(
     }
 )
 
+# Read and compressed once at startup, served from memory
+swagger_spec = PrecompressedAsset(
+    os.path.join(os.path.dirname(__file__), 'static', 'swagger.json'), 'application/json'
+)
+
 docs = Blueprint('docs', __name__)
 
 @docs.route('/static/swagger.json')
 def swagger_json():
-    return send_from_directory(os.path.join(os.path.dirname(__file__), 'static'), 'swagger.json')
+    return swagger_spec.response()
@@ -0,0 +1,121 @@
+"""
+Resolve the JWT identity to the requesting user without a users query per request.
+
+Registered as flask_jwt_extended's user lookup, so every @jwt_required()
+request gets `current_user` as a UserSnapshot (id, username, is_active) and
+deleted or deactivated users are rejected with 401. Snapshots are cached for
+the request and, per worker process, for USER_CACHE_TTL seconds; a commit that
+changes or deletes a user evicts it. Other workers may keep a stale snapshot
+until it expires, so keep the TTL short.
+"""
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from flask import g, has_app_context, jsonify
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import db, jwt
+from app.models import User
+
+UserSnapshot = namedtuple('UserSnapshot', 'id username is_active')
+
+
+class UserCache:
+    def __init__(self, app=None):
+        self.size = 1024
+        self.ttl = 30
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.size = app.config.get('USER_CACHE_SIZE', 1024)
+        self.ttl = app.config.get('USER_CACHE_TTL', 30)
+        self.clear()
+        jwt.user_lookup_loader(self._jwt_lookup)
+        jwt.user_lookup_error_loader(self._jwt_lookup_error)
+
+    def _jwt_lookup(self, jwt_header, jwt_data):
+        try:
+            user = self.get(int(jwt_data['sub']))
+        except (TypeError, ValueError):
+            return None
+        return user if user is not None and user.is_active else None
+
+    def _jwt_lookup_error(self, jwt_header, jwt_data):
+        return jsonify({'msg': 'User not found or inactive'}), 401
+
+    def get(self, user_id):
+        """UserSnapshot for user_id, or None if there is no such user."""
+        local = g.setdefault('user_snapshots', {}) if has_app_context() else {}
+        if user_id in local:
+            return local[user_id]
+        user = self._cached(user_id)
+        if user is None:
+            user = local[user_id] = self._load(user_id)
+            if user is not None:
+                self._store(user)
+        else:
+            local[user_id] = user
+        return user
+
+    def _cached(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                return entry[0]
+            self._entries.pop(user_id, None)
+            return None
+
+    def _load(self, user_id):
+        row = db.session.query(User.id, User.username, User.is_active).filter(User.id == user_id).first()
+        if row is None:
+            return None
+        return UserSnapshot(row.id, row.username, row.is_active is not False)
+
+    def _store(self, user):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[user.id] = (user, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def evict(self, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+        if has_app_context():
+            local = g.get('user_snapshots')
+            for user_id in user_ids if local else ():
+                local.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_changed_users(session, flush_context, instances):
+    changed = session.info.setdefault('user_cache_evict', set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            changed.add(obj.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _evict_changed_users(session):
+    changed = session.info.pop('user_cache_evict', None)
+    if changed:
+        user_cache.evict(changed)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_changed_users(session):
+    session.info.pop('user_cache_evict', None)
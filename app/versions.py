@@ -0,0 +1,166 @@
+"""
+Cheap change markers for HTTP validators.
+
+Collections ('books', 'tags', 'reviews') carry a counter in `resource_versions`;
+a single book is versioned by its own `updated_at`, which is also touched when
+its authors, tags, ratings, comments or reviews change. Both are maintained by
+the session hooks below, so a conditional GET costs one primary-key lookup.
+The counters and the touched books are written right after commit in their own
+short transaction: writers never hold those shared rows locked while their own
+transaction runs. What changed is also kept on the session until commit for
+cache invalidation (see `take_committed_changes`).
+"""
+import logging
+from datetime import datetime, timezone
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app import db
+from app.book_import import UPSERT_DIALECTS
+from app.models import Author, Book, BookTag, Comment, Rating, ResourceVersion, Review, Tag, User
+from app.search import linked_book_ids
+
+BOOK_CHILDREN = (Comment, Rating, Review)
+
+logger = logging.getLogger(__name__)
+
+
+def collection_version(name):
+    """Returns: (version, last_modified) for a collection; (0, None) before its first write."""
+    row = db.session.get(ResourceVersion, name)
+    return (row.version, row.updated_at) if row else (0, None)
+
+
+def book_last_modified(book_id):
+    """Returns: when the book or anything embedded in its responses last changed, or None if it does not exist."""
+    row = db.session.query(Book.created_at, Book.updated_at).filter(Book.id == book_id).first()
+    if row is None:
+        return None
+    return row.updated_at or row.created_at
+
+
+def take_committed_changes(session):
+    """
+    Pop what this session's flushes changed since the last commit.
+    Returns: {'collections': set of names, 'book_ids': set of ids, 'touched_ids': set of ids} or None
+    """
+    return session.info.pop('version_changes', None)
+
+
+def _child_book_ids(obj):
+    history = inspect(obj).attrs.book_id.history
+    return {obj.book_id, *history.deleted} - {None}
+
+
+@event.listens_for(Session, 'before_flush')
+def collect_version_changes(session, flush_context, instances):
+    pending = session.info.setdefault('version_pending', {
+        'collections': set(), 'book_ids': set(), 'new_books': set(), 'deleted_ids': set()
+    })
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, Book):
+            pending['collections'].add('books')
+            if obj in session.new:
+                pending['new_books'].add(obj)
+            else:
+                pending['deleted_ids'].add(obj.id)
+        elif isinstance(obj, Tag):
+            pending['collections'].add('tags')
+        elif isinstance(obj, BookTag):
+            pending['collections'].add('books')
+            pending['book_ids'].add(obj.book_id)
+        elif isinstance(obj, BOOK_CHILDREN):
+            pending['book_ids'].update(_child_book_ids(obj))
+        if isinstance(obj, Review):
+            pending['collections'].add('reviews')
+    for obj in session.dirty:
+        if not session.is_modified(obj):
+            continue
+        if isinstance(obj, Book):
+            pending['collections'].add('books')
+            pending['book_ids'].add(obj.id)
+        elif isinstance(obj, Tag):
+            pending['collections'].add('tags')
+        elif isinstance(obj, BOOK_CHILDREN):
+            pending['book_ids'].update(_child_book_ids(obj))
+            if isinstance(obj, Review):
+                pending['collections'].add('reviews')
+    # Books list their authors and are filtered by tag name
+    for obj in list(session.dirty) + list(session.deleted):
+        if obj.__class__ not in (Author, Tag) or obj.id is None:
+            continue
+        if obj in session.deleted or inspect(obj).attrs.name.history.has_changes():
+            table, column = ('book_authors', 'author_id') if isinstance(obj, Author) else ('book_tags', 'tag_id')
+            pending['collections'].add('books')
+            pending['book_ids'].update(linked_book_ids(session, table, column, obj.id))
+    # Reviews embed the reviewer's username
+    for obj in list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, User) or obj.id is None:
+            continue
+        if obj in session.deleted or inspect(obj).attrs.username.history.has_changes():
+            pending['collections'].add('reviews')
+            pending['book_ids'].update(linked_book_ids(session, 'reviews', 'user_id', obj.id))
+
+
+def _bump(connection, names, now):
+    table = ResourceVersion.__table__
+    dialect = connection.dialect.name
+    for name in sorted(names):
+        if dialect in UPSERT_DIALECTS:
+            statement = UPSERT_DIALECTS[dialect](table).values(name=name, version=1, updated_at=now)
+            connection.execute(statement.on_conflict_do_update(
+                index_elements=['name'], set_={'version': table.c.version + 1, 'updated_at': now}
+            ))
+            continue
+        result = connection.execute(
+            table.update().where(table.c.name == name).values(version=table.c.version + 1, updated_at=now)
+        )
+        if not result.rowcount:
+            connection.execute(table.insert().values(name=name, version=1, updated_at=now))
+
+
+@event.listens_for(Session, 'after_flush')
+def record_version_changes(session, flush_context):
+    pending = session.info.pop('version_pending', None)
+    if not pending:
+        return
+    book_ids = pending['book_ids'] - {None}
+    changes = session.info.setdefault('version_changes', {
+        'collections': set(), 'book_ids': set(), 'touched_ids': set()
+    })
+    changes['collections'] |= pending['collections']
+    changes['touched_ids'] |= book_ids
+    changes['book_ids'].update(book_ids, pending['deleted_ids'], (book.id for book in pending['new_books']))
+    session.info['version_engine'] = session.connection().engine
+
+
+# Registered before the response cache's hook (that module imports this one),
+# so the counters move before cached entries are invalidated.
+@event.listens_for(Session, 'after_commit')
+def apply_version_changes(session):
+    engine = session.info.pop('version_engine', None)
+    changes = session.info.get('version_changes')
+    if engine is None or not changes:
+        return
+    now = datetime.now(timezone.utc)
+    try:
+        with engine.begin() as connection:
+            book_ids = sorted(changes['touched_ids'])
+            if book_ids:
+                table = Book.__table__
+                connection.execute(table.update().where(table.c.id.in_(book_ids)).values(updated_at=now))
+            if changes['collections']:
+                _bump(connection, changes['collections'], now)
+    except Exception as e:
+        # The write itself is committed; validators catch up on the next write
+        logger.error(f'Version bump failed for {sorted(changes["collections"])}: {e}')
+
+
+@event.listens_for(Session, 'after_rollback')
+def discard_committed_changes(session):
+    session.info.pop('version_changes', None)
+    session.info.pop('version_engine', None)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def discard_version_changes(session, previous_transaction):
+    session.info.pop('version_pending', None)
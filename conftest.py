@@ -30,4 +30,11 @@ def client(app):
 @pytest.fixture
 def runner(app):
     """Create a test runner for the Flask application."""
-    return app.test_cli_runner()
\ No newline at end of file
+    return app.test_cli_runner()
+
+@pytest.fixture(autouse=True)
+def empty_response_cache():
+    """The default response cache is a file shared across app instances; tests recreate ids, so empty it after each."""
+    yield
+    from app.response_cache import response_cache
+    response_cache.clear()
@@ -0,0 +1,20 @@
+"""
+Gunicorn settings, loaded from the working directory. Flags on the command
+line (see the Dockerfile) take precedence over values set here.
+"""
+import os
+import shutil
+
+
+def on_starting(server):
+    # prometheus_client multi-process files from a previous run would be summed in
+    path = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
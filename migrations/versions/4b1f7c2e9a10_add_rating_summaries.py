@@ -0,0 +1,48 @@
+"""add rating_summaries table
+
+Revision ID: 4b1f7c2e9a10
+Revises: da08cbaacee3
+Create Date: 2026-10-18 09:12:04.318220
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b1f7c2e9a10'
+down_revision = 'da08cbaacee3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('rating_summaries',
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('rating_count', sa.Integer(), nullable=False),
+    sa.Column('rating_sum', sa.Integer(), nullable=False),
+    sa.Column('stars_1', sa.Integer(), nullable=False),
+    sa.Column('stars_2', sa.Integer(), nullable=False),
+    sa.Column('stars_3', sa.Integer(), nullable=False),
+    sa.Column('stars_4', sa.Integer(), nullable=False),
+    sa.Column('stars_5', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['book_id'], ['books.id'], ),
+    sa.PrimaryKeyConstraint('book_id')
+    )
+    # Populate from existing ratings; `flask rebuild-rating-summaries` does the same later on
+    op.execute(
+        "INSERT INTO rating_summaries "
+        "(book_id, rating_count, rating_sum, stars_1, stars_2, stars_3, stars_4, stars_5) "
+        "SELECT book_id, COUNT(id), COALESCE(SUM(rating), 0), "
+        "SUM(CASE WHEN rating = 1 THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN rating = 2 THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN rating = 3 THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN rating = 4 THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN rating = 5 THEN 1 ELSE 0 END) "
+        "FROM ratings GROUP BY book_id"
+    )
+
+
+def downgrade():
+    op.drop_table('rating_summaries')
@@ -0,0 +1,40 @@
+"""merge duplicate authors and make authors.name unique
+
+Revision ID: 7c3d9e5f2b81
+Revises: 4b1f7c2e9a10
+Create Date: 2026-10-18 11:40:27.905112
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3d9e5f2b81'
+down_revision = '4b1f7c2e9a10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Point book links at the lowest id per author name, then drop the duplicates
+    op.execute(
+        "INSERT INTO book_authors (book_id, author_id) "
+        "SELECT DISTINCT ba.book_id, keep.id FROM book_authors ba "
+        "JOIN authors a ON a.id = ba.author_id "
+        "JOIN (SELECT name, MIN(id) AS id FROM authors GROUP BY name) keep ON keep.name = a.name "
+        "WHERE keep.id <> a.id AND NOT EXISTS ("
+        "SELECT 1 FROM book_authors x WHERE x.book_id = ba.book_id AND x.author_id = keep.id)"
+    )
+    op.execute(
+        "DELETE FROM book_authors WHERE author_id IN ("
+        "SELECT a.id FROM authors a WHERE a.id > (SELECT MIN(b.id) FROM authors b WHERE b.name = a.name))"
+    )
+    op.execute(
+        "DELETE FROM authors WHERE id > (SELECT MIN(b.id) FROM authors b WHERE b.name = authors.name)"
+    )
+    op.create_index('uq_authors_name', 'authors', ['name'], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_authors_name', table_name='authors')
@@ -0,0 +1,40 @@
+"""add foreign-key and lookup indexes
+
+Revision ID: 9e2a6b4d1c37
+Revises: 7c3d9e5f2b81
+Create Date: 2026-10-18 13:05:51.447092
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e2a6b4d1c37'
+down_revision = '7c3d9e5f2b81'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ratings.book_id is already the leading column of unique_book_user_rating,
+    # and reviews.book_id of ix_reviews_book_id_user_id, so neither gets its own index
+    op.create_index('ix_comments_book_id', 'comments', ['book_id'])
+    op.create_index('ix_reviews_book_id_user_id', 'reviews', ['book_id', 'user_id'])
+    op.create_index('ix_reviews_user_id', 'reviews', ['user_id'])
+    op.create_index('ix_books_title', 'books', ['title'])
+    op.create_index('ix_books_title_lower', 'books', [sa.text('lower(title)')])
+    op.create_index('ix_authors_name_lower', 'authors', [sa.text('lower(name)')])
+    op.create_index('ix_book_authors_author_id', 'book_authors', ['author_id'])
+    op.create_index('ix_book_tags_tag_id', 'book_tags', ['tag_id'])
+
+
+def downgrade():
+    op.drop_index('ix_book_tags_tag_id', table_name='book_tags')
+    op.drop_index('ix_book_authors_author_id', table_name='book_authors')
+    op.drop_index('ix_authors_name_lower', table_name='authors')
+    op.drop_index('ix_books_title_lower', table_name='books')
+    op.drop_index('ix_books_title', table_name='books')
+    op.drop_index('ix_reviews_user_id', table_name='reviews')
+    op.drop_index('ix_reviews_book_id_user_id', table_name='reviews')
+    op.drop_index('ix_comments_book_id', table_name='comments')
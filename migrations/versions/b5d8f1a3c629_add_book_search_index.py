@@ -0,0 +1,33 @@
+"""add full-text book search index
+
+Revision ID: b5d8f1a3c629
+Revises: 9e2a6b4d1c37
+Create Date: 2026-10-18 14:22:10.583316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.search import POSTGRES_DDL, SQLITE_DDL, reindex_books
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5d8f1a3c629'
+down_revision = '9e2a6b4d1c37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        op.execute(SQLITE_DDL)
+    elif bind.dialect.name == 'postgresql':
+        op.execute(POSTGRES_DDL)
+    else:
+        return
+    reindex_books(bind)
+
+
+def downgrade():
+    op.execute('DROP TABLE IF EXISTS book_search')
@@ -0,0 +1,27 @@
+"""add indexes for /books filters
+
+Revision ID: c4e7a2f9d815
+Revises: b5d8f1a3c629
+Create Date: 2026-10-18 15:12:04.318276
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e7a2f9d815'
+down_revision = 'b5d8f1a3c629'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_books_publish_year', 'books', ['publish_year'])
+    op.create_index('ix_books_language', 'books', ['language'])
+    op.create_index('ix_books_series', 'books', ['series'])
+
+
+def downgrade():
+    op.drop_index('ix_books_series', table_name='books')
+    op.drop_index('ix_books_language', table_name='books')
+    op.drop_index('ix_books_publish_year', table_name='books')
@@ -0,0 +1,30 @@
+"""add resource_versions for HTTP validators
+
+Revision ID: d2f6b8e1a473
+Revises: c4e7a2f9d815
+Create Date: 2026-10-18 16:02:37.905114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f6b8e1a473'
+down_revision = 'c4e7a2f9d815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    versions = op.create_table('resource_versions',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(versions, [{'name': 'books', 'version': 1}, {'name': 'tags', 'version': 1}])
+
+
+def downgrade():
+    op.drop_table('resource_versions')
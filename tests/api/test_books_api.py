@@ -47,3 +47,287 @@ def test_get_book_by_id(client):
 def test_post_book(client):
     """Test that POST /books returns 201 status code for a new book"""
 
+
+def test_get_books_keyset_pagination(client, app):
+    """Test that GET /books pages by cursor with a constant query count."""
+    from sqlalchemy import event
+    from app.models import Book, Author
+    with app.app_context():
+        for i in range(5):
+            book = Book(title=f'Paged Book {i}')
+            book.authors.append(Author(name=f'Paged Author {i}'))
+            db.session.add(book)
+        db.session.commit()
+
+    statements = []
+    def count(*args):
+        statements.append(args)
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        response = client.get('/books?limit=2')
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    assert response.status_code == 200
+    first_page = response.get_json()
+    assert [b['title'] for b in first_page] == ['Paged Book 0', 'Paged Book 1']
+    assert first_page[0]['authors'] == ['Paged Author 0']
+    assert len(statements) == 3  # version lookup, one page query, one batched author load
+
+    seen = [b['id'] for b in first_page]
+    cursor = response.headers['X-Next-Cursor']
+    while cursor:
+        response = client.get(f'/books?limit=2&cursor={cursor}')
+        seen += [b['id'] for b in response.get_json()]
+        cursor = response.headers.get('X-Next-Cursor')
+    assert len(seen) == 5
+    assert seen == sorted(seen)
+
+def test_get_books_rejects_bad_cursor(client):
+    """Test that GET /books returns 400 for a cursor it did not issue."""
+    response = client.get('/books?cursor=not-a-cursor')
+    assert response.status_code == 400
+
+def _auth_headers(client):
+    client.post('/users/register', json={'username': 'bulkuser', 'email': 'bulk@example.com', 'password': 'bulkpass'})
+    token = client.post('/users/login', json={'username': 'bulkuser', 'password': 'bulkpass'}).get_json()['access_token']
+    return {'Authorization': f'Bearer {token}'}
+
+def test_bulk_import_csv(client):
+    """Test that POST /books/bulk imports CSV rows and reports per item."""
+    payload = (
+        'isbn,title,authors,tags\n'
+        '111,Bulk One,Ann;Bob,Fiction\n'
+        '222,Bulk Two,Ann,\n'
+        '111,Bulk One Again,Ann,\n'
+        ',,,\n'
+    )
+    response = client.post('/books/bulk?plugin=none', data=payload,
+                           headers=dict(_auth_headers(client), **{'Content-Type': 'text/csv'}))
+    assert response.status_code == 200
+    data = response.get_json()
+    assert (data['created'], data['skipped'], data['failed']) == (2, 1, 1)
+    assert [r['status'] for r in data['results']] == ['created', 'created', 'skipped', 'failed']
+
+    book = client.get(f"/books/{data['results'][0]['id']}").get_json()
+    assert book['author'] == 'Ann, Bob'
+
+def test_add_book_commits_once(client):
+    """Test that POST /books writes authors, tags and the book in one transaction."""
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+    headers = _auth_headers(client)
+    client.post('/books', json={'title': 'Seed', 'authors': ['Known Author'], 'plugin': 'none'}, headers=headers)
+
+    commits = []
+    def count(session):
+        commits.append(session)
+    event.listen(Session, 'after_commit', count)
+    try:
+        response = client.post('/books', json={
+            'title': 'One Transaction',
+            'authors': ['Known Author', 'New Author', 'New Author '],
+            'tags': ['Fresh Tag', 'Other Tag'],
+            'plugin': 'none'
+        }, headers=headers)
+    finally:
+        event.remove(Session, 'after_commit', count)
+    assert response.status_code == 201
+    assert len(commits) == 1
+    book = client.get(f"/books/{response.get_json()['id']}").get_json()
+    assert book['author'] == 'Known Author, New Author'
+
+    response = client.post('/books', json={'title': 'One Transaction', 'authors': ['New Author', 'Known Author'], 'plugin': 'none'}, headers=headers)
+    assert response.status_code == 400
+
+def test_search_books_ranked_prefix_and_synced(client, app):
+    """Test that GET /books/search ranks matches and follows author/tag/book writes."""
+    from app.models import Book, Author, Tag
+    with app.app_context():
+        herbert = Author(name='Frank Herbert')
+        dune = Book(title='Dune', description='Desert planet politics')
+        dune.authors.append(herbert)
+        dune.tags.append(Tag(name='Science Fiction'))
+        messiah = Book(title='Dune Messiah', description='Sequel')
+        messiah.authors.append(herbert)
+        other = Book(title='Cookbook', description='Recipes inspired by dune landscapes')
+        db.session.add_all([dune, messiah, other])
+        db.session.commit()
+        herbert_id, other_id = herbert.id, other.id
+
+    titles = lambda response: [b['title'] for b in response.get_json()]
+    assert titles(client.get('/books/search?q=dune'))[-1] == 'Cookbook'
+    assert sorted(titles(client.get('/books/search?q=herb'))) == ['Dune', 'Dune Messiah']
+    assert titles(client.get('/books/search?q=scien fict')) == ['Dune']
+    assert client.get('/books/search').status_code == 400
+
+    page = client.get('/books/search?q=dune&limit=2')
+    assert len(page.get_json()) == 2
+    rest = client.get(f"/books/search?q=dune&limit=2&cursor={page.headers['X-Next-Cursor']}")
+    assert len(rest.get_json()) == 1
+    # Keyset cursors from /books and hand-made negative offsets are not search offsets
+    import base64
+    from app.pagination import encode_cursor
+    negative = base64.urlsafe_b64encode(b'{"offset":-5}').decode().rstrip('=')
+    for cursor in (encode_cursor(1), negative, 'garbage'):
+        invalid = client.get(f'/books/search?q=dune&cursor={cursor}')
+        assert invalid.status_code == 400 and invalid.get_json() == {'msg': 'Invalid cursor'}
+    assert client.get(f"/books?cursor={page.headers['X-Next-Cursor']}").status_code == 400
+
+    with app.app_context():
+        db.session.get(Author, herbert_id).name = 'Brian Herbert'
+        db.session.delete(db.session.get(Book, other_id))
+        db.session.commit()
+    assert sorted(titles(client.get('/books/search?q=brian'))) == ['Dune', 'Dune Messiah']
+    assert titles(client.get('/books/search?q=recipes')) == []
+
+def test_get_books_filters_and_facets(client, app):
+    """Test /books filters and the facet counts for the same filters."""
+    from app.models import Book, Author, Tag
+    with app.app_context():
+        tolkien, pratchett = Author(name='J.R.R. Tolkien'), Author(name='Terry Pratchett')
+        fantasy, classic, humor = Tag(name='Fantasy'), Tag(name='Classic'), Tag(name='Humor')
+        books = [
+            Book(title='The Hobbit', publish_year=1937, language='en', series='Middle-earth',
+                 authors=[tolkien], tags=[fantasy, classic]),
+            Book(title='The Silmarillion', publish_year=1977, language='en', series='Middle-earth',
+                 authors=[tolkien], tags=[fantasy]),
+            Book(title='Mort', publish_year=1987, language='sv', series='Discworld',
+                 authors=[pratchett], tags=[fantasy, humor]),
+        ]
+        db.session.add_all(books)
+        db.session.commit()
+        tolkien_id = tolkien.id
+
+    titles = lambda response: [b['title'] for b in response.get_json()]
+    assert titles(client.get('/books?tag=Fantasy&tag=Classic')) == ['The Hobbit']
+    assert titles(client.get('/books?tag=Classic&tag=Humor&tag_mode=or')) == ['The Hobbit', 'Mort']
+    assert titles(client.get(f'/books?author_id={tolkien_id}&year_from=1950')) == ['The Silmarillion']
+    assert titles(client.get('/books?language=sv')) == ['Mort']
+    assert titles(client.get('/books?series=Middle-earth&year_to=1950')) == ['The Hobbit']
+    assert client.get('/books?year_from=soon').status_code == 400
+    assert client.get('/books?tag=Fantasy&tag_mode=xor').status_code == 400
+
+    page = client.get('/books?tag=Fantasy&limit=2')
+    assert titles(page) == ['The Hobbit', 'The Silmarillion']
+    assert 'tag=Fantasy' in page.headers['Link']
+
+    facets = client.get('/books/facets?tag=Fantasy').get_json()
+    assert facets['tags'][0] == {'value': 'Fantasy', 'label': 'Fantasy', 'count': 3}
+    assert {f['label']: f['count'] for f in facets['authors']} == {'J.R.R. Tolkien': 2, 'Terry Pratchett': 1}
+    assert facets['languages'] == [{'value': 'en', 'label': 'en', 'count': 2},
+                                   {'value': 'sv', 'label': 'sv', 'count': 1}]
+    assert [f['value'] for f in facets['years']] == ['1937', '1977', '1987']
+    narrowed = client.get('/books/facets?language=sv').get_json()
+    assert narrowed['series'] == [{'value': 'Discworld', 'label': 'Discworld', 'count': 1}]
+
+def test_conditional_get_returns_304_until_data_changes(client, app):
+    """Test ETag/Last-Modified revalidation on book and tag reads."""
+    from sqlalchemy import event
+    from app.models import Book, Author, Comment, Tag, User
+    with app.app_context():
+        book = Book(title='Cached Book', authors=[Author(name='Cached Author')])
+        user = User(username='commenter', email='commenter@example.com', password_hash='x')
+        db.session.add_all([book, user])
+        db.session.commit()
+        book_id, author_id, user_id = book.id, book.authors[0].id, user.id
+
+    # Response-cached routes answer from the cache; the others read one version row
+    expected_statements = {'/books': 1, f'/books/{book_id}': 0, f'/books/{book_id}/full': 0, '/tags': 0,
+                           '/books/facets': 1}
+    for url, expected in expected_statements.items():
+        first = client.get(url)
+        assert first.status_code == 200 and first.headers['ETag']
+        statements = []
+        count = lambda *args: statements.append(args)
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            again = client.get(url, headers={'If-None-Match': first.headers['ETag']})
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+        assert again.status_code == 304 and again.data == b''
+        assert len(statements) == expected, url
+
+    full = client.get(f'/books/{book_id}/full')
+    books = client.get('/books')
+    tags = client.get('/tags')
+    since = client.get(f'/books/{book_id}', headers={'If-Modified-Since': full.headers['Last-Modified']})
+    assert since.status_code == 304
+    assert client.get(f'/books/{book_id}?x=1', headers={'If-None-Match': full.headers['ETag']}).status_code == 200
+
+    with app.app_context():
+        db.session.add(Comment(content='Nice', user_id=user_id, book_id=book_id))
+        db.session.commit()
+    assert client.get(f'/books/{book_id}/full', headers={'If-None-Match': full.headers['ETag']}).status_code == 200
+    assert client.get('/books', headers={'If-None-Match': books.headers['ETag']}).status_code == 304
+
+    with app.app_context():
+        db.session.get(Author, author_id).name = 'Renamed Author'
+        db.session.add(Tag(name='Fresh Tag'))
+        db.session.commit()
+    renamed = client.get('/books', headers={'If-None-Match': books.headers['ETag']})
+    assert renamed.status_code == 200 and renamed.get_json()[0]['authors'] == ['Renamed Author']
+    assert client.get('/tags', headers={'If-None-Match': tags.headers['ETag']}).status_code == 200
+    assert client.get('/books/999').status_code == 404
+
+def test_version_rows_are_not_locked_by_write_transactions(app):
+    """Test that child writes leave the version row and parent book to a separate post-commit transaction."""
+    from sqlalchemy import event
+    from app.models import Book, Rating, User
+    from app.versions import book_last_modified, collection_version
+    with app.app_context():
+        book = Book(title='Hot Book')
+        user = User(username='rater', email='rater@example.com', password_hash='x')
+        db.session.add_all([book, user])
+        db.session.commit()
+        book_id, user_id = book.id, user.id
+        before_version = collection_version('books')[0]
+        before_modified = book_last_modified(book_id)
+
+        writer = db.session.connection()
+        statements = []
+        record = lambda conn, cursor, statement, *args: statements.append((conn is writer, statement))
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            db.session.add(Rating(rating=5, user_id=user_id, book_id=book_id))
+            db.session.add(Book(title='Second Book'))
+            db.session.commit()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+        hot = lambda sql: 'resource_versions' in sql or sql.startswith('UPDATE books')
+        assert any(own and 'INSERT INTO ratings' in sql for own, sql in statements)
+        assert not any(own and hot(sql) for own, sql in statements)
+        assert any(not own and hot(sql) for own, sql in statements)
+        assert collection_version('books')[0] == before_version + 1
+        assert book_last_modified(book_id) > before_modified
+
+def test_fields_param_projects_columns(client, app):
+    """Test that ?fields= limits both the payload and the columns read."""
+    from sqlalchemy import event
+    from app.models import Book, Author, Review, Tag, User
+    with app.app_context():
+        book = Book(title='Sparse', description='A very long description', authors=[Author(name='Sparse Author')])
+        user = User(username='sparse', email='sparse@example.com', password_hash='x')
+        db.session.add_all([book, user, Tag(name='Sparse Tag')])
+        db.session.flush()
+        db.session.add(Review(book_id=book.id, user_id=user.id, review_text='Long text', reading_format='ebook'))
+        db.session.commit()
+
+    statements = []
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        books = client.get('/books?fields=title').get_json()
+        reviews = client.get('/reviews?fields=book_id,reading_format').get_json()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    assert books == [{'id': books[0]['id'], 'title': 'Sparse'}]
+    assert set(reviews[0]) == {'id', 'book_id', 'reading_format'}
+    assert not any('description' in s or 'review_text' in s or 'authors' in s or 'users' in s for s in statements)
+
+    assert client.get('/books?fields=title,authors').get_json()[0]['authors'] == ['Sparse Author']
+    assert set(client.get('/tags?fields=name').get_json()[0]) == {'id', 'name'}
+    assert client.get('/books?fields=title,secret').status_code == 400
+    assert client.get('/reviews?fields=password_hash').status_code == 400
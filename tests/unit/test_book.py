@@ -137,3 +137,31 @@ def test_books_full_endpoint(client, app):
     assert data["ratings"][0]["rating"] == 4
     assert len(data["comments"]) == 1
     assert data["comments"][0]["content"] == "Great book!"
+
+def test_books_full_endpoint_caps_sections(client, app):
+    from app import db
+    from app.models import Book, User, Comment, Review
+    app.config['FULL_SECTION_LIMIT'] = 2
+    user = User(username="capuser", email="capuser@example.com", password_hash="pw")
+    book = Book(title="Capped Book")
+    db.session.add_all([user, book])
+    db.session.commit()
+    for i in range(3):
+        db.session.add(Comment(content=f"Comment {i}", book_id=book.id, user_id=user.id))
+    db.session.add(Review(book_id=book.id, user_id=user.id, review_text="Good", reading_format="ebook"))
+    db.session.commit()
+
+    response = client.get(f"/books/{book.id}/full")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["average_rating"] is None
+    assert data["rating_count"] == 0
+    assert data["comment_count"] == 3
+    assert [c["content"] for c in data["comments"]] == ["Comment 0", "Comment 1"]
+    assert data["next"]["comments"] is not None
+    assert data["reviews"][0]["username"] == "capuser"
+
+    response = client.get(f"/books/{book.id}/full?comments_cursor={data['next']['comments']}")
+    data = response.get_json()
+    assert [c["content"] for c in data["comments"]] == ["Comment 2"]
+    assert data["next"]["comments"] is None
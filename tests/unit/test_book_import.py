@@ -0,0 +1,46 @@
+import pytest
+from app import create_app, db
+from app.models import Author, Book, Tag
+from app.book_import import BookImporter, parse_records
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+class FakePlugin:
+    def run(self, data):
+        if data['isbn'] == '404':
+            return {'error': 'No book found', 'not_found': True}
+        return {'title': f"Title {data['isbn']}", 'authors': ['Shared Author'], 'genres': ['Imported']}
+
+def test_importer_enriches_and_resolves_authors_once(app):
+    records = parse_records('["1", "2", "3", "404"]', 'json')
+    report = BookImporter(plugin=FakePlugin(), workers=4, chunk_size=2).run(records)
+    assert [r['status'] for r in report] == ['created', 'created', 'created', 'failed']
+    assert Author.query.filter_by(name='Shared Author').count() == 1
+    assert Tag.query.filter_by(name='Imported').count() == 1
+    assert Book.query.filter_by(isbn='3').one().authors[0].name == 'Shared Author'
+
+def test_parse_records_ndjson():
+    records = parse_records('{"isbn": "9"}\n\n"10"\n', 'ndjson')
+    assert records == [{'isbn': '9'}, {'isbn': '10'}]
+
+def test_bulk_endpoint_caps_items_per_request(app):
+    import json
+    from flask_jwt_extended import create_access_token
+    from app.models import User
+    assert app.config['BULK_IMPORT_MAX_ITEMS'] <= 1000
+    db.session.add(User(id=1, username='importer', email='importer@example.com', password_hash='x'))
+    db.session.commit()
+    app.config['BULK_IMPORT_MAX_ITEMS'] = 2
+    response = app.test_client().post('/books/bulk', data=json.dumps(['1', '2', '3']), content_type='application/json',
+                                      headers={'Authorization': f"Bearer {create_access_token(identity='1')}"})
+    assert response.status_code == 413 and 'import-books' in response.get_json()['msg']
+    assert Book.query.count() == 0
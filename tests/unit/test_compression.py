@@ -0,0 +1,59 @@
+import gzip
+import zlib
+import pytest
+from app import create_app, db
+from app.compression import compress_stream
+from app.models import Book
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([Book(title=f'Compressed {i}', description='Lorem ipsum ' * 20) for i in range(20)])
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+GZIP = {'Accept-Encoding': 'gzip'}
+
+def test_large_json_is_gzipped_with_its_own_etag(client):
+    plain = client.get('/books')
+    packed = client.get('/books', headers=GZIP)
+    assert 'Content-Encoding' not in plain.headers
+    assert packed.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in packed.headers['Vary']
+    assert gzip.decompress(packed.data) == plain.data
+    assert len(packed.data) < len(plain.data) / 4
+    assert packed.headers['ETag'] == plain.headers['ETag'][:-1] + '-gzip"'
+    assert client.get('/books', headers=dict(GZIP, **{'If-None-Match': packed.headers['ETag']})).status_code == 304
+
+def test_small_responses_and_refusals_stay_identity(client):
+    assert 'Content-Encoding' not in client.get('/books?limit=1&fields=title', headers=GZIP).headers
+    assert 'Content-Encoding' not in client.get('/books', headers={'Accept-Encoding': 'gzip;q=0'}).headers
+
+def test_streamed_export_is_compressed_incrementally(client):
+    plain = client.get('/export/books?format=csv')
+    packed = client.get('/export/books?format=csv', headers=GZIP)
+    assert packed.is_streamed and packed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(packed.data) == plain.data
+
+    chunks = list(compress_stream(['header\n', 'row 1\n', 'row 2\n'], 'gzip'))
+    decoder = zlib.decompressobj(31)
+    assert decoder.decompress(chunks[0]) == b'header\n'  # each chunk is decodable on arrival
+    assert b''.join([b'header\n'] + [decoder.decompress(c) for c in chunks[1:]]) == b'header\nrow 1\nrow 2\n'
+
+def test_swagger_spec_served_precompressed_from_memory(client):
+    plain = client.get('/static/swagger.json')
+    packed = client.get('/static/swagger.json', headers=GZIP)
+    assert plain.get_json()['paths']
+    assert packed.headers['Content-Encoding'] == 'gzip' and gzip.decompress(packed.data) == plain.data
+    again = client.get('/static/swagger.json', headers=dict(GZIP, **{'If-None-Match': packed.headers['ETag']}))
+    assert again.status_code == 304 and again.data == b''
@@ -0,0 +1,62 @@
+import sqlite3
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from app import create_app, db
+from app.config import Config
+from app.db_pool import TimedNullPool, TimedQueuePool, engine_options, pool_metrics
+from app.models import User
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def _config(uri, **overrides):
+    config = {key: getattr(Config, key) for key in dir(Config) if key.isupper()}
+    config.update(SQLALCHEMY_DATABASE_URI=uri, **overrides)
+    return config
+
+def test_engine_options_follow_pool_mode():
+    assert engine_options(_config('sqlite:///:memory:')) == {}
+
+    options = engine_options(_config('postgresql://u:p@db/booklib', DB_POOL_SIZE=3, DB_MAX_OVERFLOW=2,
+                                     DB_STATEMENT_TIMEOUT=5000))
+    assert options['poolclass'] is TimedQueuePool
+    assert (options['pool_size'], options['max_overflow'], options['pool_pre_ping']) == (3, 2, True)
+    assert options['connect_args'] == {'options': '-c statement_timeout=5000'}
+
+    assert engine_options(_config('postgresql://u:p@pgbouncer/booklib', DB_POOL_MODE='pgbouncer')) == {
+        'poolclass': TimedNullPool}
+    with pytest.raises(ValueError):
+        engine_options(_config('postgresql://u:p@db/booklib', DB_POOL_MODE='static'))
+
+def test_checkout_waits_and_timeouts_are_recorded():
+    pool_metrics.reset()
+    pool = TimedQueuePool(lambda: sqlite3.connect(':memory:'), pool_size=1, max_overflow=0, timeout=0.05)
+    held = pool.connect()
+    with pytest.raises(PoolTimeout):
+        pool.connect()
+    held.close()
+    pool.connect().close()
+    assert pool_metrics.waits == 3 and pool_metrics.timeouts == 1
+    assert pool_metrics.wait_max >= 0.05
+
+def test_pool_endpoint_requires_token_and_reports_checkouts(app):
+    client = app.test_client()
+    assert client.get('/admin/db/pool').status_code == 401
+
+    user = User(username='admin', email='admin@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    token = create_access_token(identity=str(user.id))
+    db.session.execute(db.text('SELECT 1'))
+    stats = client.get('/admin/db/pool', headers={'Authorization': f'Bearer {token}'}).get_json()
+    assert stats['mode'] == 'queue'
+    assert stats['checked_out'] >= 1 and stats['checkouts'] >= 1
+    assert set(stats['wait_ms']) == {'count', 'avg', 'max', 'total'}
@@ -0,0 +1,104 @@
+import math
+import time
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.config import Config
+from app.db_routing import replica_router, use_primary
+from app.models import Book, User
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # Two SQLite files stand in for the primary and its replica
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'primary.db'}")
+    monkeypatch.setattr(Config, 'SQLALCHEMY_REPLICA_URIS', [f"sqlite:///{tmp_path / 'replica.db'}"])
+    monkeypatch.setattr(Config, 'RESPONSE_CACHE_TYPE', 'none')
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        replica = replica_router.replicas[0].engine
+        db.create_all()
+        db.metadata.create_all(replica)
+        db.session.add_all([Book(title='On the primary'),
+                            User(id=1, username='writer', email='writer@example.com', password_hash='x')])
+        db.session.commit()
+        with replica.begin() as connection:
+            connection.execute(Book.__table__.insert(), {'title': 'On the replica'})
+        yield app
+        db.session.remove()
+        replica_router.replicas = []
+
+def _titles(client):
+    return [book['title'] for book in client.get('/books').get_json()]
+
+def test_get_reads_from_replica_until_client_writes(app):
+    client = app.test_client()
+    assert _titles(client) == ['On the replica']
+    assert replica_router.replicas[0].reads == 1
+
+    token = create_access_token(identity='1')
+    response = client.post('/tags', json={'name': 'fresh'}, headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 201
+    # Read-your-writes: the sticky cookie keeps this client on the primary
+    assert _titles(client) == ['On the primary']
+    assert _titles(app.test_client()) == ['On the replica']
+
+def test_authenticated_writer_reads_primary_without_cookie(app):
+    token = create_access_token(identity='1')
+    auth = {'Authorization': f'Bearer {token}'}
+    response = app.test_client(use_cookies=False).post('/tags', json={'name': 'fresh'}, headers=auth)
+    assert response.status_code == 201
+
+    # A new connection with no cookie jar, as a mobile or server-side API client would make
+    reader = app.test_client(use_cookies=False)
+    assert [book['title'] for book in reader.get('/books', headers=auth).get_json()] == ['On the primary']
+    other = {'Authorization': f"Bearer {create_access_token(identity='2')}"}
+    assert [book['title'] for book in reader.get('/books', headers=other).get_json()] == ['On the replica']
+    assert _titles(reader) == ['On the replica']
+
+    replica_router._pins['1'] = time.time() - 1
+    assert [book['title'] for book in reader.get('/books', headers=auth).get_json()] == ['On the replica']
+
+    # Another worker only sees the pin through the shared cache backend
+    from app.response_cache import response_cache
+    response_cache.configure('memory')
+    try:
+        app.test_client(use_cookies=False).post('/tags', json={'name': 'shared'}, headers=auth)
+        replica_router._pins.clear()
+        assert [book['title'] for book in reader.get('/books', headers=auth).get_json()] == ['On the primary']
+    finally:
+        response_cache.configure('none')
+
+def test_lagging_replica_falls_back_to_primary(app):
+    replica = replica_router.replicas[0]
+    replica.lag, replica.checked_at = math.inf, time.monotonic()
+    assert _titles(app.test_client()) == ['On the primary']
+    assert replica_router.stats()['fallbacks'] == 1
+
+def test_non_request_and_explicit_primary_reads_use_primary(app):
+    assert [b.title for b in Book.query.all()] == ['On the primary']
+    with app.test_request_context('/books'):
+        assert db.session.query(Book.title).scalar() == 'On the replica'
+        db.session.remove()
+        with use_primary():
+            assert db.session.query(Book.title).scalar() == 'On the primary'
+
+def test_response_cache_is_filled_from_primary(app):
+    from app.response_cache import response_cache
+    response_cache.configure('memory', ttl=60)
+    try:
+        token = create_access_token(identity='1')
+        writer = app.test_client()
+        response = writer.post('/tags', json={'name': 'fresh'}, headers={'Authorization': f'Bearer {token}'})
+        assert response.status_code == 201
+        # The replica has not replayed the write yet
+        assert _titles(app.test_client()) == ['On the replica']
+
+        second = app.test_client().get('/tags')
+        assert second.headers['X-Cache'] == 'MISS'
+        assert [tag['name'] for tag in second.get_json()] == ['fresh']
+        third = app.test_client().get('/tags')
+        assert third.headers['X-Cache'] == 'HIT'
+        assert [tag['name'] for tag in third.get_json()] == ['fresh']
+    finally:
+        response_cache.configure('none')
@@ -0,0 +1,52 @@
+from app.enrichment_cache import EnrichmentCache, CachedPlugin
+
+class CountingPlugin:
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def run(self, data):
+        self.calls += 1
+        return dict(self.result)
+
+def test_cached_plugin_hits_cache_for_repeat_isbn():
+    cache = EnrichmentCache(max_size=10)
+    plugin = CountingPlugin({'title': 'Cached'})
+    cached = CachedPlugin('CountingPlugin', plugin, cache)
+    assert cached.run({'isbn': '978-0-00-000000-2'})['title'] == 'Cached'
+    assert cached.run({'isbn': '9780000000002'})['title'] == 'Cached'
+    assert plugin.calls == 1
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+def test_negative_results_cached_but_transient_errors_are_not():
+    cache = EnrichmentCache(max_size=10)
+    missing = CachedPlugin('Missing', CountingPlugin({'error': 'No book', 'not_found': True}), cache)
+    failing = CachedPlugin('Failing', CountingPlugin({'error': 'Timeout'}), cache)
+    for _ in range(2):
+        missing.run({'isbn': '1'})
+        failing.run({'isbn': '1'})
+    assert missing.plugin.calls == 1
+    assert failing.plugin.calls == 2
+    assert cache.stats()['negative_hits'] == 1
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    import app.enrichment_cache as module
+    now = [1000.0]
+    monkeypatch.setattr(module.time, 'time', lambda: now[0])
+    cache = EnrichmentCache(max_size=2, ttl=60)
+    cache.set('P', 'a', {'title': 'a'})
+    cache.set('P', 'b', {'title': 'b'})
+    assert cache.get('P', 'a')[0]
+    cache.set('P', 'c', {'title': 'c'})
+    assert not cache.get('P', 'b')[0]
+    assert cache.stats()['evictions'] == 1
+    now[0] += 61
+    assert not cache.get('P', 'a')[0]
+
+def test_sqlite_tier_survives_new_cache(tmp_path):
+    path = str(tmp_path / 'enrichment.db')
+    EnrichmentCache(path=path).set('P', 'isbn', {'title': 'Persisted'})
+    hit, value = EnrichmentCache(path=path).get('P', 'isbn')
+    assert hit
+    assert value == {'title': 'Persisted'}
@@ -0,0 +1,62 @@
+import time
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import event
+from app import create_app, db
+from app.health import health_prober
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        yield app
+        health_prober.stop()
+
+def _statements(call):
+    statements = []
+    count = lambda *args: statements.append(args)
+    event.listen(db.engine, 'before_cursor_execute', count)
+    try:
+        response = call()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count)
+    return response, len(statements)
+
+def test_probes_do_not_query_the_database(app):
+    client = app.test_client()
+    response, queries = _statements(lambda: client.get('/health/live'))
+    assert response.status_code == 200 and queries == 0
+
+    client.get('/health/ready')  # first probe in the process checks synchronously
+    for url in ('/health/ready', '/health'):
+        response, queries = _statements(lambda: client.get(url))
+        assert response.status_code == 200 and queries == 0, url
+    body = client.get('/health/ready').get_json()
+    assert body['status'] == 'ready' and body['database']['connected']
+    assert 'checked_out' in body['pool']
+    assert client.get('/health').get_json()['status'] == 'healthy'
+
+def test_failed_or_stale_checks_are_not_ready(app, monkeypatch):
+    client = app.test_client()
+    monkeypatch.setattr(health_prober, '_check_database',
+                        lambda: {'connected': False, 'error': 'down', 'latency_ms': None})
+    health_prober.check()
+    assert client.get('/health/ready').status_code == 503
+    assert client.get('/health').get_json()['status'] == 'degraded'
+
+    monkeypatch.undo()
+    health_prober.check()
+    assert client.get('/health/ready').status_code == 200
+    health_prober._snapshot['checked_monotonic'] = time.monotonic() - 4 * health_prober.interval
+    body = client.get('/health/ready').get_json()
+    assert body['stale'] and body['status'] == 'not_ready'
+
+def test_plugin_reachability_is_reported(app, monkeypatch):
+    from app import health
+    plugins = {'Up': SimpleNamespace(health_url='https://up.example'), 'NoUrl': object()}
+    monkeypatch.setattr(health.registry, 'all', lambda: plugins)
+    monkeypatch.setattr(health.http_client.session, 'head', lambda url, **kw: SimpleNamespace(status_code=200))
+    health_prober.check_plugins = True
+    health_prober.check()
+    assert app.test_client().get('/health/ready').get_json()['plugins'] == {'Up': {'reachable': True, 'status': 200}}
@@ -0,0 +1,47 @@
+from app.http_client import HttpClient
+
+def test_session_is_reused_and_pooled(app):
+    client = HttpClient()
+    app.config['HTTP_POOL_MAXSIZE'] = 4
+    app.config['HTTP_RETRIES'] = 3
+    client.init_app(app)
+    session = client.session
+    assert client.session is session
+    adapter = session.get_adapter('https://openlibrary.org')
+    assert adapter._pool_maxsize == 4
+    assert adapter.max_retries.total == 3
+    client.close()
+    assert client.session is not session
+
+def test_deadline_bounds_retries(app, monkeypatch):
+    from app import http_client as http_client_module
+    client = HttpClient()
+    app.config['HTTP_RETRIES'] = 5
+    app.config['HTTP_BACKOFF_FACTOR'] = 1
+    client.init_app(app)
+    assert client._session_for(False).get_adapter('https://openlibrary.org').max_retries.total == 0
+
+    class Clock:
+        now = 100.0
+        def monotonic(self):
+            return self.now
+        def sleep(self, seconds):
+            self.now += seconds
+    monkeypatch.setattr(http_client_module, 'time', Clock())
+
+    class Unavailable:
+        status_code = 503
+        def close(self):
+            pass
+
+    timeouts = []
+    def fake_get(url, timeout=None, **kwargs):
+        timeouts.append(timeout)
+        return Unavailable()
+    monkeypatch.setattr(client._session_for(False), 'get', fake_get)
+
+    # Room for the first backoff (1s) but not the second (2s)
+    resp = client.get('https://openlibrary.org/isbn/1.json', deadline=102.5)
+    assert resp.status_code == 503
+    assert timeouts == [(2.5, 2.5), (1.5, 1.5)]
+    client.close()
@@ -0,0 +1,50 @@
+import json
+import logging
+import queue
+from flask import Flask
+from app import logging_config
+from app.config import Config
+from app.logging_config import AsyncQueueHandler, DebugSampler, configure_logging
+
+def _app(**overrides):
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config.update(overrides)
+    return app
+
+def test_records_are_written_as_json_by_the_listener(tmp_path):
+    log_file = tmp_path / 'app.log'
+    app = _app(LOG_FILE=str(log_file), LOG_LEVEL='debug')
+    configure_logging(app)
+    payload = {'title': 'Mutable'}
+    with app.test_request_context('/books?limit=1', method='POST'):
+        logging.getLogger('booklib.test').debug('Enriched %s', payload, extra={'isbn': '123'})
+        payload['title'] = 'Changed after the call'
+    try:
+        raise ValueError('boom')
+    except ValueError:
+        logging.getLogger('booklib.test').exception('Failed')
+    logging_config._flush_on_exit()
+
+    first, second = [json.loads(line) for line in log_file.read_text().splitlines()]
+    assert first['level'] == 'DEBUG' and first['logger'] == 'booklib.test'
+    assert first['msg'] == "Enriched {'title': 'Mutable'}"
+    assert (first['isbn'], first['method'], first['path']) == ('123', 'POST', '/books')
+    assert 'ValueError: boom' in second['exc'] and 'path' not in second
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = AsyncQueueHandler(queue.Queue(maxsize=1))
+    record = lambda msg: logging.makeLogRecord({'msg': msg, 'levelno': logging.INFO})
+    for msg in ('kept', 'dropped', 'dropped too'):
+        handler.handle(record(msg))
+    assert handler.dropped == 2
+    handler.queue.get_nowait()
+    handler.handle(record('after'))
+    assert handler.queue.get_nowait().dropped == 2 and handler.dropped == 0
+
+def test_debug_records_are_sampled():
+    sampler = DebugSampler(0.0)
+    debug = logging.makeLogRecord({'levelno': logging.DEBUG})
+    warning = logging.makeLogRecord({'levelno': logging.WARNING})
+    assert not sampler.filter(debug) and sampler.filter(warning)
+    assert DebugSampler(1.0).filter(debug)
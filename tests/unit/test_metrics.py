@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+import pytest
+from prometheus_client import REGISTRY, CollectorRegistry, multiprocess
+from app import create_app, db
+from app.enrichment_cache import CachedPlugin, EnrichmentCache
+from app.models import Book
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+        db.session.add(Book(title='Measured'))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+def test_requests_are_measured_per_endpoint(app):
+    labels = {'endpoint': 'books.get_books'}
+    before = (_sample('booklib_http_request_duration_seconds_count', method='GET', **labels),
+              _sample('booklib_http_request_db_queries_sum', **labels))
+    client = app.test_client()
+    assert client.get('/books').status_code == 200
+
+    assert _sample('booklib_http_request_duration_seconds_count', method='GET', **labels) == before[0] + 1
+    assert _sample('booklib_http_request_db_queries_sum', **labels) >= before[1] + 2
+    assert _sample('booklib_http_requests_total', method='GET', status='200', **labels) >= 1
+    assert _sample('booklib_http_response_size_bytes_count', **labels) >= 1
+
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'booklib_http_request_db_seconds_bucket{endpoint="books.get_books"' in body
+
+def test_plugin_calls_and_cache_lookups_are_counted():
+    class Plugin:
+        def run(self, data):
+            return {'title': 'T'}
+
+    plugin = CachedPlugin('MetricsPlugin', Plugin(), EnrichmentCache())
+    misses = _sample('booklib_cache_lookups_total', cache='enrichment', result='miss')
+    hits = _sample('booklib_cache_lookups_total', cache='enrichment', result='hit')
+    plugin.run({'isbn': '123'})
+    plugin.run({'isbn': '123'})
+    assert _sample('booklib_plugin_call_duration_seconds_count', plugin='MetricsPlugin', outcome='ok') == 1
+    assert _sample('booklib_cache_lookups_total', cache='enrichment', result='miss') == misses + 1
+    assert _sample('booklib_cache_lookups_total', cache='enrichment', result='hit') == hits + 1
+
+def test_worker_processes_are_aggregated(tmp_path):
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+    script = "from app.metrics import record_cache_lookup; record_cache_lookup('response', 'hit')"
+    for _ in range(2):
+        subprocess.run([sys.executable, '-c', script], cwd=ROOT, env=env, check=True)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=str(tmp_path))
+    assert registry.get_sample_value('booklib_cache_lookups_total', {'cache': 'response', 'result': 'hit'}) == 2
@@ -0,0 +1,67 @@
+import pytest
+from werkzeug.security import generate_password_hash
+from app import create_app, db
+from app.models import User
+from app.passwords import (
+    Argon2Hasher, BcryptHasher, HashingBusy, Passwords, Pbkdf2Hasher, passwords,
+)
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.mark.parametrize('hasher, cheaper', [
+    (Argon2Hasher(time_cost=2), Argon2Hasher(time_cost=1)),
+    (BcryptHasher(rounds=5), BcryptHasher(rounds=4)),
+    (Pbkdf2Hasher(iterations=2000), Pbkdf2Hasher(iterations=1000)),
+])
+def test_hashers_verify_and_detect_cost_changes(hasher, cheaper):
+    stored = cheaper.hash('s3cret')
+    assert hasher.identify(stored) and cheaper.verify(stored, 's3cret')
+    assert not cheaper.verify(stored, 'wrong')
+    assert hasher.needs_rehash(stored) and not cheaper.needs_rehash(stored)
+
+def test_login_upgrades_legacy_hash(app):
+    user = User(username='legacy', email='legacy@example.com', password_hash=generate_password_hash('pw'))
+    db.session.add(user)
+    db.session.commit()
+    client = app.test_client()
+    assert client.post('/users/login', json={'username': 'legacy', 'password': 'nope'}).status_code == 401
+    assert user.password_hash.startswith('scrypt:')
+
+    assert client.post('/users/login', json={'username': 'legacy', 'password': 'pw'}).status_code == 200
+    db.session.refresh(user)
+    assert user.password_hash.startswith('$argon2id$')
+    assert passwords.verify(user.password_hash, 'pw') == (True, None)
+
+def test_saturated_hashing_is_rejected_with_503(app):
+    app.config.update(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_MAX_PENDING=1)
+    passwords.init_app(app)
+    assert passwords.workers + passwords.max_pending < 4  # Dockerfile: gunicorn --threads 4
+    _, slots = passwords._pool()
+    # Two requests already admitted: one hashing, one waiting
+    slots.acquire()
+    slots.acquire()
+    try:
+        with pytest.raises(HashingBusy):
+            passwords.hash('pw')
+        client = app.test_client()
+        response = client.post('/users/register', json={'username': 'u', 'email': 'u@example.com', 'password': 'pw'})
+        assert response.status_code == 503 and response.headers['Retry-After'] == '1'
+    finally:
+        slots.release()
+        slots.release()
+    assert passwords.verify(passwords.hash('pw'), 'pw')[0]
+
+def test_default_admission_cap_is_below_request_threads():
+    from app.config import Config
+    default = Passwords()
+    assert default.workers + default.max_pending < 4
+    assert Config.PASSWORD_HASH_WORKERS + Config.PASSWORD_HASH_MAX_PENDING < 4
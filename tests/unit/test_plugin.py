@@ -22,3 +22,84 @@ def test_plugin_model_creation(app):
         assert fetched is not None
         assert fetched.description == "Unit test plugin."
         assert fetched.is_enabled is True
+
+def test_plugin_registry_loads_once(app, monkeypatch):
+    from app import plugin_loader
+    calls = []
+    original = plugin_loader.load_plugins
+    def counting_load(*args, **kwargs):
+        calls.append(kwargs)
+        return original(*args, **kwargs)
+    monkeypatch.setattr(plugin_loader, 'load_plugins', counting_load)
+
+    registry = plugin_loader.PluginRegistry()
+    registry.init_app(app)
+    for _ in range(3):
+        assert registry.get('GoogleBooksPlugin') is not None
+    assert 'OpenLibraryPlugin' in registry.all()
+    assert len(calls) == 1
+
+    registry.reload()
+    assert len(calls) == 2
+
+def test_openlibrary_authors_resolved_concurrently_and_cached(monkeypatch):
+    import threading
+    import time
+    from app.plugins import goodreads_plugin
+
+    class FakeResponse:
+        status_code = 200
+        def __init__(self, payload):
+            self.payload = payload
+        def json(self):
+            return self.payload
+
+    # Every author fetch must be in flight at once for the barrier to open
+    barrier = threading.Barrier(4, timeout=5)
+    requested = []
+    def fake_get(url, deadline=None, **kwargs):
+        requested.append(url)
+        barrier.wait()
+        return FakeResponse({'name': url.rsplit('/', 1)[-1][:-5]})
+    monkeypatch.setattr(goodreads_plugin.http_client, 'get', fake_get)
+    goodreads_plugin.author_cache.clear()
+
+    record = {'title': 'Anthology', 'authors': [{'key': f'/authors/A{i}'} for i in range(4)] + [{'key': '/authors/A0'}]}
+    plugin = goodreads_plugin.OpenLibraryPlugin()
+    parsed = plugin._parse_record(record, deadline=time.monotonic() + 10)
+    assert parsed['authors'] == ['A0', 'A1', 'A2', 'A3']
+    assert len(requested) == 4
+
+    assert plugin._parse_record(record)['authors'] == ['A0', 'A1', 'A2', 'A3']
+    assert len(requested) == 4
+
+def test_openlibrary_lookup_bounded_by_configured_deadline(app, monkeypatch):
+    import time
+    from app.plugin_loader import registry
+    from app.plugins import goodreads_plugin
+
+    app.config['ENRICHMENT_DEADLINE'] = 2.5
+    app.config['OPENLIBRARY_AUTHOR_WORKERS'] = 3
+    registry.init_app(app)
+    plugin = registry.get('OpenLibraryPlugin').plugin
+    assert (plugin.deadline, plugin.author_workers) == (2.5, 3)
+
+    calls = []
+    def fake_get(url, deadline=None, **kwargs):
+        calls.append((url, deadline))
+        raise TimeoutError('slow')
+    monkeypatch.setattr(goodreads_plugin.http_client, 'get', fake_get)
+    start = time.monotonic()
+    assert plugin.run({'isbn': '9780000000002'}) == {'error': 'Exception during Open Library lookup'}
+    assert calls[0][0].endswith('/isbn/9780000000002.json')
+    assert start + 2.5 <= calls[0][1] <= time.monotonic() + 2.5
+
+def test_openlibrary_author_pool_replaced_on_resize_is_shut_down():
+    from app.plugins import goodreads_plugin
+    old = goodreads_plugin._author_executor(2)
+    assert goodreads_plugin._author_executor(2) is old
+    new = goodreads_plugin._author_executor(3)
+    assert new is not old and goodreads_plugin._author_executor(3) is new
+    with pytest.raises(RuntimeError):
+        old.submit(int)
+    assert new.submit(int, '7').result() == 7
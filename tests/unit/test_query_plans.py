@@ -0,0 +1,48 @@
+import pytest
+from sqlalchemy import func
+from app import create_app, db
+from app.models import Author, Book, BookTag, Comment, Rating, Review
+from app.models.book import book_authors
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def query_plan(query):
+    """EXPLAIN QUERY PLAN for an ORM query or Core select, as one string."""
+    statement = getattr(query, 'statement', query)
+    sql = str(statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}))
+    rows = db.session.execute(db.text(f'EXPLAIN QUERY PLAN {sql}')).all()
+    return '\n'.join(row[-1] for row in rows)
+
+# (description, query factory, index that must be used); the ratings unique
+# constraint is backed by an unnamed SQLite autoindex, so match on the search instead
+HOT_QUERIES = [
+    ('get_comments', lambda: Comment.query.filter_by(book_id=1), 'ix_comments_book_id'),
+    ('get_ratings / summary rebuild', lambda: Rating.query.filter_by(book_id=1), 'SEARCH ratings USING INDEX'),
+    ('get_book_reviews', lambda: Review.query.filter_by(book_id=1), 'ix_reviews_book_id_user_id'),
+    ('create_review duplicate check', lambda: Review.query.filter_by(book_id=1, user_id=2), 'ix_reviews_book_id_user_id'),
+    ('get_user_reviews', lambda: Review.query.filter_by(user_id=1), 'ix_reviews_user_id'),
+    ('add_book title dedupe', lambda: Book.query.filter_by(title='Dune'), 'ix_books_title'),
+    ('case-insensitive title', lambda: Book.query.filter(func.lower(Book.title) == 'dune'), 'ix_books_title_lower'),
+    ('author upsert lookup', lambda: Author.query.filter(Author.name.in_(['A', 'B'])), 'uq_authors_name'),
+    ('case-insensitive author', lambda: Author.query.filter(func.lower(Author.name) == 'a'), 'ix_authors_name_lower'),
+    ('books by author', lambda: db.select(book_authors.c.book_id).where(book_authors.c.author_id == 1), 'ix_book_authors_author_id'),
+    ('books by tag', lambda: BookTag.query.filter_by(tag_id=1), 'ix_book_tags_tag_id'),
+    ('books by language', lambda: Book.query.filter_by(language='en'), 'ix_books_language'),
+    ('books by series', lambda: Book.query.filter_by(series='Discworld'), 'ix_books_series'),
+    ('books by year range', lambda: Book.query.filter(Book.publish_year.between(1900, 1950)), 'ix_books_publish_year'),
+]
+
+@pytest.mark.parametrize('name,make_query,index', HOT_QUERIES, ids=[q[0] for q in HOT_QUERIES])
+def test_hot_queries_use_index(app, name, make_query, index):
+    plan = query_plan(make_query())
+    assert index in plan, f'{name} no longer uses {index}:\n{plan}'
+    assert 'SCAN' not in plan, f'{name} scans a table:\n{plan}'
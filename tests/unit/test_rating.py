@@ -28,3 +28,79 @@ def test_rating_model_creation(app):
     assert fetched.book_id == book.id
     assert fetched.user_id == user.id
     assert fetched.rating == 5
+
+def test_rating_summary_tracks_writes(app):
+    from app.models import RatingSummary
+    users = [User(username=f"summaryuser{i}", email=f"summary{i}@example.com", password_hash="pw") for i in range(3)]
+    book = Book(title="Summary Book")
+    db.session.add_all(users + [book])
+    db.session.commit()
+    ratings = [Rating(rating=value, book_id=book.id, user_id=u.id) for value, u in zip((5, 3, 4), users)]
+    db.session.add_all(ratings)
+    db.session.commit()
+
+    summary = db.session.get(RatingSummary, book.id)
+    assert summary.rating_count == 3
+    assert summary.average == 4
+    assert summary.histogram == {'1': 0, '2': 0, '3': 1, '4': 1, '5': 1}
+
+    ratings[1].rating = 1
+    db.session.delete(ratings[2])
+    db.session.commit()
+    summary = db.session.get(RatingSummary, book.id)
+    assert summary.rating_count == 2
+    assert summary.rating_sum == 6
+    assert summary.histogram == {'1': 1, '2': 0, '3': 0, '4': 0, '5': 1}
+
+def test_rebuild_rating_summaries_command(app):
+    from app.models import RatingSummary
+    user = User(username="backfilluser", email="backfill@example.com", password_hash="pw")
+    book = Book(title="Backfill Book")
+    db.session.add_all([user, book])
+    db.session.commit()
+    db.session.add(Rating(rating=2, book_id=book.id, user_id=user.id))
+    db.session.commit()
+    db.session.query(RatingSummary).delete()
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['rebuild-rating-summaries'])
+    assert 'Rebuilt rating summaries for 1 books' in result.output
+    summary = db.session.get(RatingSummary, book.id)
+    assert summary.rating_count == 1
+    assert summary.stars_2 == 1
+
+def test_missing_summary_row_is_built_or_merged(app):
+    from sqlalchemy import event
+    from app.models import RatingSummary
+    users = [User(username=f"raceuser{i}", email=f"race{i}@example.com", password_hash="pw") for i in range(3)]
+    book = Book(title="Race Book")
+    db.session.add_all(users + [book])
+    db.session.commit()
+    db.session.add(Rating(rating=2, book_id=book.id, user_id=users[0].id))
+    db.session.commit()
+
+    # No summary yet (e.g. before a backfill): rebuilt from every rating of the book
+    db.session.query(RatingSummary).delete()
+    db.session.commit()
+    db.session.add(Rating(rating=4, book_id=book.id, user_id=users[1].id))
+    db.session.commit()
+    summary = db.session.get(RatingSummary, book.id)
+    assert (summary.rating_count, summary.rating_sum) == (2, 6)
+
+    # Another transaction creates the row between our UPDATE and INSERT: the delta is merged, not a 500
+    db.session.query(RatingSummary).delete()
+    db.session.commit()
+    def concurrent_insert(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('UPDATE rating_summaries') and cursor.rowcount == 0:
+            conn.exec_driver_sql('INSERT INTO rating_summaries (book_id, rating_count, rating_sum, stars_1, stars_2, '
+                                 'stars_3, stars_4, stars_5) VALUES (?, 2, 6, 0, 1, 0, 1, 0)', (book.id,))
+    event.listen(db.engine, 'after_cursor_execute', concurrent_insert)
+    try:
+        db.session.add(Rating(rating=5, book_id=book.id, user_id=users[2].id))
+        db.session.commit()
+    finally:
+        event.remove(db.engine, 'after_cursor_execute', concurrent_insert)
+    db.session.expire_all()
+    summary = db.session.get(RatingSummary, book.id)
+    assert (summary.rating_count, summary.rating_sum) == (3, 11)
+    assert summary.histogram == {'1': 0, '2': 1, '3': 0, '4': 1, '5': 1}
@@ -0,0 +1,138 @@
+import threading
+import time
+import pytest
+from app import create_app, db
+from app.models import Book, Rating, Review, Tag, User
+from app.response_cache import MemoryBackend, ResponseCache, SQLiteBackend, response_cache
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+def test_memory_backend_evicts_entries_but_not_counters():
+    backend = MemoryBackend(max_size=2)
+    backend.incr(['gen:book:1'], 10)
+    for key in ('a', 'b', 'c'):
+        backend.set(key, key, 60)
+    assert backend.get('a') is None and backend.get('c') == 'c'
+    assert backend.counters(['gen:book:1', 'gen:new'], 100) == [11, 100]
+    assert backend.add('lock', 1, 60) and not backend.add('lock', 1, 60)
+
+def test_sqlite_backend_shares_generations_between_workers(tmp_path):
+    # Two caches on one file stand in for two gunicorn workers
+    path = str(tmp_path / 'response_cache.db')
+    worker_a, worker_b = ResponseCache(), ResponseCache()
+    worker_a.configure('sqlite', ttl=60, path=path)
+    worker_b.backend = SQLiteBackend(path)
+    worker_a.fetch('k', ['book:1'], lambda: ('a', {'body': 'old'}))
+    entry, _ = worker_b.fetch('k', ['book:1'], lambda: pytest.fail('should be shared'))
+    assert entry['body'] == 'old'
+
+    worker_a.invalidate({'book:1'})
+    entry, result = worker_b.fetch('k', ['book:1'], lambda: ('b', {'body': 'new'}))
+    assert entry is None and result == 'b'
+    assert worker_a.fetch('k', ['book:1'], lambda: pytest.fail('should hit'))[0]['body'] == 'new'
+    assert worker_b.backend.add('lock', 1, 60) and not worker_a.backend.add('lock', 1, 60)
+
+def test_only_one_caller_recomputes_a_missing_key():
+    cache = ResponseCache()
+    cache.configure('memory', ttl=60, lock_timeout=5)
+    calls = []
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'computed', {'body': 'x'}
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.fetch('k', ['tags'], compute)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert sum(1 for entry, result in results if result == 'computed') == 1
+    assert all(entry['body'] == 'x' for entry, result in results if entry)
+
+def test_expired_entry_is_served_stale_while_one_caller_refreshes():
+    cache = ResponseCache()
+    cache.configure('memory', ttl=0, lock_timeout=5)
+    cache.fetch('k', [], lambda: ('first', {'body': 'old'}))
+    cache.backend.add('lock:resp:k:', 1, 5)  # another worker is refreshing
+    entry, result = cache.fetch('k', [], lambda: pytest.fail('should not recompute'))
+    assert entry['body'] == 'old' and cache.stale_hits == 1
+
+def test_commits_invalidate_cached_responses(client, app):
+    with app.app_context():
+        book = Book(title='Cached')
+        user = User(username='rater', email='rater@example.com', password_hash='x')
+        db.session.add_all([book, user])
+        db.session.commit()
+        book_id, user_id = book.id, user.id
+
+    first = client.get(f'/books/{book_id}/ratings')
+    assert first.headers['X-Cache'] == 'MISS' and first.get_json() == {'average': None}
+    assert client.get(f'/books/{book_id}/ratings').headers['X-Cache'] == 'HIT'
+    assert client.get('/tags').headers['X-Cache'] == 'MISS'
+    assert client.get('/reviews').headers['X-Cache'] == 'MISS'
+    full = client.get(f'/books/{book_id}/full')
+    revalidated = client.get(f'/books/{book_id}/full', headers={'If-None-Match': full.headers['ETag']})
+    assert revalidated.status_code == 304 and revalidated.headers['X-Cache'] == 'HIT'
+
+    with app.app_context():
+        db.session.add(Rating(book_id=book_id, user_id=user_id, rating=4))
+        db.session.commit()
+    fresh = client.get(f'/books/{book_id}/ratings')
+    assert fresh.headers['X-Cache'] == 'MISS' and fresh.get_json()['count'] == 1
+    assert client.get('/tags').headers['X-Cache'] == 'HIT'
+    assert client.get('/reviews').headers['X-Cache'] == 'HIT'
+
+    with app.app_context():
+        db.session.add(Review(book_id=book_id, user_id=user_id, review_text='Good', reading_format='ebook'))
+        db.session.add(Tag(name='Cached Tag'))
+        db.session.commit()
+    assert len(client.get('/reviews').get_json()) == 1
+    assert 'Cached Tag' in [t['name'] for t in client.get('/tags').get_json()]
+    assert client.get(f'/books/{book_id}/full').get_json()['review_count'] == 1
+
+    with app.app_context():
+        db.session.get(User, user_id).username = 'renamed'
+        db.session.commit()
+    assert client.get('/reviews').get_json()[0]['username'] == 'renamed'
+
+def test_rolled_back_writes_do_not_invalidate(client, app):
+    with app.app_context():
+        book = Book(title='Stable')
+        db.session.add(book)
+        db.session.commit()
+        book_id = book.id
+    client.get(f'/books/{book_id}')
+    with app.app_context():
+        db.session.get(Book, book_id).title = 'Never saved'
+        db.session.flush()
+        db.session.rollback()
+    response = client.get(f'/books/{book_id}')
+    assert response.headers['X-Cache'] == 'HIT' and response.get_json()['title'] == 'Stable'
+    assert response_cache.stats()['hits'] >= 1
+
+def test_sqlite_backend_keeps_live_entries_when_another_worker_starts(tmp_path):
+    path = str(tmp_path / 'response_cache.db')
+    running = ResponseCache()
+    running.configure('sqlite', ttl=60, path=path)
+    running.fetch('k', ['tags'], lambda: ('a', {'body': 'kept'}))
+    running.backend.set('expired', {'body': 'gone'}, -1)
+
+    ResponseCache().configure('sqlite', ttl=60, path=path)  # a worker (re)starting
+    assert running.fetch('k', ['tags'], lambda: pytest.fail('entry was cleared'))[0]['body'] == 'kept'
+    count = running.backend._connection().execute("SELECT count(*) FROM response_cache WHERE key = 'expired'")
+    assert count.fetchone()[0] == 0
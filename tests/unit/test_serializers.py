@@ -0,0 +1,57 @@
+import json
+from datetime import datetime, timezone
+import pytest
+from app import create_app, db
+from app.json_provider import FastJSONProvider
+from app.models import Author, Book, Review, User
+from app.serializers import serializers
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def test_fast_json_provider_matches_stdlib_output(app):
+    assert isinstance(app.json, FastJSONProvider)
+    payload = {'b': [1, 2.5, None, True], 'a': 'å', 'when': datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)}
+    fast = app.json.dumps(payload)
+    stdlib = json.dumps(payload, default=app.json.default, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    assert json.loads(fast) == json.loads(stdlib)
+    assert fast.index('"a"') < fast.index('"b"') < fast.index('"when"')
+    assert json.loads(app.json.dumps({3: 'int key'})) == {'3': 'int key'}
+    assert json.loads(app.json.dumps({'big': 2 ** 70})) == {'big': 2 ** 70}
+    assert app.json.loads(fast)['when'] == 'Tue, 02 Jan 2024 03:04:05 GMT'
+    with app.test_request_context():
+        response = app.json.response({'ok': True})
+        assert response.mimetype == 'application/json' and response.get_data() == b'{"ok":true}\n'
+
+def test_serializers_project_columns_and_batch_relations(app):
+    book = Book(title='Projected', description='Long text', authors=[Author(name='A'), Author(name='B')])
+    user = User(username='reviewer', email='reviewer@example.com', password_hash='x')
+    db.session.add_all([book, user])
+    db.session.flush()
+    review = Review(book_id=book.id, user_id=user.id, review_text='Good', reading_format='ebook')
+    db.session.add(review)
+    db.session.commit()
+
+    statements = []
+    def count(*args):
+        statements.append(args)
+    db.event.listen(db.engine, 'before_cursor_execute', count)
+    try:
+        records = serializers['book'].dump_rows(serializers['book'].query().all())
+    finally:
+        db.event.remove(db.engine, 'before_cursor_execute', count)
+    assert records == [{'id': book.id, 'title': 'Projected', 'description': 'Long text', 'publish_year': None,
+                        'series': None, 'authors': ['A', 'B']}]
+    assert len(statements) == 2
+
+    rows = serializers['review'].dump_rows(serializers['review'].query().all())
+    assert rows == [review.to_dict()]
+    assert rows[0]['username'] == 'reviewer' and rows[0]['created_at'].startswith(str(review.created_at.year))
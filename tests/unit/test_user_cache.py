@@ -0,0 +1,68 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import create_app, db
+from app.models import Book, User
+from app.user_cache import user_cache
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def user(app):
+    user = User(username='cached', email='cached@example.com', password_hash='x')
+    book = Book(title='Reviewed')
+    db.session.add_all([user, book])
+    db.session.commit()
+    return user
+
+def _headers(user_id):
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+
+def _user_queries(app, call):
+    statements = []
+    count = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', count)
+    try:
+        response = call()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count)
+    return response, [s for s in statements if 'FROM users' in s]
+
+def test_write_path_resolves_user_from_cache(app, user):
+    client = app.test_client()
+    headers = _headers(user.id)
+    book_id = Book.query.first().id
+    user_cache.clear()
+    assert client.get('/protected', headers=headers).status_code == 200
+
+    response, queries = _user_queries(app, lambda: client.post('/reviews', headers=headers, json={
+        'book_id': book_id, 'review_text': 'Good', 'reading_format': 'ebook'}))
+    assert response.status_code == 201
+    assert response.get_json()['username'] == 'cached'
+    assert queries == []
+
+def test_deactivated_and_deleted_users_are_rejected(app, user):
+    client = app.test_client()
+    headers = _headers(user.id)
+    assert client.get('/protected', headers=headers).status_code == 200
+
+    user.is_active = False
+    db.session.commit()
+    response = client.get('/protected', headers=headers)
+    assert response.status_code == 401
+    assert response.get_json() == {'msg': 'User not found or inactive'}
+
+    user.is_active = True
+    db.session.commit()
+    assert client.get('/protected', headers=headers).status_code == 200
+    assert client.delete(f'/users/{user.id}', headers=headers).status_code == 200
+    assert client.get('/protected', headers=headers).status_code == 401